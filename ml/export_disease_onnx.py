@@ -0,0 +1,98 @@
+"""
+SmartAgri AI - Disease Model ONNX Export
+Exports both Hugging Face disease classifiers to ONNX for the `onnx` serving
+backend (DISEASE_BACKEND=onnx) and optionally writes INT8 dynamic-quantized
+copies.
+
+Requires (export time only): torch, transformers, onnx, onnxruntime
+    python export_disease_onnx.py              # FP32 + INT8
+    python export_disease_onnx.py --no-quantize
+"""
+import argparse
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, "server", "ml_models", "disease_onnx")
+
+MODELS = {
+    "primary": "linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
+    "secondary": "wambugu71/crop_leaf_diseases_vit",
+}
+
+# Image-processor fields the serving backend needs to reproduce preprocessing
+PROCESSOR_KEYS = [
+    "do_resize", "size", "resample", "do_center_crop", "crop_size",
+    "do_rescale", "rescale_factor", "do_normalize", "image_mean", "image_std",
+]
+
+
+def export_model(stem: str, model_id: str, output_dir: str, opset: int) -> str:
+    import torch
+    from transformers import AutoImageProcessor, AutoModelForImageClassification
+
+    print(f"  🔄 Exporting {model_id} → {stem}.onnx")
+    model = AutoModelForImageClassification.from_pretrained(model_id).eval()
+    processor = AutoImageProcessor.from_pretrained(model_id, use_fast=False)
+
+    proc = {k: getattr(processor, k) for k in PROCESSOR_KEYS if hasattr(processor, k)}
+    proc["resample"] = int(proc.get("resample", 2))
+    if proc.get("do_center_crop"):
+        crop = proc["crop_size"]
+    else:
+        size = proc["size"]
+        crop = size if "height" in size else {"height": size["shortest_edge"], "width": size["shortest_edge"]}
+    height, width = crop["height"], crop["width"]
+
+    labels = [model.config.id2label[i] for i in range(len(model.config.id2label))]
+    with open(os.path.join(output_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump({"model_id": model_id, "labels": labels, "processor": proc}, f, indent=2)
+
+    class _LogitsOnly(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, pixel_values):
+            return self.inner(pixel_values=pixel_values).logits
+
+    path = os.path.join(output_dir, f"{stem}.onnx")
+    dummy = torch.randn(1, 3, height, width)
+    torch.onnx.export(
+        _LogitsOnly(model), (dummy,), path,
+        input_names=["pixel_values"], output_names=["logits"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+    print(f"     ✅ {path} ({os.path.getsize(path) / 1e6:.1f} MB, {len(labels)} classes)")
+    return path
+
+
+def quantize_model(path: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out = path.replace(".onnx", ".int8.onnx")
+    quantize_dynamic(path, out, weight_type=QuantType.QInt8)
+    print(f"     ✅ {out} ({os.path.getsize(out) / 1e6:.1f} MB, INT8 dynamic)")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🌾 Exporting Disease Models to ONNX")
+    print("=" * 60)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for stem, model_id in MODELS.items():
+        onnx_path = export_model(stem, model_id, args.output_dir, args.opset)
+        if not args.no_quantize:
+            quantize_model(onnx_path)
+
+    print("\n✅ Export complete. Serve with DISEASE_BACKEND=onnx "
+          f"(DISEASE_ONNX_DIR={args.output_dir})")
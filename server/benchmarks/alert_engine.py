@@ -0,0 +1,180 @@
+"""
+SmartAgri AI - Price Alert Engine Benchmark
+
+Matches a run of daily mandi batches against N price-alert subscriptions:
+  • scan    — every subscription checked against its commodity's daily high
+              in a Python loop (what evaluating AlertSubscription rows one
+              by one costs)
+  • numpy   — the same full scan as one vectorized mask over all
+              subscriptions
+  • engine  — services/alert_engine.py: per-commodity sorted thresholds,
+              one binary search per (commodity, day) in the batch
+Commodity price levels drift about a percent a day. All three fire an alert
+once and re-arm it only after a complete day priced below its threshold;
+the alerts they fire must be identical. Also checked:
+  • chunked — each day fed as 4 chunks (a cheap one between dear ones) fires
+              exactly what the whole day does
+  • resumed — an engine rebuilt halfway from (last firing day, daily highs),
+              as a new ingest run does from the DB, continues identically
+and times the bulk rebuild.
+
+Run from the server/ directory:
+
+    python -m benchmarks.alert_engine
+    python -m benchmarks.alert_engine --subs 1000000 --batches 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.market_index import synthetic_mandi
+from services.alert_engine import PriceAlertEngine
+
+
+def daily_batches(days: int, rows: int, drift: float = 0.01, seed: int = 3) -> list:
+    """One batch per day; each commodity's price level follows a slow random walk day to day."""
+    rng = np.random.default_rng(seed)
+    frame = synthetic_mandi(rows * days)
+    walk = np.exp(np.cumsum(rng.normal(0, drift, (days, frame["commodity"].cat.categories.size)), axis=0))
+    batches = []
+    for day in range(days):
+        batch = frame.iloc[day * rows:(day + 1) * rows].copy()
+        batch["modal_price"] = (batch["modal_price"] * walk[day, batch["commodity"].cat.codes]).astype(np.int64)
+        batch["date"] = pd.Timestamp("2026-01-01") + pd.Timedelta(days=day)
+        batches.append(batch)
+    return batches
+
+
+def synthetic_subscriptions(n: int, batch, users: int, seed: int = 11) -> list:
+    """(id, user, crop, threshold) around each commodity's highest batch price — most stay quiet."""
+    rng = np.random.default_rng(seed)
+    peak = batch.groupby("commodity", observed=True)["modal_price"].max()
+    crops = peak.index.astype(str).to_numpy()
+    pick = rng.integers(0, len(crops), n)
+    thresholds = np.round(peak.to_numpy()[pick] * rng.uniform(1.0, 1.4, n))
+    user_ids = rng.integers(1, users + 1, n)
+    return list(zip(range(1, n + 1), user_ids.tolist(), crops[pick].tolist(), thresholds.tolist()))
+
+
+class ScanMatcher:
+    """Full scan over all subscriptions, one batch = one day; `vectorized` does it as one numpy mask."""
+
+    def __init__(self, subs: list, vectorized: bool):
+        self.subs = subs
+        self.vectorized = vectorized
+        self.ids = np.array([s[0] for s in subs])
+        self.crops = np.array([s[2] for s in subs])
+        self.thresholds = np.array([s[3] for s in subs])
+        self.armed = np.ones(len(subs), dtype=bool)
+        self.previous = {}                 # crop → previous day's high
+
+    def evaluate(self, batch) -> set:
+        high = batch.groupby(batch["commodity"].astype(str), observed=True)["modal_price"].max().astype(np.float64)
+        if self.vectorized:
+            prev = pd.Series(self.previous, dtype=np.float64).reindex(self.crops).to_numpy()
+            price = high.reindex(self.crops).to_numpy()                  # NaN = not in batch
+            seen = ~np.isnan(price)
+            self.armed[seen & (self.thresholds > prev)] = True           # NaN prev compares False
+            fire = seen & self.armed & (self.thresholds <= price)
+            self.armed[fire] = False
+            fired = set(self.ids[fire].tolist())
+        else:
+            prices = high.to_dict()
+            fired = set()
+            for k, (sub_id, user, crop, threshold) in enumerate(self.subs):
+                price = prices.get(crop)
+                if price is None:
+                    continue
+                if crop in self.previous and threshold > self.previous[crop]:
+                    self.armed[k] = True
+                if self.armed[k] and threshold <= price:
+                    self.armed[k] = False
+                    fired.add(sub_id)
+        self.previous.update(high.to_dict())
+        return fired
+
+
+def fired_ids(events: list) -> set:
+    return {e["subscription_id"] for e in events}
+
+
+def history_of(batches: list):
+    """crop → (days, daily high) over `batches`, like MarketIndex.daily_max."""
+    frame = pd.concat(batches)
+    highs = frame.groupby([frame["commodity"].astype(str).str.lower(), "date"], observed=True)["modal_price"].max()
+    table = {}
+    for crop, part in highs.groupby(level=0):
+        days = part.index.get_level_values(1).to_numpy(dtype="datetime64[D]").astype(np.int64)
+        table[crop] = (days, part.to_numpy(dtype=np.float64))
+    return lambda crop: table.get(crop, (np.empty(0, dtype=np.int64), np.empty(0)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subs", type=int, default=300_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batches", type=int, default=10, help="daily ingest batches")
+    parser.add_argument("--rows", type=int, default=20_000, help="mandi rows per batch")
+    args = parser.parse_args()
+
+    batches = daily_batches(args.batches, args.rows)
+    subs = synthetic_subscriptions(args.subs, batches[0], args.users)
+
+    engine = PriceAlertEngine()
+    t = time.perf_counter()
+    engine.load(subs)
+    rebuild_ms = (time.perf_counter() - t) * 1000
+    scan, numpy_scan = ScanMatcher(subs, vectorized=False), ScanMatcher(subs, vectorized=True)
+    chunked = PriceAlertEngine()
+    chunked.load(subs)
+
+    timings = {"scan": 0.0, "numpy": 0.0, "engine": 0.0}
+    fired_total, identical, chunks_ok = 0, True, True
+    last_fired = {}
+    for day, batch in enumerate(batches):
+        t = time.perf_counter()
+        want = scan.evaluate(batch)
+        timings["scan"] += time.perf_counter() - t
+        t = time.perf_counter()
+        vec = numpy_scan.evaluate(batch)
+        timings["numpy"] += time.perf_counter() - t
+        t = time.perf_counter()
+        events = engine.evaluate(batch)
+        timings["engine"] += time.perf_counter() - t
+        got = fired_ids(events)
+        fired_total += len(got)
+        identical &= want == vec == got
+        # Same day in 4 chunks — dearest, cheapest, then the middle quarters: a cheap
+        # chunk between two dear ones must not re-arm anything
+        ordered = batch.sort_values("modal_price", ascending=False, kind="stable")
+        quarters = np.array_split(np.arange(len(ordered)), 4)
+        parts = [ordered.iloc[quarters[i]] for i in (0, 3, 1, 2)]
+        chunks_ok &= set().union(*(fired_ids(chunked.evaluate(p)) for p in parts)) == got
+        last_fired.update({e["subscription_id"]: int(np.datetime64(e["price_date"], "D").astype(np.int64))
+                           for e in events})
+
+    # Resume halfway from what the DB would hold: last firing days + daily highs so far
+    half = args.batches // 2
+    resumed, reference = PriceAlertEngine(), PriceAlertEngine()
+    reference.load(subs)
+    half_fired = {}
+    for batch in batches[:half]:
+        for e in reference.evaluate(batch):
+            half_fired[e["subscription_id"]] = int(np.datetime64(e["price_date"], "D").astype(np.int64))
+    resumed.load(subs, half_fired, history_of(batches[:half]))
+    resumed_ok = all(fired_ids(resumed.evaluate(b)) == fired_ids(reference.evaluate(b)) for b in batches[half:])
+
+    print("=" * 66)
+    print(f"🔔 Price alerts — {args.subs:,} subscriptions, {args.batches} days × {args.rows:,} rows")
+    print("=" * 66)
+    per_batch = {k: v * 1000 / args.batches for k, v in timings.items()}
+    for name in ("scan", "numpy", "engine"):
+        print(f"{name:8s}: {per_batch[name]:>9.2f} ms / day  "
+              f"({per_batch['scan'] / max(per_batch[name], 1e-9):.1f}x vs scan)")
+    print(f"alerts fired  : {fired_total:,} across {args.batches} days")
+    print("parity        : " + ("✅ identical" if identical else "❌ differs"))
+    print("chunked days  : " + ("✅ no re-fires" if chunks_ok else "❌ differs"))
+    print("resumed       : " + ("✅ identical after rebuild" if resumed_ok else "❌ differs"))
+    print(f"rebuild       : {rebuild_ms:.0f} ms")
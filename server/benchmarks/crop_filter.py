@@ -0,0 +1,161 @@
+"""
+SmartAgri AI - Crop Suitability Filter Benchmark
+
+Compares the original per-crop Python loop over CROP_DATABASE with the
+vectorized pass over the compiled constraint matrix
+(services/crop_constraints.py):
+  • parity  — identical crop lists, scores and check counts on random plots
+  • latency — per-request filter time, and bulk scoring of many plots at once
+
+Run from the server/ directory:
+
+    python -m benchmarks.crop_filter
+    python -m benchmarks.crop_filter --plots 20000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.recommendation import CROP_DATABASE, CROP_MATRIX
+
+SEASONS = ["Kharif", "Rabi", "Summer", "Zaid"]
+IRRIGATION = ["Canal", "Borewell", "Rainfed", "Drip"]
+SOILS = ["Loamy", "Clayey", "Sandy", "Black Soil", "Red Soil", "Alluvial", "Laterite", "Peaty"]
+
+
+def legacy_filter(soil: dict, weather: dict, season: str, irrigation: str) -> list:
+    """The original per-crop loop (pre-vectorization), kept as the parity reference."""
+    suitable = []
+    for crop in CROP_DATABASE:
+        score = 0.0
+        checks_passed = 0
+        total_checks = 5
+
+        # Season check
+        if season in crop.get("seasons", []):
+            checks_passed += 1
+            score += 0.2
+
+        # Irrigation check
+        if irrigation in crop.get("irrigation_types", []):
+            checks_passed += 1
+            score += 0.15
+
+        # Soil type check
+        soil_type = soil.get("soil_type", "Loamy")
+        if soil_type in crop.get("soil_types", []):
+            checks_passed += 1
+            score += 0.15
+
+        # NPK compatibility
+        n, p, k = soil["N"], soil["P"], soil["K"]
+        n_ok = crop.get("min_n", 0) <= n <= crop.get("max_n", 200)
+        p_ok = crop.get("min_p", 0) <= p <= crop.get("max_p", 200)
+        k_ok = crop.get("min_k", 0) <= k <= crop.get("max_k", 300)
+        npk_score = sum([n_ok, p_ok, k_ok]) / 3
+        score += npk_score * 0.25
+        if npk_score >= 0.66:
+            checks_passed += 1
+
+        # pH compatibility
+        ph = soil["ph"]
+        if crop.get("min_ph", 4) <= ph <= crop.get("max_ph", 9):
+            checks_passed += 1
+            score += 0.1
+        else:
+            ph_dist = min(abs(ph - crop.get("min_ph", 4)), abs(ph - crop.get("max_ph", 9)))
+            score += max(0, 0.1 - ph_dist * 0.05)
+
+        # Temperature bonus
+        temp = weather.get("temperature", 25)
+        if crop.get("min_temp", 10) <= temp <= crop.get("max_temp", 40):
+            score += 0.1
+
+        # Rainfall bonus
+        rain = weather.get("rainfall", 100)
+        if crop.get("min_rainfall", 0) <= rain <= crop.get("max_rainfall", 400):
+            score += 0.05
+
+        if checks_passed >= 3 and score >= 0.4:
+            suitable.append({
+                "name": crop["name"],
+                "suitability_score": min(score, 1.0),
+                "checks_passed": checks_passed,
+            })
+
+    return suitable
+
+
+def random_plots(count: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    plots = []
+    for _ in range(count):
+        soil = {
+            "N": float(rng.integers(0, 150)), "P": float(rng.integers(5, 150)),
+            "K": float(rng.integers(5, 210)), "ph": round(float(rng.uniform(3.5, 9.5)), 1),
+            "soil_type": SOILS[rng.integers(len(SOILS))],
+        }
+        weather = {
+            "temperature": round(float(rng.uniform(5, 45)), 1),
+            "rainfall": round(float(rng.uniform(0, 500)), 1),
+            "humidity": round(float(rng.uniform(20, 100)), 1),
+        }
+        plots.append((soil, weather, SEASONS[rng.integers(len(SEASONS))], IRRIGATION[rng.integers(len(IRRIGATION))]))
+    return plots
+
+
+def _time(fn, plots, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for args in plots:
+            fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def bulk_score(plots: list):
+    """All plots × all crops in one call (what the bulk endpoint does)."""
+    m = CROP_MATRIX
+    values = np.array([
+        [s["N"], s["P"], s["K"], s["ph"], w["temperature"], w["rainfall"]]
+        for s, w, _, _ in plots
+    ], dtype=np.float64)
+    return m.score(
+        values,
+        m.bits(m.seasons, [p[2] for p in plots])[:, None],
+        m.bits(m.irrigation, [p[3] for p in plots])[:, None],
+        m.bits(m.soil_types, [p[0]["soil_type"] for p in plots])[:, None],
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plots", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    plots = random_plots(args.plots)
+
+    mismatches = sum(legacy_filter(*p) != CROP_MATRIX.filter(*p) for p in plots)
+    bulk_scores, bulk_checks = bulk_score(plots)
+    for i, p in enumerate(plots[:500]):
+        ref = {c["name"]: c for c in legacy_filter(*p)}
+        for j, name in enumerate(CROP_MATRIX.names):
+            if name in ref and (min(bulk_scores[i, j], 1.0) != ref[name]["suitability_score"]
+                                or bulk_checks[i, j] != ref[name]["checks_passed"]):
+                mismatches += 1
+
+    loop_s = _time(legacy_filter, plots, args.repeat)
+    vec_s = _time(CROP_MATRIX.filter, plots, args.repeat)
+    t = time.perf_counter()
+    bulk_score(plots)
+    bulk_s = time.perf_counter() - t
+
+    print("=" * 72)
+    print(f"🌾 Crop suitability filter — {len(CROP_DATABASE)} crops, {args.plots} plots")
+    print("=" * 72)
+    print(f"parity mismatches          : {mismatches}")
+    print(f"python loop     per plot   : {loop_s / args.plots * 1e6:8.1f} µs")
+    print(f"vectorized      per plot   : {vec_s / args.plots * 1e6:8.1f} µs   ({loop_s / vec_s:.1f}x)")
+    print(f"vectorized bulk per plot   : {bulk_s / args.plots * 1e6:8.1f} µs   ({loop_s / bulk_s:.1f}x)")
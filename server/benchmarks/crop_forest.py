@@ -0,0 +1,84 @@
+"""
+SmartAgri AI - Compiled Crop Forest Parity Check & Benchmark
+
+Compares the sklearn RandomForestClassifier (crop_recommender.joblib) with
+the flattened-node-array predictor (services/forest_predictor.py):
+  • parity  — max |Δ predict_proba| and top-1 agreement on X_test_crop.npy
+  • latency — single-row p50/p95 (the per-request path) and full-matrix time
+
+Run from the server/ directory (train the model first with
+ml/train_crop_model.py if ml_models/ has no crop_recommender.joblib):
+
+    python -m benchmarks.crop_forest
+    python -m benchmarks.crop_forest --model ./ml_models/crop_recommender.joblib --rows 500
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+
+from services.forest_predictor import CompiledForestClassifier
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATA = os.path.join(os.path.dirname(SERVER_DIR), "data", "processed", "X_test_crop.npy")
+
+
+def _latency(fn, rows: np.ndarray) -> tuple:
+    fn(rows[:1])  # warm-up
+    times = []
+    for i in range(len(rows)):
+        t = time.perf_counter()
+        fn(rows[i:i + 1])
+        times.append(time.perf_counter() - t)
+    times.sort()
+    return times[len(times) // 2] * 1000, times[min(len(times) - 1, int(len(times) * 0.95))] * 1000
+
+
+def _batch_ms(fn, X: np.ndarray, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.path.join(SERVER_DIR, "ml_models", "crop_recommender.joblib"))
+    parser.add_argument("--data", default=DEFAULT_DATA, help="scaled feature matrix (.npy)")
+    parser.add_argument("--rows", type=int, default=300, help="rows used for single-row latency")
+    args = parser.parse_args()
+
+    forest = joblib.load(args.model)
+    X = np.load(args.data)
+
+    t = time.perf_counter()
+    compiled = CompiledForestClassifier(forest)
+    compile_s = time.perf_counter() - t
+
+    ref = forest.predict_proba(X)
+    out = compiled.predict_proba(X)
+    max_err = float(np.max(np.abs(ref - out)))
+    top1 = float(np.mean(ref.argmax(axis=1) == out.argmax(axis=1)))
+    bit_equal = bool(np.array_equal(ref, out))
+
+    rows = X[:args.rows]
+    sk_p50, sk_p95 = _latency(forest.predict_proba, rows)
+    cp_p50, cp_p95 = _latency(compiled.predict_proba, rows)
+    sk_batch = _batch_ms(forest.predict_proba, X)
+    cp_batch = _batch_ms(compiled.predict_proba, X)
+
+    print("=" * 72)
+    print(f"🌲 Crop forest — {len(forest.estimators_)} trees, depth ≤ {compiled._trees.max_depth}, "
+          f"{X.shape[0]} test rows")
+    print("=" * 72)
+    print(f"compile time          : {compile_s * 1000:8.1f} ms   ({compiled.nbytes / 1e6:.1f} MB node arrays)")
+    print(f"max |Δ proba|         : {max_err:.3e}   (bit-identical: {bit_equal})")
+    print(f"top-1 agreement       : {top1:.2%}")
+    print(f"{'':22s}  {'sklearn':>10} {'compiled':>10} {'speed-up':>9}")
+    print(f"{'single row p50 (ms)':22s}  {sk_p50:>10.3f} {cp_p50:>10.3f} {sk_p50 / cp_p50:>8.1f}x")
+    print(f"{'single row p95 (ms)':22s}  {sk_p95:>10.3f} {cp_p95:>10.3f} {sk_p95 / cp_p95:>8.1f}x")
+    print(f"{f'{len(X)} rows (ms)':22s}  {sk_batch:>10.1f} {cp_batch:>10.1f} {sk_batch / cp_batch:>8.1f}x")
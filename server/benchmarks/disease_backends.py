@@ -0,0 +1,217 @@
+"""
+SmartAgri AI - Disease Backend Parity Check & Benchmark
+
+Runs the backends on the same fixed image set:
+  • pipeline — reference: the two models called through transformers.pipeline
+               itself (PIL images in, the HF image processors preprocess)
+  • hf       — the served HF backend (shared preprocessing, PyTorch on tensors)
+  • onnx     — ONNX Runtime, FP32 and INT8
+and reports:
+  • parity   — top-1 agreement and top-k label overlap against the pipeline run
+  • latency  — single-image p50/p95 and batched throughput
+  • memory   — process RSS after model load and after the run
+
+Each backend runs in its own spawned process so RSS numbers do not bleed into
+each other. Run from the server/ directory:
+
+    python -m benchmarks.disease_backends --images ../data/leaf_samples
+    python -m benchmarks.disease_backends            # synthetic fixed set
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from queue import Empty
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_images(images_dir: str, count: int) -> list:
+    from PIL import Image
+
+    if images_dir:
+        names = sorted(
+            n for n in os.listdir(images_dir)
+            if n.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+        )[:count]
+        return [Image.open(os.path.join(images_dir, n)).convert("RGB") for n in names]
+
+    # Deterministic synthetic set (fractal textures) — stable across runs
+    images = []
+    for i in range(count):
+        x0 = -2.0 + (i % 8) * 0.15
+        img = Image.effect_mandelbrot((640, 480), (x0, -1.2, x0 + 2.4, 1.2), 20 + i * 3)
+        images.append(Image.merge("RGB", (img, img.rotate(90, expand=False), img.transpose(Image.FLIP_LEFT_RIGHT))))
+    return images
+
+
+class PipelineReference:
+    """Both disease models through transformers.pipeline end to end — the parity reference."""
+
+    def load(self):
+        from transformers import pipeline as hf_pipeline, AutoImageProcessor
+        from services.disease_backends import PRIMARY_MODEL, SECONDARY_MODEL, TOP_K
+
+        self.primary = hf_pipeline("image-classification", model=PRIMARY_MODEL, top_k=TOP_K)
+        self.secondary = hf_pipeline(
+            "image-classification", model=SECONDARY_MODEL,
+            image_processor=AutoImageProcessor.from_pretrained(SECONDARY_MODEL, use_fast=False),
+            top_k=TOP_K,
+        )
+
+    def predict(self, images: list) -> list:
+        return list(zip(self.primary(list(images)), self.secondary(list(images))))
+
+
+def _label(name: str, quantized: bool) -> str:
+    return f"{name}{'-int8' if quantized else ''}"
+
+
+def _run_backend(name: str, quantized: bool, threads: int, images_dir: str, count: int,
+                 batch_size: int, queue):
+    """Child process entry: put the measurements — or the error that stopped them — on `queue`."""
+    try:
+        queue.put(_measure(name, quantized, threads, images_dir, count, batch_size))
+    except BaseException as e:
+        queue.put({"backend": _label(name, quantized), "error": f"{type(e).__name__}: {e}"})
+
+
+def _measure(name: str, quantized: bool, threads: int, images_dir: str, count: int,
+             batch_size: int) -> dict:
+    sys.path.insert(0, SERVER_DIR)
+    os.environ["DISEASE_ONNX_QUANTIZED"] = "true" if quantized else "false"
+    if threads:
+        os.environ["DISEASE_ONNX_THREADS"] = str(threads)
+    from services.disease_backends import create_backend
+
+    images = load_images(images_dir, count)
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    backend = PipelineReference() if name == "pipeline" else create_backend(name)
+    backend.load()
+    load_s = time.perf_counter() - t0
+    rss_loaded = _rss_mb()
+
+    backend.predict(images[:1])  # warm-up
+
+    single = []
+    outputs = []
+    for img in images:
+        t = time.perf_counter()
+        outputs.extend(backend.predict([img]))
+        single.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        backend.predict(images[i:i + batch_size])
+    batched_s = time.perf_counter() - t
+
+    single.sort()
+    return {
+        "backend": _label(name, quantized),
+        "load_s": load_s,
+        "rss_base_mb": rss_before,
+        "rss_loaded_mb": rss_loaded,
+        "rss_end_mb": _rss_mb(),
+        "p50_ms": single[len(single) // 2] * 1000,
+        "p95_ms": single[min(len(single) - 1, int(len(single) * 0.95))] * 1000,
+        "batched_img_per_s": len(images) / batched_s if batched_s else 0.0,
+        "labels": [([r["label"] for r in p1], [r["label"] for r in p2]) for p1, p2 in outputs],
+    }
+
+
+def run_isolated(name, quantized, args) -> dict:
+    """
+    One backend in a spawned process. If the child dies without reporting
+    (segfault, OOM kill) or exceeds --timeout, the result is an "error" row
+    instead of a hang.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_backend, args=(
+        name, quantized, args.threads, args.images, args.count, args.batch_size, queue,
+    ))
+    proc.start()
+    deadline = time.monotonic() + args.timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1.0)
+        except Empty:
+            if not proc.is_alive():
+                try:
+                    result = queue.get(timeout=1.0)      # reported just before exiting
+                except Empty:
+                    result = {"backend": _label(name, quantized),
+                              "error": f"worker exited with code {proc.exitcode} without a result"}
+            elif time.monotonic() > deadline:
+                proc.terminate()
+                result = {"backend": _label(name, quantized),
+                          "error": f"timed out after {args.timeout:.0f}s"}
+    proc.join()
+    return result
+
+
+def parity(reference: list, candidate: list, k: int) -> dict:
+    top1 = topk = total = 0
+    for (r1, r2), (c1, c2) in zip(reference, candidate):
+        for ref, cand in ((r1, c1), (r2, c2)):
+            if not ref:
+                continue
+            total += 1
+            top1 += bool(cand) and ref[0] == cand[0]
+            topk += len(set(ref[:k]) & set(cand[:k])) / min(k, len(ref))
+    return {
+        "top1_agreement": top1 / total if total else 0.0,
+        "topk_overlap": topk / total if total else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default="", help="directory of leaf photos (default: synthetic set)")
+    parser.add_argument("--count", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=0, help="ORT intra-op threads")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--skip-int8", action="store_true")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per backend before it is killed")
+    args = parser.parse_args()
+
+    runs = [("pipeline", False), ("hf", False), ("onnx", False)] + ([] if args.skip_int8 else [("onnx", True)])
+    results = [run_isolated(name, q, args) for name, q in runs]
+    reference = None if "error" in results[0] else results[0]["labels"]
+
+    print("=" * 96)
+    print(f"🔬 Disease backend benchmark — {args.count} images, batch {args.batch_size}")
+    print("=" * 96)
+    print(f"{'backend':<10} {'load s':>7} {'RSS load MB':>12} {'RSS end MB':>11} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'img/s':>8} {'top-1 agree':>12} {f'top-{args.top_k} overlap':>14}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<10} ❌ {r['error']}")
+            continue
+        line = (f"{r['backend']:<10} {r['load_s']:>7.2f} {r['rss_loaded_mb']:>12.0f} {r['rss_end_mb']:>11.0f} "
+                f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['batched_img_per_s']:>8.1f} ")
+        if reference is None:
+            print(line + f"{'n/a':>12} {'n/a':>14}")
+        else:
+            par = parity(reference, r["labels"], args.top_k)
+            print(line + f"{par['top1_agreement']:>12.1%} {par['topk_overlap']:>14.1%}")
+    if any("error" in r for r in results):
+        sys.exit(1)
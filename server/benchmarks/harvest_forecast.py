@@ -0,0 +1,314 @@
+"""
+SmartAgri AI - Harvest Forecast Tables Benchmark
+
+Compares the original per-request harvest forecast (history rebuild + Holt
+smoothing + monthly curve for every crop on every call) with the
+precomputed HarvestForecastTables (services/harvest_forecast_tables.py):
+  • build   — one-off table construction time
+  • latency — single-crop forecast and the ~50-crop bulk forecast
+  • parity  — identical responses for every crop, state, harvest month
+              and a range of land sizes
+
+Run from the server/ directory:
+
+    python -m benchmarks.harvest_forecast
+    python -m benchmarks.harvest_forecast --repeat 50
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from services.harvest_forecast_service import (
+    CROP_PROFILES, CULTIVATION_COST, STATE_PRICE_FACTOR, _get_state_yield,
+    get_bulk_forecast, predict_harvest_price,
+)
+from benchmarks.smoothing import legacy_holt_forecast
+from services.harvest_forecast_tables import HarvestForecastTables, get_forecast_tables
+from services.real_crop_prices import get_all_monthly_history, get_monthly_price, REAL_SEASONAL
+
+
+# ── Legacy reference (pre-table harvest_forecast_service) ─
+
+def legacy_predict_harvest_price(
+    crop: str,
+    state: str = "Maharashtra",
+    sowing_date: str = None,
+    land_size: float = 1.0,
+) -> Dict:
+    """
+    Predict the price of a crop at harvest time using REAL historical data
+    and Holt's Double Exponential Smoothing.
+    """
+    profile = CROP_PROFILES.get(crop)
+    if not profile:
+        for k, v in CROP_PROFILES.items():
+            if k.lower() == crop.lower():
+                crop = k
+                profile = v
+                break
+    if not profile:
+        return {"error": f"Crop '{crop}' not found. Available: {len(CROP_PROFILES)} crops."}
+
+    today = datetime.now()
+    if sowing_date:
+        try:
+            sow = datetime.strptime(sowing_date, "%Y-%m-%d")
+        except ValueError:
+            sow = today
+    else:
+        sow = today
+
+    growth_days = profile["growth_days"]
+    harvest_date = sow + timedelta(days=growth_days)
+    harvest_month = harvest_date.month
+
+    # ── Step 1: Get REAL historical prices for harvest month (2015-2025) ──
+    all_hist = get_all_monthly_history(crop)
+    harvest_month_prices = [r for r in all_hist if r["month"] == harvest_month]
+    yearly_prices = [r["price"] for r in harvest_month_prices]
+
+    # ── Step 2: Holt's Exponential Smoothing on 11 years of data ──
+    if len(yearly_prices) >= 3:
+        predicted, trend, forecast_error = legacy_holt_forecast(yearly_prices, alpha=0.4, beta=0.2, steps=1)
+        # Apply seasonal adjustment from REAL AGMARKNET data
+        seasonal = REAL_SEASONAL.get(crop)
+        if seasonal:
+            annual_avg = sum(yearly_prices[-3:]) / 3  # last 3 years avg
+            seasonal_factor = seasonal[harvest_month - 1]
+            # Blend: 70% exponential smoothing + 30% seasonal-adjusted latest
+            latest_year_price = yearly_prices[-1] if yearly_prices else predicted
+            seasonal_prediction = latest_year_price * (1 + trend / latest_year_price) * seasonal_factor
+            predicted = 0.7 * predicted + 0.3 * seasonal_prediction
+        r_squared = max(0, 1 - (forecast_error / 100)) ** 2
+    else:
+        seasonal_factor = profile["seasonal_curve"][harvest_month - 1]
+        predicted = profile["base_price"] * seasonal_factor
+        r_squared = 0.5
+        forecast_error = 10.0
+
+    # ── Step 3: Apply state multiplier ──
+    state_factor = STATE_PRICE_FACTOR.get(state, 1.0)
+    predicted *= state_factor
+
+    # ── Step 4: MSP floor ──
+    msp = profile.get("msp", 0)
+    if msp > 0:
+        predicted = max(predicted, msp * 0.98)
+
+    predicted = round(predicted)
+
+    # ── Step 5: Current price from REAL data ──
+    current_month = today.month
+    current_price_raw = get_monthly_price(crop, 2025, current_month)
+    current_price = round(current_price_raw * state_factor) if current_price_raw else round(profile["base_price"] * state_factor)
+
+    # ── Step 6: Peak (best sell) price from REAL data ──
+    peak_months = profile.get("peak_months", [])
+    if peak_months:
+        peak_prices = [get_monthly_price(crop, 2025, m) for m in peak_months]
+        peak_prices = [p for p in peak_prices if p > 0]
+        if peak_prices:
+            peak_price = round(max(peak_prices) * state_factor)
+        else:
+            peak_idx = peak_months[0] - 1
+            peak_price = round(profile["base_price"] * profile["seasonal_curve"][peak_idx] * state_factor)
+    else:
+        peak_price = predicted
+
+    # ── Step 7: Price change ──
+    price_change = predicted - current_price
+    price_change_pct = round((price_change / current_price * 100), 1) if current_price else 0
+
+    # ── Step 8: Revenue (state-adjusted yield + cultivation cost) ──
+    base_yield = profile["yield_per_acre"]
+    yield_per_acre = _get_state_yield(crop, state, base_yield)
+    total_yield = round(yield_per_acre * land_size, 1)
+    harvest_revenue = round(total_yield * predicted)
+    peak_revenue = round(total_yield * peak_price)
+    extra_if_held = peak_revenue - harvest_revenue
+
+    # Cultivation cost
+    cost_per_acre = CULTIVATION_COST.get(crop, 12000)
+    total_cost = round(cost_per_acre * land_size)
+    net_profit = harvest_revenue - total_cost
+    peak_net_profit = peak_revenue - total_cost
+
+    # ── Step 9: Best sell window ──
+    hold_days = profile.get("hold_advice_days", 0)
+    best_sell_date = harvest_date + timedelta(days=hold_days)
+    month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                   "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    best_sell_months = [month_names[m - 1] for m in peak_months] if peak_months else []
+
+    # ── Step 10: Confidence (based on data years + forecast error) ──
+    data_years = len(yearly_prices) if 'yearly_prices' in dir() else 0
+    if r_squared > 0.7 and data_years >= 8:
+        confidence = "high"
+    elif r_squared > 0.4 and data_years >= 5:
+        confidence = "medium"
+    else:
+        confidence = "low"
+
+    # ── Step 11: Advice ──
+    storage_loss = profile.get("storage_loss_pct", 1.0)
+    if hold_days <= 3 or storage_loss > 10:
+        advice = f"Sell immediately after harvest — {crop} is perishable with {storage_loss}% monthly loss."
+        sell_strategy = "sell_now"
+    elif extra_if_held > 0 and hold_days <= 90:
+        net_gain = extra_if_held - (harvest_revenue * storage_loss / 100 * (hold_days / 30))
+        if net_gain > 0:
+            advice = f"Store for {hold_days} days after harvest. Prices peak in {', '.join(best_sell_months)}. Expected extra revenue: ₹{round(net_gain):,}."
+            sell_strategy = "hold"
+        else:
+            advice = f"Sell at harvest — storage costs outweigh the ₹{extra_if_held:,} price gain."
+            sell_strategy = "sell_at_harvest"
+    else:
+        advice = f"Sell at harvest. Current trend suggests stable prices."
+        sell_strategy = "sell_at_harvest"
+
+    # ── Build monthly price curve from REAL data ──
+    monthly_curve = []
+    for m in range(12):
+        real_price = get_monthly_price(crop, 2025, m + 1)
+        avg = real_price if real_price > 0 else profile["base_price"] * profile["seasonal_curve"][m]
+        monthly_curve.append({
+            "month": month_names[m],
+            "price": round(avg * state_factor),
+            "is_harvest": (m + 1) in profile.get("harvest_months", []),
+            "is_peak": (m + 1) in peak_months,
+        })
+
+    return {
+        "crop": crop,
+        "category": profile.get("category", ""),
+        "state": state,
+        "sowing_date": sow.strftime("%Y-%m-%d"),
+        "harvest_date": harvest_date.strftime("%Y-%m-%d"),
+        "growth_days": growth_days,
+        "days_to_harvest": max(0, (harvest_date - today).days),
+
+        "current_price": current_price,
+        "predicted_harvest_price": predicted,
+        "price_change": price_change,
+        "price_change_pct": price_change_pct,
+        "price_unit": "₹/quintal",
+        "msp": msp,
+
+        "peak_price": peak_price,
+        "best_sell_date": best_sell_date.strftime("%Y-%m-%d"),
+        "best_sell_months": best_sell_months,
+        "hold_days": hold_days,
+        "sell_strategy": sell_strategy,
+
+        "yield_per_acre": yield_per_acre,
+        "yield_unit": "quintals",
+        "land_size": land_size,
+        "total_yield": total_yield,
+        "cultivation_cost": total_cost,
+        "harvest_revenue": harvest_revenue,
+        "net_profit": net_profit,
+        "peak_revenue": peak_revenue,
+        "peak_net_profit": peak_net_profit,
+        "extra_if_held": max(0, extra_if_held),
+
+        "confidence": confidence,
+        "r_squared": round(r_squared, 3),
+        "advice": advice,
+
+        "monthly_curve": monthly_curve,
+    }
+
+
+def legacy_bulk_forecast(
+    state: str = "Maharashtra",
+    land_size: float = 1.0,
+    sowing_date: str = None,
+    crops: List[str] = None,
+) -> Dict:
+    """Forecast for multiple crops at once (regional or specified)."""
+    if not crops:
+        # Use all crops except Sugarcane (priced per tonne, not per quintal)
+        crops = [c for c in CROP_PROFILES.keys() if c != "Sugarcane"]
+
+    results = []
+    for crop in crops:
+        fc = legacy_predict_harvest_price(crop, state, sowing_date, land_size)
+        if "error" not in fc:
+            results.append(fc)
+
+    # Sort by revenue potential (descending)
+    results.sort(key=lambda x: x.get("harvest_revenue", 0), reverse=True)
+
+    return {
+        "state": state,
+        "land_size": land_size,
+        "total_crops": len(results),
+        "total_categories": len(set(r["category"] for r in results)),
+        "forecasts": results,
+        "generated_at": datetime.now().isoformat(),
+    }
+
+
+# ── Harness ────────────────────────────────────────────────
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def check_parity() -> List[str]:
+    """Differences between legacy and table forecasts (generated_at excluded)."""
+    problems = []
+    states = list(STATE_PRICE_FACTOR) + ["Goa"]          # Goa: no state factors → defaults
+    sowing = [f"2025-{m:02d}-15" for m in range(1, 13)] + [None, "not-a-date"]
+    for state in states:
+        for sow in sowing:
+            for land in (0.1, 1.0, 2.5, 37.3):
+                for crop in CROP_PROFILES:
+                    want = legacy_predict_harvest_price(crop, state, sow, land)
+                    got = predict_harvest_price(crop.upper(), state, sow, land)
+                    if got != want:
+                        diff = sorted(k for k in want if got.get(k) != want[k])
+                        problems.append(f"{crop}/{state}/{sow}/{land}: {diff}")
+            legacy = legacy_bulk_forecast(state, 1.0, sow)
+            bulk = get_bulk_forecast(state, 1.0, sow)
+            if legacy["forecasts"] != bulk["forecasts"]:
+                problems.append(f"bulk/{state}/{sow}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    HarvestForecastTables()
+    build_ms = (time.perf_counter() - t) * 1000
+    get_forecast_tables()
+
+    cases = [
+        ("single crop", lambda: legacy_predict_harvest_price("Wheat", "Punjab", "2025-11-01", 2.0),
+         lambda: predict_harvest_price("Wheat", "Punjab", "2025-11-01", 2.0)),
+        ("bulk (all crops)", lambda: legacy_bulk_forecast("Maharashtra", 2.0, "2025-06-15"),
+         lambda: get_bulk_forecast("Maharashtra", 2.0, "2025-06-15")),
+    ]
+
+    print("=" * 64)
+    print(f"🌾 Harvest forecast tables — {len(CROP_PROFILES)} crops")
+    print("=" * 64)
+    print(f"table build          : {build_ms:8.1f} ms (once per process / data change)")
+    print(f"{'':20s}  {'legacy ms':>10} {'tables ms':>10} {'speed-up':>9}")
+    for name, legacy, new in cases:
+        legacy_ms = _best_ms(legacy, args.repeat)
+        new_ms = _best_ms(new, args.repeat)
+        print(f"{name:20s}  {legacy_ms:>10.3f} {new_ms:>10.3f} {legacy_ms / max(new_ms, 1e-6):>8.1f}x")
+
+    problems = check_parity()
+    print("parity               : " + ("✅ identical" if not problems else
+                                       f"❌ {len(problems)} differences, e.g. " + "; ".join(problems[:5])))
@@ -0,0 +1,177 @@
+"""
+SmartAgri AI - Mandi Price Index Benchmark
+
+Compares the original full-frame pandas lookups in MarketService (copy +
+.str.lower() filters + sort/groupby per request) with the precomputed
+MarketIndex (services/market_index.py) on a synthetic mandi table:
+  • build   — one-off index construction time and array memory
+  • latency — latest-prices (country / state / district), crop prices,
+              trend series and volatility per request
+  • parity  — same commodities, dates and prices as the legacy answers
+
+Run from the server/ directory:
+
+    python -m benchmarks.market_index                        # 10M rows in memory
+    python -m benchmarks.market_index --rows 1000000 --repeat 5
+    python -m benchmarks.market_index --csv /tmp/mandi_10m.csv   # write once, then load from file
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.market_index import COLUMNS, MarketIndex
+
+
+# ── Synthetic data ─────────────────────────────────────────
+
+def synthetic_mandi(rows: int, commodities: int = 150, states: int = 28,
+                    districts: int = 600, markets: int = 2400, days: int = 1095,
+                    seed: int = 7) -> pd.DataFrame:
+    """Mandi-shaped frame; district → state and market → district are consistent."""
+    rng = np.random.default_rng(seed)
+    district_state = rng.integers(0, states, districts)
+    market_district = rng.integers(0, districts, markets)
+    market = rng.integers(0, markets, rows)
+    district = market_district[market]
+    commodity = rng.integers(0, commodities, rows)
+    base = rng.uniform(800, 12000, commodities)[commodity]
+    modal = (base * rng.uniform(0.7, 1.3, rows)).astype(np.int64)
+    spread = (modal * rng.uniform(0.05, 0.2, rows)).astype(np.int64)
+
+    def cat(codes, prefix, n):
+        return pd.Categorical.from_codes(codes, [f"{prefix} {i}" for i in range(n)])
+
+    return pd.DataFrame({
+        "commodity": cat(commodity, "crop", commodities),
+        "state": cat(district_state[district], "State", states),
+        "district": cat(district, "District", districts),
+        "market": cat(market, "Mandi", markets),
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, days, rows), unit="D"),
+        "min_price": modal - spread,
+        "max_price": modal + spread,
+        "modal_price": modal,
+    })
+
+
+def load_csv(path: str, rows: int) -> pd.DataFrame:
+    if not os.path.exists(path):
+        print(f"✍️  Writing {rows:,} synthetic rows to {path} ...")
+        synthetic_mandi(rows).to_csv(path, index=False, chunksize=500_000)
+    df = pd.read_csv(path, dtype={c: "category" for c in ("commodity", "state", "district", "market")})
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+# ── Legacy reference (pre-index MarketService) ────────────
+
+def legacy_all_prices(data: pd.DataFrame, state=None, district=None) -> list:
+    df = data.copy()
+    if state:
+        df = df[df["state"].str.lower() == state.lower()]
+    if district:
+        df = df[df["district"].str.lower() == district.lower()]
+    latest = df.sort_values("date", ascending=False).groupby("commodity", observed=True).first().reset_index()
+    return latest.to_dict("records")
+
+
+def legacy_prices(data: pd.DataFrame, crop: str, state=None) -> list:
+    mask = data["commodity"].str.lower() == crop.lower()
+    if state:
+        mask &= data["state"].str.lower() == state.lower()
+    return data[mask].sort_values("date", ascending=False).head(10).to_dict("records")
+
+
+def legacy_trend_series(data: pd.DataFrame, crop: str) -> pd.DataFrame:
+    mask = data["commodity"].str.lower() == crop.lower()
+    return data[mask].sort_values("date")
+
+
+def legacy_volatility(data: pd.DataFrame, crop: str) -> tuple:
+    prices = data[data["commodity"].str.lower() == crop.lower()]["modal_price"]
+    return prices.mean(), prices.std()
+
+
+# ── Harness ────────────────────────────────────────────────
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def check_parity(df: pd.DataFrame, index: MarketIndex, crop: str, state: str, district: str) -> list:
+    """Differences between legacy and indexed answers (ties across mandis compare by date + commodity)."""
+    problems = []
+    for args in ((), (state,), (None, district), (state, district)):
+        legacy = legacy_all_prices(df, *args)
+        new = index.latest(*args)
+        got = [(r["commodity"], r["date"]) for r in new]
+        want = [(str(r["commodity"]), r["date"].strftime("%Y-%m-%d")) for r in legacy]
+        if sorted(got) != sorted(want):
+            problems.append(f"latest{args}: {len(got)} vs {len(want)} rows differ")
+
+    series = legacy_trend_series(df, crop)
+    positions = index.history(crop)
+    if index.dates(positions) != series["date"].dt.strftime("%Y-%m-%d").tolist():
+        problems.append("history dates differ")
+    if sorted(index.prices["modal_price"][positions].tolist()) != sorted(series["modal_price"].tolist()):
+        problems.append("history prices differ")
+
+    mean, std = legacy_volatility(df, crop)
+    stats = index.stats(crop)
+    if not (np.isclose(stats["mean"], mean) and np.isclose(stats["std"], std)):
+        problems.append(f"volatility differs: {stats} vs ({mean}, {std})")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--csv", default=None, help="load (and first write) the synthetic table as CSV")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    df = load_csv(args.csv, args.rows) if args.csv else synthetic_mandi(args.rows)
+    load_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    index = MarketIndex(df[list(COLUMNS)])
+    build_s = time.perf_counter() - t
+
+    crop, state = "crop 42", "state 3"  # lookups are case-insensitive, like the API
+    district = str(df.loc[df["state"] == "State 3", "district"].iloc[0])
+
+    cases = [
+        ("latest prices (all)", lambda: legacy_all_prices(df), lambda: index.latest()),
+        ("latest prices (state)", lambda: legacy_all_prices(df, state), lambda: index.latest(state)),
+        ("latest prices (district)", lambda: legacy_all_prices(df, state, district),
+         lambda: index.latest(state, district)),
+        ("crop prices (state)", lambda: legacy_prices(df, crop, state),
+         lambda: index.records(index.history(crop, state)[::-1][:10])),
+        ("trend series", lambda: legacy_trend_series(df, crop),
+         lambda: index.records(index.history(crop), ("date", "min_price", "max_price", "modal_price"))),
+        ("volatility", lambda: legacy_volatility(df, crop), lambda: index.stats(crop)),
+    ]
+
+    print("=" * 72)
+    print(f"📈 Mandi index — {len(df):,} rows, {df['commodity'].nunique()} commodities, "
+          f"{df['district'].nunique()} districts")
+    print("=" * 72)
+    print(f"load                  : {load_s:8.2f} s")
+    print(f"index build           : {build_s:8.2f} s   ({index.nbytes / 1e6:.0f} MB arrays, "
+          f"frame {df.memory_usage(deep=True).sum() / 1e6:.0f} MB)")
+    print(f"{'':26s}  {'legacy ms':>10} {'index ms':>10} {'speed-up':>9}")
+    for name, legacy, new in cases:
+        legacy_ms = _best_ms(legacy, args.repeat)
+        new_ms = _best_ms(new, max(args.repeat, 20))
+        print(f"{name:26s}  {legacy_ms:>10.1f} {new_ms:>10.3f} {legacy_ms / max(new_ms, 1e-6):>8.0f}x")
+
+    problems = check_parity(df, index, crop, state, district)
+    print("parity                : " + ("✅ identical" if not problems else "❌ " + "; ".join(problems)))
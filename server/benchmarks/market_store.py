@@ -0,0 +1,137 @@
+"""
+SmartAgri AI - Mandi Price Store Memory Benchmark
+
+Starts N worker processes the way a multi-worker uvicorn / gunicorn
+deployment does and reports each worker's memory once its market index is
+loaded and has served price-history queries:
+  • csv    — every worker parses the CSV and builds its own MarketIndex
+             (the previous MarketService behaviour)
+  • store  — every worker memory-maps the on-disk MarketStore
+             (services/market_store.py), built once beforehand as on
+             the first start after the CSV changes
+
+RSS counts shared page-cache pages in every process; PSS splits them across
+the processes sharing them and USS is memory private to one worker, so
+sum(PSS) is what the deployment really costs. Linux only (/proc).
+
+Run from the server/ directory:
+
+    python -m benchmarks.market_store                         # 5M rows, 4 workers
+    python -m benchmarks.market_store --rows 10000000 --workers 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.market_index import synthetic_mandi
+
+
+def _memory_mb() -> dict:
+    """RSS / PSS / USS of this process from /proc/self/smaps_rollup."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def _worker(mode: str, csv_path: str, store_dir: str, barrier, results):
+    from services.market_index import MarketIndex
+    from services.market_store import load_index
+
+    before = _memory_mb()
+    t = time.perf_counter()
+    if mode == "csv":
+        index = MarketIndex(_read_csv(csv_path))
+    else:
+        index, _ = load_index(csv_path, store_dir, lambda: MarketIndex(_read_csv(csv_path)))
+    load_s = time.perf_counter() - t
+
+    # What get_price_history / get_trend touch: one commodity's rows of a few columns
+    t = time.perf_counter()
+    for crop in index.commodities():
+        index.records(index.history(crop)[-90:])
+        index.stats(crop)
+    query_ms = (time.perf_counter() - t) * 1000 / max(len(index.commodities()), 1)
+
+    barrier.wait()              # every worker is loaded → shared pages are really shared
+    results.put({"pid": os.getpid(), "load_s": load_s, "query_ms": query_ms,
+                 "before": before, "after": _memory_mb()})
+    barrier.wait()              # stay alive until everyone has measured
+
+
+def run(mode: str, workers: int, csv_path: str, store_dir: str) -> list:
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = []
+    for _ in range(workers):
+        p = ctx.Process(target=_worker, args=(mode, csv_path, store_dir, barrier, results))
+        p.start()
+        procs.append(p)
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return sorted(rows, key=lambda r: r["pid"])
+
+
+def report(mode: str, rows: list):
+    print(f"\n[{mode}]  {'worker':>8} {'load s':>7} {'query ms':>9} "
+          f"{'RSS before':>11} {'RSS after':>10} {'PSS':>8} {'USS':>8}")
+    for r in rows:
+        print(f"{'':8s}{r['pid']:>8} {r['load_s']:>7.2f} {r['query_ms']:>9.3f} "
+              f"{r['before']['rss']:>10.0f}M {r['after']['rss']:>9.0f}M "
+              f"{r['after']['pss']:>7.0f}M {r['after']['uss']:>7.0f}M")
+    total = {k: sum(r["after"][k] for r in rows) for k in ("rss", "pss", "uss")}
+    print(f"{'':8s}{'total':>8} {'':>7} {'':>9} {'':>11} {total['rss']:>9.0f}M "
+          f"{total['pss']:>7.0f}M {total['uss']:>7.0f}M")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--keep", action="store_true", help="keep the temp CSV / store directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="market_store_bench_")
+    csv_path = os.path.join(workdir, "mandi_prices.csv")
+    store_dir = os.path.join(workdir, "store")
+    print(f"✍️  Writing {args.rows:,} synthetic rows to {csv_path} ...")
+    synthetic_mandi(args.rows).to_csv(csv_path, index=False, chunksize=500_000)
+
+    print("=" * 78)
+    print(f"📦 Mandi price store — {args.rows:,} rows, {args.workers} workers")
+    print("=" * 78)
+    try:
+        from services.market_index import MarketIndex
+        from services.market_store import load_index
+        t = time.perf_counter()
+        load_index(csv_path, store_dir, lambda: MarketIndex(_read_csv(csv_path)))
+        print(f"store build (one-off) : {time.perf_counter() - t:.2f} s")
+        results = {mode: run(mode, args.workers, csv_path, store_dir) for mode in ("csv", "store")}
+        for mode, rows in results.items():
+            report(mode, rows)
+        csv_pss = sum(r["after"]["pss"] for r in results["csv"])
+        store_pss = sum(r["after"]["pss"] for r in results["store"])
+        print(f"\nTotal PSS: {csv_pss:.0f} MB → {store_pss:.0f} MB "
+              f"({csv_pss / max(store_pss, 1e-6):.1f}x less)")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,119 @@
+"""
+SmartAgri AI - Crop Price Tensor Benchmark
+
+Compares the original dict-walking real_crop_prices lookups (three nested
+dict lookups per year / month) with the dense (crop, year, month) tensor
+in services/price_tensor.py:
+  • history  — get_all_monthly_history for every crop
+  • monthly  — get_monthly_price for every crop × month of 2025
+  • peak     — peak-month price for every crop
+  • curves   — every crop's 2025 monthly curve as one array
+and checks the results are identical. Also times the memory-mapped load
+against compiling the tensor from the dicts.
+
+Run from the server/ directory:
+
+    python -m benchmarks.price_tensor
+    python -m benchmarks.price_tensor --repeat 50
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from services.harvest_forecast_service import CROP_PROFILES
+from services.price_tensor import PriceTensor, load_tensor
+from services.real_crop_prices import (
+    REAL_SEASONAL, get_all_monthly_history, get_historical_price, get_monthly_price, get_peak_price,
+)
+
+
+# ── Legacy reference (pre-tensor real_crop_prices) ────────
+
+def legacy_monthly_price(crop: str, year: int, month: int) -> float:
+    base = get_historical_price(crop, year)
+    if base == 0:
+        return 0
+    seasonal = REAL_SEASONAL.get(crop)
+    if seasonal:
+        return base * seasonal[month - 1]
+    return base
+
+
+def legacy_monthly_history(crop: str) -> list:
+    records = []
+    for year in range(2015, 2026):
+        for month in range(1, 13):
+            price = legacy_monthly_price(crop, year, month)
+            if price > 0:
+                records.append({
+                    "year": year, "month": month,
+                    "price": round(price),
+                    "min_price": round(price * 0.88),
+                    "max_price": round(price * 1.12),
+                })
+    return records
+
+
+def legacy_peak(crop: str, months: list) -> float:
+    prices = [p for p in (legacy_monthly_price(crop, 2025, m) for m in months) if p > 0]
+    return max(prices) if prices else 0
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    crops = list(CROP_PROFILES)
+    peaks = {c: CROP_PROFILES[c].get("peak_months", []) for c in crops}
+    tensor = PriceTensor.compile()
+    rows = np.array([tensor.row(c) if tensor.row(c) is not None else -1 for c in crops])
+
+    print("=" * 64)
+    print(f"🧮 Crop price tensor — {len(crops)} crops, {tensor.prices.shape} tensor")
+    print("=" * 64)
+    print(f"{'':22s} {'dicts ms':>10} {'tensor ms':>10} {'speed-up':>9}")
+    cases = [
+        ("history (all crops)", lambda: [legacy_monthly_history(c) for c in crops],
+         lambda: [get_all_monthly_history(c) for c in crops]),
+        ("monthly 2025 × 12", lambda: [[legacy_monthly_price(c, 2025, m) for m in range(1, 13)] for c in crops],
+         lambda: [[get_monthly_price(c, 2025, m) for m in range(1, 13)] for c in crops]),
+        ("peak price", lambda: [legacy_peak(c, peaks[c]) for c in crops],
+         lambda: [get_peak_price(c, 2025, peaks[c]) for c in crops]),
+        ("2025 curves (array)", lambda: np.array([[legacy_monthly_price(c, 2025, m) for m in range(1, 13)]
+                                                  for c in crops]),
+         lambda: np.where(rows[:, None] >= 0, tensor.prices[rows, tensor.year_column(2025)], 0.0)),
+    ]
+    for name, legacy, fast in cases:
+        legacy_ms, fast_ms = _best_ms(legacy, args.repeat), _best_ms(fast, args.repeat)
+        print(f"{name:22s} {legacy_ms:>10.3f} {fast_ms:>10.3f} {legacy_ms / max(fast_ms, 1e-6):>8.1f}x")
+
+    workdir = tempfile.mkdtemp(prefix="price_tensor_bench_")
+    try:
+        t = time.perf_counter()
+        load_tensor(workdir)
+        first_ms = (time.perf_counter() - t) * 1000
+        mapped_ms = _best_ms(lambda: load_tensor(workdir), args.repeat)
+        compile_ms = _best_ms(PriceTensor.compile, args.repeat)
+        print(f"\nload: compile {compile_ms:.2f} ms · first start (compile + write) {first_ms:.2f} ms "
+              f"· memory-mapped {mapped_ms:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    ok = all(legacy_monthly_history(c) == get_all_monthly_history(c) for c in crops)
+    ok &= all(legacy_monthly_price(c, y, m) == get_monthly_price(c, y, m)
+              for c in crops for y in (2010, 2015, 2020, 2025, 2030) for m in range(1, 13))
+    ok &= all(legacy_peak(c, peaks[c]) == get_peak_price(c, 2025, peaks[c]) for c in crops)
+    print("parity               : " + ("✅ identical" if ok else "❌ differs"))
@@ -0,0 +1,169 @@
+"""
+SmartAgri AI - Exponential Smoothing Engine Benchmark
+
+Compares the original single-series _holt_forecast (pure Python, smoothing
+loop run twice) with the vectorized engine in services/smoothing.py:
+  • holt          — 50 crops × 12 harvest months × 11 years of real prices
+                    (the harvest-forecast workload), plus a larger synthetic
+                    tensor; forecasts / trends / errors must be bit-identical
+  • fit_holt      — alpha / beta grid search per series, cold and cached,
+                    checked against a brute-force scalar search
+  • holt_winters  — 50 crops × 132 monthly prices, checked against a scalar
+                    reference on every series
+
+Run from the server/ directory:
+
+    python -m benchmarks.smoothing
+    python -m benchmarks.smoothing --series 100000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.harvest_forecast_service import CROP_PROFILES
+from services.real_crop_prices import get_all_monthly_history
+from services.smoothing import GRID, fit_holt, holt, holt_winters
+
+
+# ── Legacy reference (pre-engine harvest_forecast_service) ─
+
+def legacy_holt_forecast(prices, alpha: float = 0.4, beta: float = 0.2, steps: int = 1) -> tuple:
+    if len(prices) < 2:
+        return prices[-1] if prices else 0, 0, 15.0
+
+    level = prices[0]
+    trend = prices[1] - prices[0]
+    errors = []
+    for i, actual in enumerate(prices[1:], 1):
+        forecast = level + trend
+        error = abs(actual - forecast) / actual * 100 if actual > 0 else 0
+        errors.append(error)
+        level = alpha * actual + (1 - alpha) * (level + trend)
+        trend = beta * (level - (alpha * actual + (1 - alpha) * level - trend * (1 - alpha))) + (1 - beta) * trend
+        trend = beta * (level - (level - trend / beta * beta)) + (1 - beta) * trend
+
+    level = prices[0]
+    trend = (prices[-1] - prices[0]) / (len(prices) - 1) if len(prices) > 1 else 0
+    errors = []
+    for actual in prices[1:]:
+        prev_level = level
+        level = alpha * actual + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        forecast = prev_level + trend
+        if actual > 0:
+            errors.append(abs(actual - forecast) / actual * 100)
+
+    prediction = level + trend * steps
+    avg_error = sum(errors) / len(errors) if errors else 10.0
+    return prediction, trend, avg_error
+
+
+def scalar_holt_winters(x, period=12, alpha=0.3, beta=0.1, gamma=0.3, steps=1):
+    """Textbook multiplicative Holt-Winters on one list."""
+    level = sum(x[:period]) / period
+    trend = (sum(x[period:2 * period]) / period - level) / period
+    season = [v / level for v in x[:period]]
+    for t, actual in enumerate(x):
+        s = season[t % period]
+        new_level = alpha * actual / s + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[t % period] = gamma * actual / new_level + (1 - gamma) * s
+        level = new_level
+    return [(level + h * trend) * season[(len(x) + h - 1) % period] for h in range(1, steps + 1)]
+
+
+# ── Workloads ──────────────────────────────────────────────
+
+def harvest_tensor() -> np.ndarray:
+    """crop × harvest month × year (2015-2025), NaN where a year has no price."""
+    tensor = np.full((len(CROP_PROFILES), 12, 11), np.nan)
+    for i, crop in enumerate(CROP_PROFILES):
+        for r in get_all_monthly_history(crop):
+            tensor[i, r["month"] - 1, r["year"] - 2015] = r["price"]
+    return tensor
+
+
+def synthetic_tensor(series: int, years: int = 11, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    walk = rng.uniform(1000, 9000, (series, 1)) * np.cumprod(1 + rng.normal(0.04, 0.08, (series, years)), axis=1)
+    walk = np.round(walk)
+    walk[rng.random(walk.shape) < 0.05] = np.nan          # a few missing years
+    return walk
+
+
+def _as_lists(tensor: np.ndarray) -> list:
+    flat = tensor.reshape(-1, tensor.shape[-1])
+    return [[v for v in row if not np.isnan(v)] for row in flat.tolist()]
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def holt_parity(tensor: np.ndarray) -> bool:
+    want = np.array([legacy_holt_forecast(s) for s in _as_lists(tensor)], dtype=np.float64)
+    got = np.stack([a.ravel() for a in holt(tensor)], axis=1)
+    return np.array_equal(want, got)
+
+
+def fit_parity(tensor: np.ndarray, samples: int = 40) -> bool:
+    alpha, beta, error = fit_holt(tensor)
+    lists = _as_lists(tensor)
+    for k in np.linspace(0, len(lists) - 1, samples).astype(int):
+        best = min(legacy_holt_forecast(lists[k], a, b)[2] for a in GRID for b in GRID)
+        if not np.isclose(best, error.ravel()[k]):
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=20_000, help="synthetic Holt series")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    harvest = harvest_tensor()
+    synthetic = synthetic_tensor(args.series)
+    monthly = harvest.transpose(0, 2, 1).reshape(len(CROP_PROFILES), -1)   # crop × 132 months
+    dense = monthly[~np.isnan(monthly).any(axis=1)]
+    harvest_lists, synthetic_lists = _as_lists(harvest), _as_lists(synthetic)
+
+    print("=" * 72)
+    print(f"📈 Exponential smoothing — {harvest.shape[0]}×{harvest.shape[1]} harvest series, "
+          f"{args.series:,} synthetic, {len(dense)} monthly")
+    print("=" * 72)
+    print(f"{'':34s}  {'scalar ms':>10} {'vector ms':>10} {'speed-up':>9}")
+    cases = [
+        ("holt, 50 crops × 12 months", lambda: [legacy_holt_forecast(s) for s in harvest_lists],
+         lambda: holt(harvest)),
+        (f"holt, {args.series:,} series", lambda: [legacy_holt_forecast(s) for s in synthetic_lists],
+         lambda: holt(synthetic)),
+        ("holt_winters, 132 months", lambda: [scalar_holt_winters(s.tolist(), steps=12) for s in dense],
+         lambda: holt_winters(dense, steps=12)),
+    ]
+    for name, scalar, vector in cases:
+        scalar_ms = _best_ms(scalar, max(1, args.repeat // 5))
+        vector_ms = _best_ms(vector, args.repeat)
+        print(f"{name:34s}  {scalar_ms:>10.2f} {vector_ms:>10.2f} {scalar_ms / max(vector_ms, 1e-6):>8.1f}x")
+
+    scalar_fit_ms = _best_ms(lambda: [min(legacy_holt_forecast(s, a, b)[2] for a in GRID for b in GRID)
+                                      for s in harvest_lists], 1)
+    t = time.perf_counter()
+    fit_holt(harvest.copy() + 0.0)
+    cold_ms = (time.perf_counter() - t) * 1000
+    warm_ms = _best_ms(lambda: fit_holt(harvest), args.repeat)
+    print(f"{'fit_holt 9×9 grid, 600 series':34s}  {scalar_fit_ms:>10.2f} {cold_ms:>10.2f} "
+          f"{scalar_fit_ms / max(cold_ms, 1e-6):>8.1f}x   (cached: {warm_ms:.3f} ms)")
+
+    hw = holt_winters(dense, steps=12)[0]
+    hw_ok = all(np.allclose(hw[k], scalar_holt_winters(dense[k].tolist(), steps=12)) for k in range(len(dense)))
+    checks = [("holt (harvest)", holt_parity(harvest)), ("holt (synthetic)", holt_parity(synthetic)),
+              ("fit_holt", fit_parity(harvest)), ("holt_winters", hw_ok)]
+    for name, ok in checks:
+        print(f"parity {name:27s}: " + ("✅ identical" if ok else "❌ differs"))
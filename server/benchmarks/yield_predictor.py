@@ -0,0 +1,98 @@
+"""
+SmartAgri AI - Yield Predictor Latency Benchmark
+
+Compares the straightforward way of serving yield_predictor.joblib — per
+crop, three LabelEncoder.transform calls, scaler.transform and predict on
+one row — with services/yield_prediction_service.py, which encodes through
+precomputed lookup arrays and predicts all candidate crops in one call:
+  • parity   — both paths on every (crop, state, season) the encoders know
+  • latency  — p50 / p95 for a recommendation's 3 candidate crops and for
+               an every-crop compare / bulk batch
+  • unseen   — unknown state (averaged over known states), unknown or
+               missing season (the crop's own seasons) and unknown crop
+               (None → reference yield)
+
+Run from the server/ directory (train the model first with
+ml/train_yield_model.py if ml_models/ has no loadable yield_predictor.joblib):
+
+    python -m benchmarks.yield_predictor
+    python -m benchmarks.yield_predictor --model-dir ./ml_models --rounds 500
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+
+from services.yield_prediction_service import YieldPredictor
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LegacyYieldPath:
+    """Per-crop LabelEncoder.transform + scaler.transform + predict."""
+
+    def __init__(self, model_dir: str):
+        load = lambda name: joblib.load(os.path.join(model_dir, f"{name}.joblib"))
+        self.model = load("yield_predictor")
+        self.state_enc = load("label_encoder_state")
+        self.crop_enc = load("label_encoder_yield_crop")
+        self.season_enc = load("label_encoder_season")
+        self.scaler = load("scaler_yield")
+
+    def predict(self, crop: str, state: str, season: str) -> float:
+        x = np.array([[
+            self.state_enc.transform([state])[0],
+            self.crop_enc.transform([crop.lower()])[0],
+            self.season_enc.transform([season])[0],
+            self.scaler.mean_[3],
+        ]], dtype=np.float64)
+        return round(float(self.model.predict(self.scaler.transform(x))[0]), 2)
+
+
+def _latency(fn, rounds: int) -> tuple:
+    fn()  # warm-up
+    times = []
+    for _ in range(rounds):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    times.sort()
+    return times[len(times) // 2] * 1000, times[min(len(times) - 1, int(len(times) * 0.95))] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=os.path.join(SERVER_DIR, "ml_models"))
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    legacy = LegacyYieldPath(args.model_dir)
+    service = YieldPredictor(args.model_dir)
+    states = [str(s) for s in legacy.state_enc.classes_]
+    crops = [str(c) for c in legacy.crop_enc.classes_]
+    seasons = [str(s) for s in legacy.season_enc.classes_]
+
+    queries = [(c, s, z) for c in crops for s in states for z in seasons]
+    want = [legacy.predict(*q) for q in queries]
+    got = service.predict_many(queries)
+    max_diff = max(abs(a - b) for a, b in zip(want, got))
+
+    print("=" * 66)
+    print(f"🌱 Yield predictor — {len(crops)} crops × {len(states)} states × {len(seasons)} seasons")
+    print("=" * 66)
+    print(f"parity ({len(queries)} queries) : max |Δ| = {max_diff:.4f} t/ha "
+          + ("✅" if max_diff <= 0.011 else "❌"))
+    print(f"\n{'':22s} {'legacy p50':>11} {'p95':>8} {'batched p50':>12} {'p95':>8}")
+    for label, batch in (("3 candidates", [(c, "Punjab", "Kharif") for c in ("rice", "maize", "cotton")]),
+                         (f"{len(crops)} crops", [(c, "Maharashtra", "Rabi") for c in crops])):
+        l50, l95 = _latency(lambda: [legacy.predict(*q) for q in batch], args.rounds)
+        b50, b95 = _latency(lambda: service.predict_many(batch), args.rounds)
+        print(f"{label:22s} {l50:>9.3f}ms {l95:>6.3f}ms {b50:>10.3f}ms {b95:>6.3f}ms   "
+              f"({l50 / max(b50, 1e-9):.1f}x)")
+
+    unseen = [("rice", "Goa", "Kharif"), ("wheat", "Punjab", "Zaid"), ("rice", None, None), ("quinoa", "Punjab", "Rabi")]
+    print("\nunseen categories:")
+    for q, y in zip(unseen, service.predict_many(unseen)):
+        print(f"  {str(q):36s} → {y if y is not None else 'None (reference yield)'}")
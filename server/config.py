@@ -25,11 +25,61 @@ class Settings(BaseSettings):
 
     # ML
     MODEL_DIR: str = "./ml_models"
+    MODEL_CACHE_DIR: str = "./model_cache"  # local HF hub cache (HF_HOME) so restarts skip downloads
+    MODEL_CACHE_OFFLINE: bool = False       # load from MODEL_CACHE_DIR only, never hit the hub
+    REQUIRED_MODELS: str = "disease,crop_recommender"  # /api/health/ready waits for these
+    MODEL_RETRY_BASE_S: float = 5.0         # first retry after a failed model load; doubles per failure
+    MODEL_RETRY_MAX_S: float = 300.0        # backoff cap between retries
+
+    CROP_MODEL_BACKEND: str = "compiled"   # crop RandomForest: compiled (flattened node arrays) | sklearn
+    PRICE_FORECAST_WINDOW_DAYS: int = 30   # recent mandi days whose mean min / max prices feed the price model
+
+    # Recommendation result cache (quick / what-if)
+    RECOMMEND_CACHE_SIZE: int = 4096       # LRU entries (0 = cache disabled)
+    RECOMMEND_CACHE_TTL_S: int = 3600      # entry lifetime in seconds
+    RECOMMEND_CACHE_BUCKETS: str = "N=5,P=5,K=5,ph=0.1,temperature=1,humidity=1,rainfall=5"  # input snapping steps
+    RECOMMEND_ARTIFACT_POLL_S: float = 5.0  # re-stat MODEL_DIR this often; reload models + clear cache on change
+
+    # Disease inference micro-batching
+    DISEASE_BATCH_SIZE: int = 8            # max images per forward pass
+    DISEASE_BATCH_MAX_WAIT_MS: int = 25    # max time the first image waits for company
+    DISEASE_WORKERS: int = 1               # inference processes (0 = threads in the API process)
+    DISEASE_TORCH_THREADS: int = 0         # intra-op threads per worker (0 = library default)
+    DISEASE_QUEUE_MAX: int = 64            # pending images before new uploads get HTTP 503
+    DISEASE_REQUEST_TIMEOUT_S: float = 30  # per-upload wait limit before HTTP 504
+    DISEASE_BACKEND: str = "hf"            # hf (transformers/PyTorch) | onnx (ONNX Runtime)
+    DISEASE_ONNX_DIR: str = "./ml_models/disease_onnx"   # output of ml/export_disease_onnx.py
+    DISEASE_ONNX_QUANTIZED: bool = False   # use the INT8 dynamic-quantized graphs
+    DISEASE_ONNX_THREADS: int = 0          # ORT intra-op threads (0 = physical cores)
+    DISEASE_SIMULATION_FALLBACK: bool = False  # dev only: simulated diagnosis while models are unavailable
+
+    # Disease diagnosis result cache
+    DISEASE_CACHE_SIZE: int = 2048         # in-memory LRU entries (0 = cache disabled)
+    DISEASE_CACHE_PHASH: bool = True       # also match near-duplicate re-encodes by dHash
+    DISEASE_CACHE_DIR: str = ""            # optional on-disk tier, e.g. ./cache/disease
 
     # External APIs
     OPENWEATHER_API_KEY: str = ""
+    OPENWEATHER_BASE_URL: str = "https://api.openweathermap.org/data/2.5"  # point at a local stub in tests
+    WEATHER_CURRENT_TTL_S: int = 600       # current conditions cache lifetime
+    WEATHER_FORECAST_TTL_S: int = 3600     # forecast cache lifetime
+    WEATHER_STALE_MAX_S: int = 86400       # serve cached data this old when the upstream fails
+    WEATHER_HTTP_TIMEOUT_S: float = 10     # per-request upstream timeout
+    WEATHER_MAX_CONNECTIONS: int = 20      # shared connection pool size
+    WEATHER_GRID_DEG: float = 0.25         # cache cell size; every farm in a cell shares one fetch
+    WEATHER_PREFETCH_ENABLED: bool = True  # background refresh; handlers then only read the store
+    WEATHER_PREFETCH_INTERVAL_S: int = 60  # scheduler tick; entries expiring before the next tick are refreshed
+    WEATHER_PREFETCH_CONCURRENCY: int = 8  # parallel upstream refreshes per tick
+    WEATHER_CELL_EXPIRY_TTLS: int = 6      # drop an unprefetched cell's cache after this many forecast TTLs unrequested
     GEMINI_API_KEY: str = ""
     MANDI_API_BASE: str = "https://api.data.gov.in/resource"
+    MANDI_INGEST_CHUNK_ROWS: int = 50000   # rows parsed, validated and upserted per chunk
+    MANDI_INGEST_MAX_AGE_DAYS: int = 3650  # reject rows dated older than this
+    MANDI_INGEST_TOKEN: str = ""           # X-Ingest-Token for POST /api/market/ingest (empty = route disabled)
+    MARKET_STORE_ENABLED: bool = True      # memory-map price history from an on-disk columnar store
+    MARKET_STORE_DIR: str = "./market_store"  # generation 0 from data/raw/mandi_prices.csv; ingests publish the next
+    MARKET_STORE_POLL_S: int = 10          # how often workers check for a store published by an ingest
+    ALERT_NOTIFICATIONS_MAX: int = 50      # oldest undelivered price-alert events delivered per call; the rest stay queued
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
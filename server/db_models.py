@@ -2,7 +2,7 @@
 SmartAgri AI - Database Models
 SQLAlchemy ORM models for all tables.
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -125,6 +125,12 @@ class MarketPrice(Base):
     min_price = Column(Float)
     max_price = Column(Float)
     modal_price = Column(Float)
+    ingested_at = Column(DateTime, nullable=True, index=True)   # UTC, per feed chunk; market store watermark
+
+    # One row per commodity per mandi per day — the ingestion upsert key
+    __table_args__ = (
+        Index("uq_market_prices_commodity_market_date", "commodity", "market_name", "date", unique=True),
+    )
 
 
 class Scheme(Base):
@@ -170,6 +176,29 @@ class AlertSubscription(Base):
     user = relationship("User", back_populates="alert_subscriptions")
 
 
+class PriceAlertEvent(Base):
+    """A price alert that fired: its threshold was crossed by a day's highest mandi price."""
+    __tablename__ = "price_alert_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(Integer, ForeignKey("alert_subscriptions.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    crop_name = Column(String(50), nullable=False)
+    price_date = Column(Date, nullable=False)
+    price = Column(Float, nullable=False)
+    threshold = Column(Float, nullable=False)
+    market_name = Column(String(100), nullable=True)
+    state = Column(String(50), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    # An alert fires at most once per price day, whichever process ingests it
+    __table_args__ = (
+        Index("uq_price_alert_events_subscription_date", "subscription_id", "price_date", unique=True),
+        Index("ix_price_alert_events_user_delivered", "user_id", "delivered_at"),
+    )
+
+
 # ─────────────────────────────────────────────────────────
 #  Community
 # ─────────────────────────────────────────────────────────
@@ -1,6 +1,7 @@
 """
 SmartAgri AI - FastAPI Application Entry Point
 """
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -23,13 +24,37 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     os.makedirs(settings.MODEL_DIR, exist_ok=True)
 
-    # Pre-load ML models
-    from services.recommendation import get_engine
-    get_engine(settings.MODEL_DIR)
-
-    # Pre-load market data
-    from services.market_service import get_market_service
-    get_market_service()
+    # Local model cache must be configured before any model library is imported
+    from services.model_manager import configure_model_cache, get_model_manager
+    configure_model_cache(settings.MODEL_CACHE_DIR, offline=settings.MODEL_CACHE_OFFLINE)
+
+    # Pre-load market data (CSV + ingested rows); follow stores published by other workers
+    from services.market_service import init_market_service
+    market = await init_market_service()
+    market_watch = None
+    if settings.MARKET_STORE_ENABLED:
+        market_watch = asyncio.create_task(market.watch_store(settings.MARKET_STORE_POLL_S))
+    from services.harvest_forecast_tables import get_forecast_tables
+    get_forecast_tables()
+
+    # Register every served model; load + warm them in the background.
+    # /api/health/ready reports 503 until the REQUIRED_MODELS are warm.
+    from services import recommendation, disease_service, price_forecast_service, yield_prediction_service
+    manager = get_model_manager()
+    recommendation.register_models(manager, settings.MODEL_DIR)
+    price_forecast_service.register_models(manager, settings.MODEL_DIR)
+    yield_prediction_service.register_models(manager, settings.MODEL_DIR)
+    disease_service.register_models(manager)
+    manager.start_preload()
+    executor = disease_service.get_inference_executor()
+    # Reload models and clear the recommendation cache when MODEL_DIR artifacts change
+    artifact_watch = asyncio.create_task(recommendation.watch_model_artifacts(settings.RECOMMEND_ARTIFACT_POLL_S))
+
+    # Keep the weather store warm; handlers then read it without calling OpenWeatherMap
+    from services.weather_prefetch import get_weather_prefetcher
+    prefetcher = get_weather_prefetcher()
+    if settings.WEATHER_PREFETCH_ENABLED:
+        prefetcher.start()
 
     print("🚀 SmartAgri AI Server Ready!")
     print(f"   API docs: http://{settings.HOST}:{settings.PORT}/docs")
@@ -37,6 +62,17 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("👋 SmartAgri AI Server Shutting Down...")
+    from services.disease_service import get_diagnosis_engine
+    await get_diagnosis_engine().stop()
+    manager.stop()
+    if executor:
+        executor.shutdown()
+    await prefetcher.stop()
+    if market_watch:
+        market_watch.cancel()
+    artifact_watch.cancel()
+    from services.weather_service import get_weather_service
+    await get_weather_service().aclose()
 
 
 app = FastAPI(
@@ -56,7 +92,7 @@ app.add_middleware(
 )
 
 # Register routers
-from routers import auth, recommend, market, weather, crops, schemes, history, health, chatbot, disease, districts, community, map, expenses, fertilizer, crop_calendar, soil_report
+from routers import auth, recommend, market, weather, crops, schemes, history, health, chatbot, disease, districts, community, map, expenses, fertilizer, crop_calendar, soil_report, alerts
 
 app.include_router(auth.router)
 app.include_router(recommend.router)
@@ -75,6 +111,7 @@ app.include_router(expenses.router)
 app.include_router(fertilizer.router)
 app.include_router(crop_calendar.router)
 app.include_router(soil_report.router)
+app.include_router(alerts.router)
 
 
 @app.get("/")
@@ -0,0 +1,117 @@
+"""
+SmartAgri AI - Alerts Router
+Alert subscriptions and delivered price-alert notifications.
+"""
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from database import get_db
+from db_models import AlertSubscription, PriceAlertEvent
+from schemas import AlertResponse, AlertSubscribeRequest, MessageResponse
+from services.alert_engine import notifications as collapse_notifications
+from utils.security import get_current_user_id
+
+router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
+
+VALID_ALERT_TYPES = ["price_alert", "pest_warning", "weather_alert"]
+
+
+def _subscription(sub: AlertSubscription) -> dict:
+    return {
+        "id": sub.id,
+        "alert_type": sub.alert_type,
+        "crop_name": sub.crop_name,
+        "price_threshold": sub.price_threshold,
+        "is_active": sub.is_active,
+        "created_at": sub.created_at,
+    }
+
+
+@router.post("/subscribe", status_code=status.HTTP_201_CREATED)
+async def subscribe(
+    data: AlertSubscribeRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Subscribe to an alert; price alerts fire when the crop's mandi price reaches the threshold."""
+    if data.alert_type not in VALID_ALERT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid alert type. Choose from: {', '.join(VALID_ALERT_TYPES)}")
+    if data.alert_type == "price_alert" and (data.price_threshold is None or data.price_threshold <= 0):
+        raise HTTPException(status_code=400, detail="price_alert needs a positive price_threshold (₹/quintal)")
+
+    sub = AlertSubscription(
+        user_id=user_id,
+        alert_type=data.alert_type,
+        crop_name=data.crop_name,
+        price_threshold=data.price_threshold,
+    )
+    db.add(sub)
+    await db.commit()
+    await db.refresh(sub)
+    return _subscription(sub)
+
+
+@router.get("/subscriptions")
+async def list_subscriptions(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Active alert subscriptions of the current user."""
+    result = await db.execute(
+        select(AlertSubscription)
+        .where(AlertSubscription.user_id == user_id, AlertSubscription.is_active.is_(True))
+        .order_by(AlertSubscription.created_at.desc())
+    )
+    return {"subscriptions": [_subscription(s) for s in result.scalars().all()]}
+
+
+@router.delete("/subscriptions/{subscription_id}", response_model=MessageResponse)
+async def unsubscribe(
+    subscription_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Deactivate one of the current user's subscriptions."""
+    result = await db.execute(
+        select(AlertSubscription).where(AlertSubscription.id == subscription_id,
+                                        AlertSubscription.user_id == user_id)
+    )
+    sub = result.scalar_one_or_none()
+    if sub is None or not sub.is_active:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    sub.is_active = False
+    await db.commit()
+    return MessageResponse(message="Unsubscribed")
+
+
+@router.get("/notifications", response_model=List[AlertResponse])
+async def notifications(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Price-alert notifications triggered by ingested mandi prices, oldest
+    first: up to ALERT_NOTIFICATIONS_MAX undelivered events per call are
+    returned and marked delivered; the rest stay queued for the next call.
+    """
+    result = await db.execute(
+        select(PriceAlertEvent)
+        .where(PriceAlertEvent.user_id == user_id, PriceAlertEvent.delivered_at.is_(None))
+        .order_by(PriceAlertEvent.price_date, PriceAlertEvent.id)
+        .limit(get_settings().ALERT_NOTIFICATIONS_MAX)
+    )
+    events = result.scalars().all()
+    if not events:
+        return []
+    await db.execute(
+        update(PriceAlertEvent)
+        .where(PriceAlertEvent.id.in_([e.id for e in events]))
+        .values(delivered_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return [AlertResponse(**note) for note in collapse_notifications(events)]
@@ -75,7 +75,7 @@ async def get_crop_schedule(
     with AI-adjusted dates based on rainfall and temperature forecasts.
     """
     from fastapi import HTTPException
-    result = generate_schedule(
+    result = await generate_schedule(
         crop_name=crop,
         sowing_date=sowing_date,
         state=state,
@@ -101,7 +101,7 @@ async def get_next_tasks(
     Return only the next N urgent/upcoming tasks.
     Optimized for the dashboard widget.
     """
-    result = generate_schedule(crop, sowing_date, state, water_source)
+    result = await generate_schedule(crop, sowing_date, state, water_source)
     if "error" in result:
         return result
 
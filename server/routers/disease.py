@@ -2,16 +2,22 @@
 SmartAgri AI - Disease Detection API Routes
 Accepts image upload, runs dual-model HF ensemble, returns enriched result.
 """
+import json
 import logging
+from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from utils.security import get_current_user_id
-from services.disease_service import diagnose_image_bytes
+from services.disease_service import diagnose_cached, diagnose_many, FieldSurveySummary
+from services.inference_engine import QueueFullError
+from services.model_manager import ModelNotReadyError
 
 logger = logging.getLogger("disease_router")
 router = APIRouter(prefix="/api/disease", tags=["Disease Detection"])
 
 MAX_SIZE_MB = 5
 MAX_BYTES   = MAX_SIZE_MB * 1024 * 1024
+MAX_BATCH_IMAGES = 60
 
 
 @router.post("/diagnose")
@@ -21,7 +27,8 @@ async def diagnose(
 ):
     """
     Upload a leaf/plant image and receive disease diagnosis.
-    Runs dual HF model ensemble (MobileNetV2 38-class + ViT-Tiny 15-class).
+    Runs dual HF model ensemble (MobileNetV2 38-class + ViT-Tiny 15-class),
+    micro-batched with other concurrent uploads; repeat photos are served from cache.
     Returns: disease name, confidence, severity, symptoms, treatment, prevention, top-3 predictions.
     """
     # Validate content type
@@ -38,10 +45,24 @@ async def diagnose(
     logger.info(f"[user={user_id}] Diagnosing image: {file.filename} ({len(image_bytes)//1024} KB)")
 
     try:
-        result = diagnose_image_bytes(image_bytes, filename=file.filename or "leaf.jpg")
+        result = await diagnose_cached(image_bytes, filename=file.filename or "leaf.jpg")
     except ValueError as ve:
         # Non-plant image detected by confidence guard
         raise HTTPException(status_code=400, detail=str(ve))
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Disease detection is busy. Please retry in a few seconds.",
+            headers={"Retry-After": "5"},
+        )
+    except ModelNotReadyError:
+        raise HTTPException(
+            status_code=503,
+            detail="Disease models are still loading. Please retry shortly.",
+            headers={"Retry-After": "10"},
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Diagnosis timed out. Please try again.")
     except Exception as e:
         logger.error(f"Diagnosis error for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="Diagnosis failed. Please try with a clearer image.")
@@ -50,6 +71,94 @@ async def diagnose(
     return result
 
 
+def _batch_error(exc: Exception) -> tuple[int, str]:
+    """Per-image error → (HTTP-equivalent status, message) for NDJSON lines."""
+    if isinstance(exc, ValueError):
+        return 400, str(exc)
+    if isinstance(exc, QueueFullError):
+        return 503, "Disease detection is busy. Please retry this image."
+    if isinstance(exc, ModelNotReadyError):
+        return 503, "Disease models are still loading. Please retry shortly."
+    if isinstance(exc, TimeoutError):
+        return 504, "Diagnosis timed out. Please retry this image."
+    return 500, "Diagnosis failed. Please try with a clearer image."
+
+
+@router.post("/diagnose/batch")
+async def diagnose_batch(
+    files: List[UploadFile] = File(...),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Field survey: upload many leaf photos in one multipart request (field name
+    `files`, repeated). Images are pushed through the micro-batching engine
+    together and results stream back as NDJSON, one line per image as soon as
+    it finishes (completion order, not upload order):
+
+      {"type": "image", "index": 3, "filename": "...", "status": 200, "result": {...}}
+      {"type": "image", "index": 7, "filename": "...", "status": 400, "error": "..."}
+      {"type": "summary", "images_total": 40, "prevalence": [...], "severity_distribution": {...}}
+    """
+    from services.disease_service import models_ready
+    from config import get_settings
+
+    if len(files) > MAX_BATCH_IMAGES:
+        raise HTTPException(status_code=413, detail=f"Too many images. Max {MAX_BATCH_IMAGES} per survey.")
+    if not models_ready() and not get_settings().DISEASE_SIMULATION_FALLBACK:
+        raise HTTPException(
+            status_code=503,
+            detail="Disease models are still loading. Please retry shortly.",
+            headers={"Retry-After": "10"},
+        )
+
+    # Read (and validate) every part up front — upload files are closed once
+    # the streaming response starts.
+    items, rejected = [], []
+    for i, f in enumerate(files):
+        name = f.filename or f"leaf_{i}.jpg"
+        if f.content_type and not f.content_type.startswith("image/"):
+            rejected.append((i, name, 400, "Only image files are accepted (JPEG, PNG, WEBP)."))
+            continue
+        data = await f.read()
+        if len(data) > MAX_BYTES:
+            rejected.append((i, name, 413, f"Image too large. Max size is {MAX_SIZE_MB} MB."))
+        elif len(data) < 100:
+            rejected.append((i, name, 400, "Image file appears to be empty or corrupt."))
+        else:
+            items.append((i, data, name))
+
+    logger.info(f"[user={user_id}] Field survey: {len(items)} images ({len(rejected)} rejected on upload)")
+
+    async def _stream():
+        summary = FieldSurveySummary(total=len(files))
+        for i, name, status, detail in rejected:
+            summary.add_failure()
+            yield json.dumps({"type": "image", "index": i, "filename": name,
+                              "status": status, "error": detail}) + "\n"
+
+        async for pos, outcome in diagnose_many([(data, name) for _, data, name in items]):
+            index, _, name = items[pos]
+            line = {"type": "image", "index": index, "filename": name}
+            if isinstance(outcome, Exception):
+                status, detail = _batch_error(outcome)
+                if status == 500:
+                    logger.error(f"Survey diagnosis error for user {user_id} ({name}): {outcome}")
+                summary.add_failure()
+                line.update(status=status, error=detail)
+            else:
+                summary.add(outcome)
+                line.update(status=200, result={**outcome, "filename": name})
+            yield json.dumps(line) + "\n"
+
+        yield json.dumps({"type": "summary", **summary.as_dict()}) + "\n"
+
+    return StreamingResponse(
+        _stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/diseases")
 async def list_diseases():
     """Return the full disease knowledge base (no auth required — informational)."""
@@ -72,12 +181,29 @@ async def list_diseases():
 @router.get("/status")
 async def model_status():
     """Check if HF models are loaded and ready."""
-    from services.disease_service import _hf_ready, _hf_error
+    from services.disease_service import (
+        _hf_error, get_diagnosis_engine, get_inference_executor, get_diagnosis_cache, models_ready,
+    )
+    from services.model_manager import get_model_manager
+    from config import get_settings
+    settings = get_settings()
+    ready = models_ready()
+    executor = get_inference_executor()
+    managed = get_model_manager().status()["models"].get("disease", {})
     return {
-        "models_ready": _hf_ready,
-        "error": _hf_error,
+        "models_ready": ready,
+        "state": managed.get("state", "pending"),
+        "load_s": managed.get("load_s"),
+        "warmup_s": managed.get("warmup_s"),
+        "error": managed.get("error") or _hf_error,
         "primary_model":   "linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
         "secondary_model": "wambugu71/crop_leaf_diseases_vit",
         "disease_classes": 38,
-        "inference_mode":  "dual_model_ensemble" if _hf_ready else "simulation_fallback",
+        "inference_mode":  "dual_model_ensemble" if ready else (
+            "simulation_fallback" if settings.DISEASE_SIMULATION_FALLBACK else "unavailable"),
+        "backend":         settings.DISEASE_BACKEND,
+        "quantized":       settings.DISEASE_BACKEND == "onnx" and settings.DISEASE_ONNX_QUANTIZED,
+        "batching":        get_diagnosis_engine().stats(),
+        "executor":        executor.stats() if executor else {"workers": 0, "mode": "in_process_threads"},
+        "cache":           get_diagnosis_cache().stats(),
     }
@@ -3,7 +3,9 @@ SmartAgri AI - Health Router
 Server health, readiness, version.
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from config import get_settings
+from services.model_manager import get_model_manager
 
 router = APIRouter(prefix="/api/health", tags=["Health"])
 settings = get_settings()
@@ -17,17 +19,21 @@ async def health_check():
 
 @router.get("/ready")
 async def readiness():
-    """Readiness check including DB and model status."""
-    import os
-    models_dir = settings.MODEL_DIR
-    models_exist = os.path.exists(os.path.join(models_dir, "crop_recommender.joblib"))
-
-    return {
-        "status": "ready",
+    """
+    Readiness probe: 503 until every model in REQUIRED_MODELS is loaded and
+    warmed, so a load balancer only routes traffic once real inference works.
+    """
+    models = get_model_manager().status()
+    body = {
+        "status": "ready" if models["ready"] else "loading",
         "version": "1.0.0",
         "db_connected": True,
-        "models_loaded": models_exist,
+        "models_loaded": models["ready"],
+        "models": models["models"],
     }
+    if not models["ready"]:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "5"})
+    return body
 
 
 @router.get("/version")
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict
 from database import get_db
 from db_models import User
+from services.geo_data import DISTRICT_COORDS
 from utils.security import get_current_user_id
 
 router = APIRouter(prefix="/api/map", tags=["Farm Map"])
@@ -23,20 +24,6 @@ try:
 except FileNotFoundError:
     MH_DISTRICTS = {}
 
-# District coordinates for map pins (approximate lat/lng for 10 key districts)
-DISTRICT_COORDS = {
-    "Pune":       {"lat": 18.5204, "lng": 73.8567},
-    "Nashik":     {"lat": 19.9975, "lng": 73.7898},
-    "Nagpur":     {"lat": 21.1458, "lng": 79.0882},
-    "Aurangabad": {"lat": 19.8762, "lng": 75.3433},
-    "Kolhapur":   {"lat": 16.7050, "lng": 74.2433},
-    "Solapur":    {"lat": 17.6599, "lng": 75.9064},
-    "Satara":     {"lat": 17.6805, "lng": 74.0183},
-    "Sangli":     {"lat": 16.8524, "lng": 74.5815},
-    "Latur":      {"lat": 18.4088, "lng": 76.5604},
-    "Ahmednagar": {"lat": 19.0948, "lng": 74.7480},
-}
-
 
 def _get_nearby_districts(district: str) -> List[Dict]:
     """Find districts in the same division/region."""
@@ -2,13 +2,16 @@
 SmartAgri AI - Market Router
 Price data, trends, volatility, top movers, forecasts.
 """
+from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from services.market_service import get_market_service
+from services.mandi_ingest import ingest_feed
+from services.price_forecast_service import get_price_forecaster
 from services.harvest_forecast_service import (
     predict_harvest_price, get_bulk_forecast, get_supported_crops as get_forecast_crops
 )
-from utils.security import get_current_user_id
+from utils.security import get_current_user_id, require_ingest_token
 
 router = APIRouter(prefix="/api/market", tags=["Market Data"])
 
@@ -46,12 +49,19 @@ async def get_prices(
 @router.get("/prices/{crop}/history")
 async def get_price_history(
     crop: str,
-    days: int = Query(90, ge=7, le=365),
+    days: int = Query(90, ge=7, le=3650),
+    state: str = Query(None),
+    interval: str = Query("raw", pattern="^(raw|daily|weekly|monthly)$"),
+    points: Optional[int] = Query(None, ge=10, le=5000, description="LTTB-downsample to at most this many points"),
     user_id: int = Depends(get_current_user_id),
 ):
-    """Get historical price data."""
+    """
+    Price history over the last `days` days of data, as column arrays
+    (history.date[i], history.modal_price[i], ...). `interval` aggregates
+    into daily / weekly / monthly OHLC buckets; `points` caps the series size.
+    """
     service = get_market_service()
-    return {"crop": crop, "history": service.get_price_history(crop, days)}
+    return {"crop": crop, "days": days, **service.get_price_history(crop, days, state, interval, points)}
 
 
 @router.get("/trends/{crop}")
@@ -75,22 +85,52 @@ async def get_volatility(
 
 
 @router.get("/top-gainers")
-async def top_gainers(user_id: int = Depends(get_current_user_id)):
-    """Crops with highest price increase."""
+async def top_gainers(
+    state: str = Query(None),
+    district: str = Query(None),
+    limit: int = Query(5, ge=1, le=100),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Crops with highest price increase, nationally or within a state / district."""
     service = get_market_service()
-    return {"movers": service.get_top_movers("gainers")}
+    return {"movers": service.get_top_movers("gainers", limit, state, district)}
 
 
 @router.get("/top-losers")
-async def top_losers(user_id: int = Depends(get_current_user_id)):
-    """Crops with largest price drop."""
+async def top_losers(
+    state: str = Query(None),
+    district: str = Query(None),
+    limit: int = Query(5, ge=1, le=100),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Crops with largest price drop, nationally or within a state / district."""
     service = get_market_service()
-    return {"movers": service.get_top_movers("losers")}
+    return {"movers": service.get_top_movers("losers", limit, state, district)}
+
+
+@router.post("/ingest")
+async def ingest_prices(
+    file: UploadFile = File(..., description="AGMARKNET CSV, data.gov.in JSON or JSON Lines feed"),
+    save: bool = True,
+    _: None = Depends(require_ingest_token),
+):
+    """
+    Ingest a daily mandi feed: validated, deduplicated rows are upserted into
+    market_prices and merged into the live price / movers indexes.
+    Service-only — needs the X-Ingest-Token header (MANDI_INGEST_TOKEN);
+    scheduled feeds can also run `python -m services.mandi_ingest`.
+    """
+    try:
+        report = await ingest_feed(file.file, filename=file.filename, save=save)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse feed: {e}")
+    return report
 
 
 @router.get("/forecast/{crop}")
 async def price_forecast(
     crop: str,
+    state: str = Query(None),
     user_id: int = Depends(get_current_user_id),
 ):
     """ML-predicted price for next 30 days."""
@@ -98,13 +138,26 @@ async def price_forecast(
     trend = service.get_trend(crop)
     current = trend.get("current_price", 0)
     change = trend.get("price_change_pct", 0)
-    forecast = current * (1 + change / 100)
+
+    # Trained price model for the month 30 days out; trend extrapolation if it has no answer
+    target_month = (datetime.now() + timedelta(days=30)).month
+    forecast = get_price_forecaster().predict(crop, state, target_month)
+    source = "model"
+    if forecast is None:
+        forecast = current * (1 + change / 100)
+        source = "trend"
+    direction = trend.get("trend_direction", "stable")
+    if source == "model" and current > 0:
+        pct = (forecast - current) / current * 100
+        direction = "up" if pct > 3 else "down" if pct < -3 else "stable"
 
     return {
         "crop": crop,
+        "state": state,
         "current_price": round(current, 2),
         "forecast_30d": round(forecast, 2),
-        "forecast_direction": trend.get("trend_direction", "stable"),
+        "forecast_direction": direction,
+        "forecast_source": source,
         "confidence": 0.78,
     }
 
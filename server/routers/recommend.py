@@ -2,16 +2,23 @@
 SmartAgri AI - Recommendation Router
 Crop recommendation, comparison, what-if analysis.
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database import get_db
+from sqlalchemy import select, insert
+from database import get_db, async_session
 from db_models import Recommendation, CropResult
 from schemas import (
     RecommendationRequest, QuickRecommendRequest, CropCompareRequest,
     WhatIfRequest, RecommendationResponse, MessageResponse,
+    BulkPlot, BulkRecommendRequest,
 )
-from services.recommendation import get_engine
+from services.recommendation import get_engine, cached_recommendation, get_recommendation_cache
 from utils.security import get_current_user_id
 from config import get_settings
 
@@ -63,19 +70,7 @@ async def get_recommendation(
     await db.refresh(rec)
 
     for i, crop in enumerate(result["crops"], 1):
-        cr = CropResult(
-            recommendation_id=rec.id,
-            crop_name=crop["name"],
-            rank=i,
-            suitability_score=crop["suitability_score"],
-            predicted_yield=float(crop["expected_yield"].split()[0]),
-            predicted_price=float(crop["predicted_price"].replace("₹", "").replace(",", "").split("/")[0]),
-            estimated_cost=float(crop["estimated_cost"].replace("₹", "").replace(",", "")),
-            estimated_profit=float(crop["estimated_profit"].replace("₹", "").replace(",", "")),
-            risk_level=crop["risk_level"],
-            reasoning=crop["why_this_crop"],
-        )
-        db.add(cr)
+        db.add(CropResult(recommendation_id=rec.id, **_crop_result_values(crop, i)))
     await db.commit()
 
     result["id"] = rec.id
@@ -107,7 +102,169 @@ async def quick_recommendation(
         },
     }
 
-    return engine.get_recommendation(params)
+    return cached_recommendation("quick", params, engine.get_recommendation)
+
+
+# ── Bulk (cooperative / FPO) scoring ──────────────────────
+BULK_CHUNK = 500          # plots per predict_proba call / DB round-trip
+CSV_COLUMNS = [
+    "index", "plot_id", "recommendation_id", "rank", "crop", "suitability_score",
+    "expected_yield", "predicted_price", "estimated_cost", "estimated_profit",
+    "risk_level", "overall_risk_score",
+]
+
+
+def _crop_result_values(crop: dict, rank: int) -> dict:
+    """CropResult column values parsed from one formatted crop recommendation."""
+    return {
+        "crop_name": crop["name"],
+        "rank": rank,
+        "suitability_score": crop["suitability_score"],
+        "predicted_yield": float(crop["expected_yield"].split()[0]),
+        "predicted_price": float(crop["predicted_price"].replace("₹", "").replace(",", "").split("/")[0]),
+        "estimated_cost": float(crop["estimated_cost"].replace("₹", "").replace(",", "")),
+        "estimated_profit": float(crop["estimated_profit"].replace("₹", "").replace(",", "")),
+        "risk_level": crop["risk_level"],
+        "reasoning": crop["why_this_crop"],
+    }
+
+
+def _plot_params(plot: BulkPlot) -> dict:
+    return {
+        "state": plot.state,
+        "district": plot.district,
+        "land_size_acres": plot.land_size_acres,
+        "irrigation_type": plot.irrigation_type,
+        "previous_crop": plot.previous_crop,
+        "soil": {"N": plot.N, "P": plot.P, "K": plot.K, "ph": plot.ph, "soil_type": plot.soil_type},
+        "weather": {
+            "temperature": plot.temperature,
+            "humidity": plot.humidity,
+            "rainfall": plot.rainfall,
+            "season": plot.season,
+        },
+    }
+
+
+async def _save_bulk(db: AsyncSession, user_id: int, params: list, results: list) -> list:
+    """Persist one chunk with two multi-row INSERTs; returns recommendation ids in order."""
+    rec_ids = (await db.execute(
+        insert(Recommendation).returning(Recommendation.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "input_params": p,
+                "season": p["weather"]["season"],
+                "overall_risk_score": r["risk_assessment"]["overall_score"],
+            }
+            for p, r in zip(params, results)
+        ],
+    )).scalars().all()
+    crop_rows = [
+        {"recommendation_id": rec_id, **_crop_result_values(crop, rank)}
+        for rec_id, r in zip(rec_ids, results)
+        for rank, crop in enumerate(r["crops"], 1)
+    ]
+    if crop_rows:
+        await db.execute(insert(CropResult), crop_rows)
+    await db.commit()
+    return list(rec_ids)
+
+
+def _bulk_response(plots: list, user_id: int, fmt: str, save: bool) -> StreamingResponse:
+    """Score plots chunk by chunk and stream results as they are ready (NDJSON or CSV)."""
+    engine = get_engine(settings.MODEL_DIR)
+
+    async def _stream():
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(CSV_COLUMNS)
+            yield buf.getvalue()
+
+        async with async_session() as db:
+            for start in range(0, len(plots), BULK_CHUNK):
+                chunk = plots[start:start + BULK_CHUNK]
+                params = [_plot_params(p) for p in chunk]
+                # CPU-bound scoring off the event loop
+                results = await asyncio.to_thread(engine.get_recommendations_bulk, params)
+                rec_ids = await _save_bulk(db, user_id, params, results) if save else [None] * len(chunk)
+
+                if fmt == "csv":
+                    buf = io.StringIO()
+                    writer = csv.writer(buf)
+                    for offset, (plot, rec_id, r) in enumerate(zip(chunk, rec_ids, results)):
+                        for rank, crop in enumerate(r["crops"], 1):
+                            writer.writerow([
+                                start + offset, plot.plot_id or "", rec_id or "", rank, crop["name"],
+                                crop["suitability_score"], crop["expected_yield"], crop["predicted_price"],
+                                crop["estimated_cost"], crop["estimated_profit"], crop["risk_level"],
+                                r["risk_assessment"]["overall_score"],
+                            ])
+                    yield buf.getvalue()
+                else:
+                    yield "".join(
+                        json.dumps({"index": start + offset, "plot_id": plot.plot_id, "id": rec_id, **r},
+                                   ensure_ascii=False) + "\n"
+                        for offset, (plot, rec_id, r) in enumerate(zip(chunk, rec_ids, results))
+                    )
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if fmt == "csv":
+        headers["Content-Disposition"] = 'attachment; filename="recommendations.csv"'
+    return StreamingResponse(_stream(), media_type=media_type, headers=headers)
+
+
+@router.post("/bulk")
+async def bulk_recommendation(
+    data: BulkRecommendRequest,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Score many member plots in one request (FPO onboarding). The scaler and
+    RandomForest run on the whole plot matrix per chunk, persistence uses
+    multi-row inserts, and results stream back as NDJSON (one plot per line)
+    or CSV (one row per recommended crop).
+    """
+    return _bulk_response(data.plots, user_id, format, data.save)
+
+
+@router.post("/bulk/csv")
+async def bulk_recommendation_csv(
+    file: UploadFile = File(..., description="CSV with one plot per row; columns as in BulkPlot"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    save: bool = True,
+    user_id: int = Depends(get_current_user_id),
+):
+    """Same as /bulk, with plots uploaded as a CSV file (header row = BulkPlot field names)."""
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded.")
+
+    plots = []
+    for line_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        row = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+        try:
+            plots.append(BulkPlot(**row))
+        except ValidationError as e:
+            err = e.errors()[0]
+            field = ".".join(str(x) for x in err["loc"])
+            raise HTTPException(status_code=422, detail=f"Row {line_no}: {field} — {err['msg']}")
+
+    if not plots:
+        raise HTTPException(status_code=400, detail="CSV contains no plots.")
+    if len(plots) > 10000:
+        raise HTTPException(status_code=413, detail="Too many plots. Max 10,000 per job.")
+    return _bulk_response(plots, user_id, format, save)
+
+
+@router.get("/cache/stats")
+async def recommendation_cache_stats():
+    """Hit rate and size of the quick / what-if result cache."""
+    return get_recommendation_cache().stats()
 
 
 @router.get("/{rec_id}")
@@ -163,10 +320,10 @@ async def compare_crops(
     """Compare 2-3 crops side by side."""
     engine = get_engine(settings.MODEL_DIR)
     comparison = []
+    prices = engine._estimate_prices(data.crops, data.state)
+    yields = engine._estimate_yields(data.crops, data.state, data.season)
 
-    for crop_name in data.crops:
-        price = engine._estimate_price(crop_name)
-        base_yield = engine._estimate_yield(crop_name, data.state, data.season)
+    for crop_name, price, base_yield in zip(data.crops, prices, yields):
         cost = 30000
         from services.recommendation import CROP_LOOKUP
         db_crop = CROP_LOOKUP.get(crop_name.lower(), {})
@@ -216,18 +373,26 @@ async def what_if_analysis(
         },
     }
 
+    return cached_recommendation(
+        "what-if", params,
+        lambda p: _what_if(engine, data.crop, p, data.land_size_acres),
+        data.crop, data.land_size_acres,
+    )
+
+
+def _what_if(engine, crop: str, params: dict, land_size_acres: float) -> dict:
     from services.recommendation import CROP_LOOKUP
-    db_crop = CROP_LOOKUP.get(data.crop.lower(), {})
-    base_yield = engine._estimate_yield(data.crop, data.state, data.season)
+    db_crop = CROP_LOOKUP.get(crop.lower(), {})
+    base_yield = engine._estimate_yield(crop, params["state"], params["weather"]["season"])
     adjusted_yield = engine._adjust_yield(base_yield, params["soil"], params["weather"], db_crop)
-    price = engine._estimate_price(data.crop)
-    cost = db_crop.get("avg_cost_per_hectare", 30000) * (data.land_size_acres * 0.4047)
-    revenue = adjusted_yield * (data.land_size_acres * 0.4047) * price
+    price = engine._estimate_price(crop, params["state"])
+    cost = db_crop.get("avg_cost_per_hectare", 30000) * (land_size_acres * 0.4047)
+    revenue = adjusted_yield * (land_size_acres * 0.4047) * price
     profit = revenue - cost
-    risk = engine._calculate_risk(data.crop, params["weather"], data.irrigation_type, db_crop)
+    risk = engine._calculate_risk(crop, params["weather"], params["irrigation_type"], db_crop)
 
     return {
-        "crop": data.crop,
+        "crop": crop,
         "yield_per_hectare": adjusted_yield,
         "price_per_quintal": price,
         "total_cost": round(cost, 2),
@@ -14,23 +14,28 @@ router = APIRouter(prefix="/api/weather", tags=["Weather"])
 async def get_current_weather(
     state: str = Query(...),
     district: str = Query(""),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Farm latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Farm longitude"),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get current weather for farmer's location."""
     service = get_weather_service()
-    return service.get_current(state, district)
+    return await service.get_current(state, district, lat, lon)
 
 
 @router.get("/forecast")
 async def get_forecast(
     state: str = Query(...),
     days: int = Query(7, ge=1, le=14),
+    district: str = Query(""),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Farm latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Farm longitude"),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get multi-day weather forecast."""
     service = get_weather_service()
-    forecast = service.get_forecast(state, days)
-    return {"location": state, "forecast": forecast}
+    forecast = await service.get_forecast(state, days, district, lat, lon)
+    return {"location": district or state, "forecast": forecast}
 
 
 @router.get("/seasonal")
@@ -70,7 +75,7 @@ async def get_weather_impact(
     """Analyze weather impact on crops."""
     service = get_weather_service()
     crop_list = [c.strip() for c in crops.split(",")] if crops else []
-    return service.get_impact(state, season, crop_list)
+    return await service.get_impact(state, season, crop_list)
 
 
 @router.get("/alerts")
@@ -109,15 +114,24 @@ async def get_weather_alerts(
     return {"state": state, "alerts": alerts}
 
 
+@router.get("/cache/stats")
+async def get_weather_cache_stats():
+    """Grid cells, upstream fetches and hit rate for the shared weather client and prefetcher."""
+    from services.weather_prefetch import get_weather_prefetcher
+    return {**get_weather_service().stats(), "prefetch": get_weather_prefetcher().stats()}
+
+
 @router.get("/recommend-params")
 async def get_recommend_params(
     state: str = Query(...),
     district: str = Query(""),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Farm latitude"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Farm longitude"),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get weather parameters for crop recommendation wizard (auto-fill)."""
     service = get_weather_service()
-    current = service.get_current(state, district)
+    current = await service.get_current(state, district, lat, lon)
     return {
         "temperature": round(current.get("temperature", 28)),
         "humidity": round(current.get("humidity", 70)),
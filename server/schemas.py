@@ -124,6 +124,30 @@ class WhatIfRequest(BaseModel):
     irrigation_type: str = "Rainfed"
 
 
+class BulkPlot(BaseModel):
+    """One member plot in a bulk (cooperative / FPO) recommendation job — flat, CSV-shaped."""
+    plot_id: Optional[str] = None
+    state: str
+    district: str = ""
+    land_size_acres: float = Field(1.0, gt=0)
+    irrigation_type: str = "Rainfed"
+    previous_crop: Optional[str] = None
+    N: float = Field(..., ge=0, le=200)
+    P: float = Field(..., ge=0, le=200)
+    K: float = Field(..., ge=0, le=300)
+    ph: float = Field(..., ge=3.0, le=10.0)
+    soil_type: str = "Loamy"
+    temperature: float = Field(..., ge=0, le=50)
+    humidity: float = Field(..., ge=10, le=100)
+    rainfall: float = Field(..., ge=0, le=500)
+    season: str
+
+
+class BulkRecommendRequest(BaseModel):
+    plots: List[BulkPlot] = Field(..., min_length=1, max_length=10000)
+    save: bool = True
+
+
 class CropRecommendation(BaseModel):
     name: str
     suitability_score: float
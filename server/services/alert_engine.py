@@ -0,0 +1,212 @@
+"""
+SmartAgri AI - Price Alert Matching Engine
+Evaluates `AlertSubscription` price alerts ("tell me when <crop> reaches
+₹X/quintal") against every ingested batch of mandi prices without scanning
+the subscriptions.
+
+  index     : per commodity (lower-cased), the active subscriptions'
+              thresholds as one sorted float array with aligned subscription
+              id / user id / armed arrays — built in bulk from the DB by
+              rebuild() at the start of every ingest run
+  match     : a commodity's highest modal price P on a day triggers exactly
+              thresholds[: searchsorted(thresholds, P, "right")] — one
+              binary search per (commodity, day) in the batch
+  dedupe    : an alert fires once, then stays quiet until a complete later
+              day's highest price is below its threshold (re-armed). Chunks
+              of the same day only raise that day's running max, so a
+              cheaper mandi in a later chunk never re-arms anything
+  state     : each firing is one price_alert_events row (unique per alert and
+              price day). rebuild() derives who is armed from those rows and
+              the commodity's daily highs in the market index, so any process
+              — API worker or ingest CLI — picks up where the last run ended
+  delivery  : GET /api/alerts/notifications reads a user's undelivered rows
+              and collapses them with notifications() into one message per
+              (crop, day) for the highest threshold crossed
+
+services/mandi_ingest.py calls evaluate() for every validated chunk it saves.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+Subscription = Tuple[int, int, str, float]      # (subscription id, user id, crop, threshold)
+History = Callable[[str], Tuple[np.ndarray, np.ndarray]]   # crop → (days, highest modal price per day)
+
+
+def _day(value) -> int:
+    """A date → days since the epoch."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+class _CommodityAlerts:
+    """Sorted thresholds of one commodity with aligned subscription columns and its current price day."""
+
+    __slots__ = ("thresholds", "ids", "users", "armed", "day", "day_max", "where")
+
+    def __init__(self, thresholds: np.ndarray, ids: np.ndarray, users: np.ndarray, armed: np.ndarray):
+        self.thresholds = thresholds
+        self.ids = ids
+        self.users = users
+        self.armed = armed
+        self.day: Optional[int] = None        # latest price day seen
+        self.day_max = 0.0                    # highest modal price on that day so far
+        self.where: Tuple[Optional[str], Optional[str]] = (None, None)   # (market, state) of that price
+
+    def advance(self, day: int, price: float, where: tuple) -> np.ndarray:
+        """Fold one day's highest price in; returns the positions that fire."""
+        if self.day is not None and day < self.day:
+            return np.empty(0, dtype=np.int64)            # late report for a day already passed
+        if self.day is None or day > self.day:
+            if self.day is not None:
+                # The previous day is complete: alerts above its high were priced below → re-arm
+                self.armed[np.searchsorted(self.thresholds, self.day_max, side="right"):] = True
+            self.day, self.day_max, self.where = day, price, where
+        elif price > self.day_max:
+            self.day_max, self.where = price, where
+        hit = int(np.searchsorted(self.thresholds, self.day_max, side="right"))
+        fire = np.flatnonzero(self.armed[:hit])
+        self.armed[fire] = False
+        return fire
+
+
+class PriceAlertEngine:
+    """Index of active price alerts for one ingest run, matched against its price batches."""
+
+    def __init__(self):
+        self._by_commodity: Dict[str, _CommodityAlerts] = {}
+        self.n_subscriptions = 0
+
+    # ── Index ─────────────────────────────────────────────
+    def load(self, subscriptions: Iterable[Subscription], fired: Optional[Dict[int, int]] = None,
+             history: Optional[History] = None):
+        """
+        Replace the index with `subscriptions` (bulk: one sort per commodity).
+        `fired` maps a subscription id to the last day it fired; `history`
+        gives a commodity's daily highs. An alert that fired is armed again
+        only if a complete day after that one priced the commodity below its
+        threshold — the same rule evaluate() applies.
+        """
+        rows = [(int(i), int(u), (c or "").strip().lower(), float(t))
+                for i, u, c, t in subscriptions if c and t is not None]
+        fired = fired or {}
+        by_commodity: Dict[str, _CommodityAlerts] = {}
+        if rows:
+            ids, users, crops, thresholds = (np.array(col) for col in zip(*rows))
+            order = np.lexsort((ids, thresholds, crops))
+            crops, ids, users, thresholds = crops[order], ids[order], users[order], thresholds[order]
+            ids, users, thresholds = ids.astype(np.int64), users.astype(np.int64), thresholds.astype(np.float64)
+            fired_day = np.array([fired.get(i, -1) for i in ids.tolist()], dtype=np.int64)
+            starts = np.flatnonzero(np.r_[True, crops[1:] != crops[:-1]])
+            for start, stop in zip(starts.tolist(), np.r_[starts[1:], len(crops)].tolist()):
+                key = str(crops[start])
+                part = slice(start, stop)
+                days, highs = history(key) if history else (np.empty(0), np.empty(0))
+                armed = fired_day[part] < 0
+                if len(days) > 1:
+                    # Lowest daily high over the complete days after each alert's firing day
+                    low = np.minimum.accumulate(highs[:-1][::-1])[::-1]
+                    after = np.searchsorted(days[:-1], fired_day[part], side="right")
+                    seen = after < len(low)
+                    armed |= seen & (low[np.minimum(after, len(low) - 1)] < thresholds[part])
+                alerts = _CommodityAlerts(thresholds[part], ids[part], users[part], armed)
+                if len(days):
+                    alerts.day, alerts.day_max = int(days[-1]), float(highs[-1])
+                by_commodity[key] = alerts
+        self._by_commodity = by_commodity
+        self.n_subscriptions = len(rows)
+
+    async def rebuild(self, db, history: Optional[History] = None) -> int:
+        """Load every active price alert and its last firing day from the DB; returns how many are indexed."""
+        from sqlalchemy import func, select
+        from db_models import AlertSubscription, PriceAlertEvent
+
+        subs = await db.execute(
+            select(AlertSubscription.id, AlertSubscription.user_id,
+                   AlertSubscription.crop_name, AlertSubscription.price_threshold)
+            .where(AlertSubscription.alert_type == "price_alert", AlertSubscription.is_active.is_(True))
+        )
+        last = await db.execute(
+            select(PriceAlertEvent.subscription_id, func.max(PriceAlertEvent.price_date))
+            .group_by(PriceAlertEvent.subscription_id)
+        )
+        fired = {sub_id: _day(day) for sub_id, day in last.all() if day is not None}
+        self.load(subs.all(), fired, history)
+        return self.n_subscriptions
+
+    # ── Matching ──────────────────────────────────────────
+    def evaluate(self, prices: pd.DataFrame) -> List[Dict]:
+        """
+        Match a batch of mandi rows (commodity, state, market, date,
+        modal_price) against the index, day by day. Returns one event per
+        alert that fired (price_alert_events rows).
+        """
+        if prices.empty or not self._by_commodity:
+            return []
+        # Highest modal price per (commodity, day) in the batch, with where it was reported;
+        # names are normalized on those rows, not on every mandi row
+        best = prices.loc[prices.groupby(["commodity", "date"], sort=False, observed=True)["modal_price"].idxmax()]
+        best = best.assign(alert_key=best["commodity"].astype(str).str.strip().str.lower())
+        best = best.loc[best.groupby(["alert_key", "date"], sort=False)["modal_price"].idxmax()]
+        best = best.sort_values("date", kind="stable")
+
+        events: List[Dict] = []
+        for row in best.itertuples(index=False):
+            alerts = self._by_commodity.get(row.alert_key)
+            if alerts is None:
+                continue
+            where = (getattr(row, "market", None) or None, getattr(row, "state", None) or None)
+            fire = alerts.advance(_day(row.date), float(row.modal_price), where)
+            if not len(fire):
+                continue
+            crop = str(row.commodity).strip().title()
+            price_date = pd.Timestamp(row.date).date()
+            market, state = alerts.where
+            for sub_id, user_id, threshold in zip(alerts.ids[fire].tolist(), alerts.users[fire].tolist(),
+                                                  alerts.thresholds[fire].tolist()):
+                events.append({
+                    "subscription_id": sub_id, "user_id": user_id, "crop_name": crop,
+                    "price_date": price_date, "price": alerts.day_max, "threshold": threshold,
+                    "market_name": market, "state": state,
+                })
+        return events
+
+
+async def save_events(db, events: List[Dict]):
+    """Insert fired alerts (committed); an alert already recorded for that price day is skipped."""
+    if not events:
+        return
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    from db_models import PriceAlertEvent
+
+    stmt = insert(PriceAlertEvent).on_conflict_do_nothing(index_elements=["subscription_id", "price_date"])
+    await db.execute(stmt, events)
+    await db.commit()
+
+
+def notifications(events: Iterable) -> List[Dict]:
+    """
+    Undelivered price_alert_events rows → one notification per (crop, price
+    day) for the highest threshold crossed, oldest first.
+    """
+    best: Dict[tuple, object] = {}
+    for e in events:
+        key = (e.crop_name.lower(), e.price_date)
+        if key not in best or e.threshold > best[key].threshold:
+            best[key] = e
+    out = []
+    for e in sorted(best.values(), key=lambda e: (e.price_date, e.id)):
+        where = ", ".join(v for v in (e.market_name, e.state) if v)
+        out.append({
+            "id": e.subscription_id,
+            "alert_type": "price_alert",
+            "crop_name": e.crop_name,
+            "message": f"{e.crop_name} reached ₹{e.price:,.0f}/quintal{f' at {where}' if where else ''} "
+                       f"on {e.price_date:%d %b %Y} (your alert: ₹{e.threshold:,.0f})",
+            "severity": "high" if e.price >= e.threshold * 1.1 else "medium",
+            "created_at": e.created_at,
+        })
+    return out
@@ -6,6 +6,7 @@ Layer 2: Personalization — Sowing date → real calendar dates
 Layer 3: Intelligence    — Weather-adjusted task modification
 Layer 4: Action          — Prioritized, actionable task list
 """
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from services.weather_service import get_weather_service
@@ -221,7 +222,7 @@ CROP_TIMELINES: Dict[str, Dict] = {
 # LAYER 2: PERSONALIZATION — Sowing date → Real dates
 # ──────────────────────────────────────────────────────────────
 
-def generate_schedule(
+async def generate_schedule(
     crop_name: str,
     sowing_date: str,  # "YYYY-MM-DD"
     state: str,
@@ -239,10 +240,12 @@ def generate_schedule(
 
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # Get weather for intelligence layer
+    # Get weather for intelligence layer (served from the prefetched store)
     weather_svc = get_weather_service()
-    current_weather = weather_svc.get_current(state)
-    forecast = weather_svc.get_forecast(state, days=7)
+    current_weather, forecast = await asyncio.gather(
+        weather_svc.get_current(state),
+        weather_svc.get_forecast(state, days=7),
+    )
 
     # Build forecast lookup
     forecast_map: Dict[str, Dict] = {}
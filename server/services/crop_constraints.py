@@ -0,0 +1,157 @@
+"""
+SmartAgri AI - Compiled Crop Constraint Matrix
+The crop encyclopedia compiled once into column arrays so the step-1
+suitability filter is a single vectorized pass over every crop instead of a
+Python loop doing a dozen dict lookups per crop per request.
+
+  ranges   : float64 arrays (one entry per crop) — min/max N, P, K, pH,
+             temperature, rainfall
+  seasons  : int64 bitmask per crop, one bit per season in the vocabulary
+  irrigation / soil types : same, one bit per category
+
+score() broadcasts, so it scores one plot against all crops, or a (plots × 6)
+matrix of inputs against all crops at once (bulk recommendations). Scores are
+accumulated in the same order as the original loop, so they are bit-identical.
+"""
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+
+# Filter defaults for a crop entry missing a key (same as the original loop)
+_RANGE_DEFAULTS = {
+    "min_n": 0, "max_n": 200,
+    "min_p": 0, "max_p": 200,
+    "min_k": 0, "max_k": 300,
+    "min_ph": 4, "max_ph": 9,
+    "min_temp": 10, "max_temp": 40,
+    "min_rainfall": 0, "max_rainfall": 400,
+}
+FEATURES = ("n", "p", "k", "ph", "temp", "rainfall")
+MIN_CHECKS = 3
+MIN_SCORE = 0.4
+
+
+class CropConstraintMatrix:
+    """Column-oriented view of CROP_DATABASE used by the suitability filter."""
+
+    def __init__(self, crops: List[dict]):
+        self.names = [c["name"] for c in crops]
+        self.index = {name.lower(): i for i, name in enumerate(self.names)}
+        for key, default in _RANGE_DEFAULTS.items():
+            setattr(self, key, np.array([c.get(key, default) for c in crops], dtype=np.float64))
+        # (6, crops) lower/upper bounds in FEATURES order, checked in one comparison
+        self.lo = np.stack([getattr(self, f"min_{f}") for f in FEATURES])
+        self.hi = np.stack([getattr(self, f"max_{f}") for f in FEATURES])
+
+        self.season_bits, self.seasons = self._bitmask(crops, "seasons")
+        self.irrigation_bits, self.irrigation = self._bitmask(crops, "irrigation_types")
+        self.soil_bits, self.soil_types = self._bitmask(crops, "soil_types")
+        self._categorical_cache: dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _bitmask(crops: List[dict], key: str):
+        vocab: dict[str, int] = {}
+        for c in crops:
+            for v in c.get(key, []):
+                vocab.setdefault(v, len(vocab))
+        if len(vocab) > 63:
+            raise ValueError(f"Too many distinct {key} for an int64 bitmask ({len(vocab)})")
+        masks = np.zeros(len(crops), dtype=np.int64)
+        for i, c in enumerate(crops):
+            for v in c.get(key, []):
+                masks[i] |= 1 << vocab[v]
+        return masks, vocab
+
+    @staticmethod
+    def bit(vocab: dict, value) -> int:
+        """Bit for a category value; 0 (matches nothing) if no crop lists it."""
+        b = vocab.get(value)
+        return 0 if b is None else 1 << b
+
+    def bits(self, vocab: dict, values) -> np.ndarray:
+        return np.array([self.bit(vocab, v) for v in values], dtype=np.int64)
+
+    def score(self, values, season_bit, irrigation_bit, soil_bit):
+        """
+        Suitability score and number of checks passed for every crop.
+        values = [N, P, K, pH, temperature, rainfall]:
+          shape (6,)        + scalar bits        → arrays of shape (crops,)
+          shape (plots, 6)  + (plots, 1) bits    → arrays of shape (plots, crops)
+        """
+        v = np.asarray(values, dtype=np.float64)[..., None]
+        in_range = (self.lo <= v) & (v <= self.hi)
+        ph_ok, temp_ok, rain_ok = in_range[..., 3, :], in_range[..., 4, :], in_range[..., 5, :]
+        ph = v[..., 3, :]
+        npk_score = in_range[..., :3, :].sum(axis=-2) / 3
+        ph_dist = np.minimum(np.abs(ph - self.min_ph), np.abs(ph - self.max_ph))
+
+        # Same accumulation order as the original per-crop loop → identical floats
+        score, checks = self._categorical(season_bit, irrigation_bit, soil_bit)
+        score = score + npk_score * 0.25
+        score = score + np.where(ph_ok, 0.1, np.maximum(0, 0.1 - ph_dist * 0.05))
+        score = score + temp_ok * 0.1
+        score = score + rain_ok * 0.05
+        checks = checks + (npk_score >= 0.66) + ph_ok
+        return score, checks
+
+    def _categorical(self, season_bit, irrigation_bit, soil_bit):
+        """Season + irrigation + soil part of the score (the loop's first three terms)."""
+        scalar = np.ndim(season_bit) == 0 and np.ndim(irrigation_bit) == 0 and np.ndim(soil_bit) == 0
+        key = (int(season_bit), int(irrigation_bit), int(soil_bit)) if scalar else None
+        if key is not None and key in self._categorical_cache:
+            return self._categorical_cache[key]
+
+        season_ok = (self.season_bits & season_bit) != 0
+        irrigation_ok = (self.irrigation_bits & irrigation_bit) != 0
+        soil_ok = (self.soil_bits & soil_bit) != 0
+        score = season_ok * 0.2
+        score = score + irrigation_ok * 0.15
+        score = score + soil_ok * 0.15
+        checks = season_ok.astype(np.int64) + irrigation_ok + soil_ok
+        if key is not None:
+            # Few distinct (season, irrigation, soil) combinations — memoize them
+            self._categorical_cache[key] = (score, checks)
+        return score, checks
+
+    def filter(self, soil: dict, weather: dict, season: str, irrigation: str) -> List[dict]:
+        """Step 1 for one plot: crops passing ≥3 checks with score ≥ 0.4, in encyclopedia order."""
+        score, checks = self.score(
+            [soil["N"], soil["P"], soil["K"], soil["ph"],
+             weather.get("temperature", 25), weather.get("rainfall", 100)],
+            self.bit(self.seasons, season),
+            self.bit(self.irrigation, irrigation),
+            self.bit(self.soil_types, soil.get("soil_type", "Loamy")),
+        )
+        keep = np.flatnonzero((checks >= MIN_CHECKS) & (score >= MIN_SCORE)).tolist()
+        scores, passed = score.tolist(), checks.tolist()
+        return [
+            {"name": self.names[i], "suitability_score": min(scores[i], 1.0), "checks_passed": passed[i]}
+            for i in keep
+        ]
+
+    def filter_many(self, plots: List[tuple]) -> List[List[dict]]:
+        """filter() for many (soil, weather, season, irrigation) plots in one (plots × crops) pass."""
+        if not plots:
+            return []
+        values = np.array([
+            [soil["N"], soil["P"], soil["K"], soil["ph"],
+             weather.get("temperature", 25), weather.get("rainfall", 100)]
+            for soil, weather, _, _ in plots
+        ], dtype=np.float64)
+        score, checks = self.score(
+            values,
+            self.bits(self.seasons, [p[2] for p in plots])[:, None],
+            self.bits(self.irrigation, [p[3] for p in plots])[:, None],
+            self.bits(self.soil_types, [p[0].get("soil_type", "Loamy") for p in plots])[:, None],
+        )
+        keep = (checks >= MIN_CHECKS) & (score >= MIN_SCORE)
+        score = np.minimum(score, 1.0).tolist()
+        checks = checks.tolist()
+        return [
+            [
+                {"name": self.names[j], "suitability_score": score[i][j], "checks_passed": checks[i][j]}
+                for j in np.flatnonzero(row).tolist()
+            ]
+            for i, row in enumerate(keep)
+        ]
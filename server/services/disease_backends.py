@@ -0,0 +1,186 @@
+"""
+SmartAgri AI - Disease Model Backends
+Pluggable runtimes for the two disease classifiers. Selected by the
+DISEASE_BACKEND setting:
+
+  hf    : transformers.pipeline (PyTorch eager) — downloads from the HF hub
+  onnx  : ONNX Runtime on CPU, optionally INT8 dynamic-quantized. Models are
+          produced by ml/export_disease_onnx.py into DISEASE_ONNX_DIR:
+              primary.onnx   primary.int8.onnx   primary.json
+              secondary.onnx secondary.int8.onnx secondary.json
+          (*.json = labels + image-processor config, so no transformers import
+          is needed at serving time)
+
+Every backend exposes  predict(images) -> [(primary_raw, secondary_raw), ...]
+where each *_raw is a pipeline-style list of {"label", "score"} (top-5).
+Images are preprocessed ONCE for both models (services/image_preprocess.py)
+and the models run on those precomputed tensors, not on PIL images.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+from services.image_preprocess import PreprocessSpec, build_batches, required_side
+
+logger = logging.getLogger("disease_backends")
+
+PRIMARY_MODEL = "linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification"
+SECONDARY_MODEL = "wambugu71/crop_leaf_diseases_vit"
+TOP_K = 5
+
+
+def _topk(logits: np.ndarray, labels: list[str]) -> list[list]:
+    """Row-wise softmax + top-k → pipeline-style [{"label", "score"}, ...] per row."""
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    k = min(TOP_K, probs.shape[1])
+    top = np.argsort(-probs, axis=1)[:, :k]
+    return [
+        [{"label": labels[j], "score": float(probs[i, j])} for j in top[i]]
+        for i in range(probs.shape[0])
+    ]
+
+
+class _Backend:
+    """Shared predict(): one preprocessing pass, then each model on its tensor batch."""
+
+    primary = None
+    secondary = None
+
+    def _models(self) -> list:
+        return [m for m in (self.primary, self.secondary) if m is not None]
+
+    @property
+    def decode_side(self) -> int:
+        """Minimum shortest-edge the decoder must keep for every active model."""
+        return required_side([m.spec for m in self._models()])
+
+    def predict(self, images: list) -> list[tuple[list, list]]:
+        specs = [m.spec for m in self._models()]
+        batches = build_batches(images, specs)
+        p1_out = self.primary.run(batches[0])
+        p2_out = self.secondary.run(batches[1]) if self.secondary else [[] for _ in images]
+        return list(zip(p1_out, p2_out))
+
+
+class _TorchClassifier:
+    """HF model taken out of its pipeline, fed precomputed pixel_values."""
+
+    def __init__(self, pipe):
+        self.model = pipe.model.eval()
+        self.spec = PreprocessSpec.from_processor(pipe.image_processor.to_dict())
+        config = self.model.config
+        self.labels = [config.id2label[i] for i in range(len(config.id2label))]
+
+    def run(self, pixel_values: np.ndarray) -> list[list]:
+        import torch
+        with torch.inference_mode():
+            logits = self.model(pixel_values=torch.from_numpy(pixel_values)).logits
+        return _topk(logits.float().numpy(), self.labels)
+
+
+class HFPipelineBackend(_Backend):
+    """transformers models (PyTorch eager), loaded through the HF pipeline factory."""
+
+    name = "hf"
+
+    def __init__(self):
+        self.primary: Optional[_TorchClassifier] = None
+        self.secondary: Optional[_TorchClassifier] = None
+
+    def load(self):
+        from transformers import pipeline as hf_pipeline, AutoImageProcessor
+
+        logger.info("🔬 Loading primary disease model (MobileNetV2, 38 classes)...")
+        self.primary = _TorchClassifier(
+            hf_pipeline("image-classification", model=PRIMARY_MODEL, top_k=TOP_K)
+        )
+        logger.info("✅ Primary model loaded")
+
+        # Secondary model load — non-fatal if it fails
+        try:
+            logger.info("🔬 Loading secondary disease model (ViT, 15 classes)...")
+            self.secondary = _TorchClassifier(hf_pipeline(
+                "image-classification",
+                model=SECONDARY_MODEL,
+                image_processor=AutoImageProcessor.from_pretrained(SECONDARY_MODEL, use_fast=False),
+                top_k=TOP_K,
+            ))
+            logger.info("✅ Secondary model loaded  (dual-model ensemble active)")
+        except Exception as e2:
+            logger.warning(f"⚠️  Secondary model failed ({e2}); running primary-only mode")
+            self.secondary = None
+
+
+class _OnnxClassifier:
+    """One exported classifier: InferenceSession + the preprocessing it was trained with."""
+
+    def __init__(self, onnx_dir: str, stem: str, quantized: bool, threads: int):
+        import onnxruntime as ort
+
+        with open(os.path.join(onnx_dir, f"{stem}.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.labels: list[str] = meta["labels"]
+        self.spec = PreprocessSpec.from_processor(meta["processor"])
+
+        path = os.path.join(onnx_dir, f"{stem}.int8.onnx" if quantized else f"{stem}.onnx")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.path = path
+
+    def run(self, pixel_values: np.ndarray) -> list[list]:
+        """Batched forward pass over an (N, 3, H, W) array → top-k per row."""
+        logits = self.session.run(None, {self.input_name: pixel_values})[0]
+        return _topk(logits, self.labels)
+
+
+class OnnxBackend(_Backend):
+    """ONNX Runtime CPU backend (FP32 or INT8 dynamic-quantized)."""
+
+    name = "onnx"
+
+    def __init__(self, onnx_dir: str, quantized: bool = False, threads: int = 0):
+        self.onnx_dir = onnx_dir
+        self.quantized = quantized
+        self.threads = threads
+        self.primary: Optional[_OnnxClassifier] = None
+        self.secondary: Optional[_OnnxClassifier] = None
+
+    def load(self):
+        logger.info(f"🔬 Loading ONNX disease models from {self.onnx_dir} "
+                    f"({'INT8' if self.quantized else 'FP32'}, threads={self.threads or 'auto'})...")
+        self.primary = _OnnxClassifier(self.onnx_dir, "primary", self.quantized, self.threads)
+        logger.info(f"✅ Primary model loaded ({os.path.basename(self.primary.path)})")
+        try:
+            self.secondary = _OnnxClassifier(self.onnx_dir, "secondary", self.quantized, self.threads)
+            logger.info("✅ Secondary model loaded  (dual-model ensemble active)")
+        except Exception as e2:
+            logger.warning(f"⚠️  Secondary ONNX model failed ({e2}); running primary-only mode")
+            self.secondary = None
+
+
+def create_backend(name: Optional[str] = None):
+    """Build (but do not load) the backend named by `name` or DISEASE_BACKEND."""
+    from config import get_settings
+    settings = get_settings()
+    name = (name or settings.DISEASE_BACKEND).lower()
+    if name == "hf":
+        return HFPipelineBackend()
+    if name == "onnx":
+        return OnnxBackend(
+            settings.DISEASE_ONNX_DIR,
+            quantized=settings.DISEASE_ONNX_QUANTIZED,
+            threads=settings.DISEASE_ONNX_THREADS,
+        )
+    raise ValueError(f"Unknown DISEASE_BACKEND '{name}' (expected 'hf' or 'onnx')")
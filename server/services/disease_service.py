@@ -7,11 +7,16 @@ Dual Hugging Face model inference:
              → 15 classes (Corn/Potato/Rice/Wheat), 5.5 MB, fast validation
 Ensemble  : Both run in parallel; if crops agree, average confidences.
             Primary always wins on non-overlapping classes.
+Backend   : DISEASE_BACKEND = hf (transformers pipelines) | onnx (ONNX Runtime,
+            optionally INT8) — see services/disease_backends.py
 """
 from __future__ import annotations
-import io, logging, threading
+import asyncio, io, json, os, hashlib, logging, threading
+from collections import OrderedDict
 from typing import Optional
 from PIL import Image
+from services.image_preprocess import decode_image
+from services.model_manager import ModelNotReadyError
 
 logger = logging.getLogger("disease_service")
 
@@ -531,55 +536,36 @@ SEVERITY_META = {
 }
 
 # ─────────────────────────────────────────────────────────────────────────────
-# MODEL LOADERS  (lazy — loaded once on first request)
+# MODEL LOADERS  (preloaded by the model manager at startup; lazy retry on request)
 # ─────────────────────────────────────────────────────────────────────────────
 _lock    = threading.Lock()
-_pipe1   = None   # Primary: linkanjarad MobileNetV2  (38 classes)
-_pipe2   = None   # Secondary: wambugu71 ViT-Tiny     (15 classes)
+_backend = None   # HFPipelineBackend | OnnxBackend  (see services/disease_backends.py)
 _hf_ready = False
 _hf_error: Optional[str] = None
 _last_load_attempt: float = 0.0
 _loading_in_progress: bool = False
-
+# Event loop of the model manager, set only when the models run in THIS process
+# (DISEASE_WORKERS=0); a lazy load reports to the manager through it
+_manager_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
 def _load_models():
-    global _pipe1, _pipe2, _hf_ready, _hf_error
+    """Load the backend selected by DISEASE_BACKEND (hf | onnx)."""
+    global _backend, _hf_ready, _hf_error
     with _lock:
         if _hf_ready:  # Already loaded successfully — skip
             return
         try:
-            from transformers import pipeline as hf_pipeline, AutoImageProcessor
-
-            logger.info("🔬 Loading primary disease model (MobileNetV2, 38 classes)...")
-            _pipe1 = hf_pipeline(
-                "image-classification",
-                model="linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
-                top_k=5,
-            )
-            logger.info("✅ Primary model loaded")
-
-            # Secondary model load — non-fatal if it fails
-            try:
-                logger.info("🔬 Loading secondary disease model (ViT, 15 classes)...")
-                _pipe2 = hf_pipeline(
-                    "image-classification",
-                    model="wambugu71/crop_leaf_diseases_vit",
-                    image_processor=AutoImageProcessor.from_pretrained(
-                        "wambugu71/crop_leaf_diseases_vit", use_fast=False
-                    ),
-                    top_k=5,
-                )
-                logger.info("✅ Secondary model loaded  (dual-model ensemble active)")
-            except Exception as e2:
-                logger.warning(f"⚠️  Secondary model failed ({e2}); running primary-only mode")
-                _pipe2 = None
+            from services.disease_backends import create_backend
 
+            backend = create_backend()
+            backend.load()
+            _backend = backend
             _hf_ready = True
 
         except Exception as e:
             _hf_error = str(e)
-            logger.error(f"❌ HF model load failed: {e}")
+            logger.error(f"❌ Disease model load failed: {e}")
 
 
 
@@ -605,6 +591,12 @@ def _ensure_models():
         global _loading_in_progress
         try:
             _load_models()
+            if _hf_ready and _manager_loop is not None:
+                from services.model_manager import get_model_manager
+                try:
+                    _manager_loop.call_soon_threadsafe(get_model_manager().mark_ready, "disease", _backend)
+                except RuntimeError:
+                    pass    # loop already closed (shutdown)
         finally:
             _loading_in_progress = False
 
@@ -696,104 +688,530 @@ def _ensemble_predictions(p1_results: list, p2_results: list) -> list:
     return [{"label": k, "score": min(v, 0.99)} for k, v in sorted_results[:5]]
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# INFERENCE STAGES  (shared by single-image and micro-batched paths)
+# ─────────────────────────────────────────────────────────────────────────────
+NOT_PLANT_THRESHOLD = 0.20   # tuned: real leaf images score >= 0.40
+
+
+def _infer_batch(images: list) -> list[tuple[list, list]]:
+    """
+    Run both models ONCE over a list of decoded PIL images; the backend
+    builds the normalized tensors for both models in a single pass.
+    Returns one (primary_raw, secondary_raw) pair per image.
+    """
+    return _backend.predict(images)
+
+
+def _ensemble_raw(p1_raw: list, p2_raw: list) -> list:
+    """Apply the non-plant guard and merge raw outputs into ranked predictions."""
+    logger.info(f"Primary top-1: {p1_raw[0] if p1_raw else 'N/A'}")
+    logger.info(f"Secondary top-1: {p2_raw[0] if p2_raw else 'N/A'}")
+
+    # ── NON-PLANT IMAGE GUARD ──────────────────────────────────────────
+    # PlantVillage MobileNetV2 is trained ONLY on plant/leaf images.
+    # When it sees a non-plant image it spreads probability very flatly
+    # across 38 classes — top-1 score will be ~0.03-0.10 (near-uniform).
+    # If top-1 confidence from primary model is below threshold → reject.
+    p1_top_score = p1_raw[0]["score"] if p1_raw else 0.0
+    p2_top_score = p2_raw[0]["score"] if p2_raw else 0.0
+
+    if p1_top_score < NOT_PLANT_THRESHOLD and p2_top_score < NOT_PLANT_THRESHOLD:
+        logger.warning(
+            f"Non-plant image rejected: p1={p1_top_score:.3f}, p2={p2_top_score:.3f}"
+        )
+        raise ValueError(
+            "This image does not appear to be a plant or leaf. "
+            "Please upload a clear photo of a crop leaf for diagnosis."
+        )
+    # ──────────────────────────────────────────────────────────────────
+
+    return _ensemble_predictions(p1_raw, p2_raw)
+
+
+def _build_result(all_preds: list) -> dict:
+    """Enrich ensembled predictions with DISEASE_DB info (top-3 + primary fields)."""
+    top3 = []
+    for pred in all_preds[:3]:
+        info = _get_disease_info(pred["label"])
+        severity = info.get("severity", "moderate")
+        top3.append({
+            "label": pred["label"],
+            "disease": info["disease"],
+            "confidence": round(pred["score"], 4),
+            "severity": severity,
+            "severity_label": SEVERITY_META[severity]["label"],
+            "severity_emoji": SEVERITY_META[severity]["emoji"],
+            "severity_color": SEVERITY_META[severity]["color"],
+            "crops": info["crops"],
+        })
+
+    # Primary result = highest confidence
+    best = top3[0]
+    primary_info = _get_disease_info(all_preds[0]["label"])
+
+    return {
+        # Primary result fields (backward compat)
+        "disease":          primary_info["disease"],
+        "confidence":       best["confidence"],
+        "severity":         best["severity"],
+        "severity_label":   best["severity_label"],
+        "severity_emoji":   best["severity_emoji"],
+        "severity_color":   best["severity_color"],
+        "crops":            primary_info["crops"],
+        "description":      primary_info["description"],
+        "symptoms":         primary_info["symptoms"],
+        "treatment":        primary_info["treatment"],
+        "prevention":       primary_info["prevention"],
+        # Enhanced fields
+        "top_predictions":  top3,
+        "models_used":      ["linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
+                              "wambugu71/crop_leaf_diseases_vit"],
+        "inference_mode":   "dual_model_ensemble",
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PUBLIC API
 # ─────────────────────────────────────────────────────────────────────────────
-def diagnose_image_bytes(image_bytes: bytes, filename: str = "leaf.jpg") -> dict:
+def _unavailable(filename: str, reason: str):
     """
-    Run dual-model HF inference on raw image bytes.
-    Returns enriched disease info with top-3 predictions.
-    Falls back to rule-based simulation if models unavailable or still loading.
+    What to return when real inference is impossible for one image.
+    With DISEASE_SIMULATION_FALLBACK (dev/demo) → a simulated diagnosis;
+    otherwise → ModelNotReadyError, so the API answers 503 instead of
+    handing a farmer a random disease.
+    """
+    from config import get_settings
+    if get_settings().DISEASE_SIMULATION_FALLBACK:
+        return _simulate_fallback(filename)
+    return ModelNotReadyError(reason)
+
+
+def diagnose_image_batch(items: list[tuple[bytes, str]]) -> list:
+    """
+    Diagnose many (image_bytes, filename) pairs with ONE forward pass per model.
+    Returns a list aligned with `items`; each entry is either a result dict or
+    the exception raised for that image (ValueError = unreadable / non-plant
+    image, ModelNotReadyError = models not loaded). A bad image never fails
+    the rest of the batch.
     """
     # Kick off background load if not started yet — NEVER blocks the request thread
     _ensure_models()
 
-    # If models are not ready yet (still downloading or failed), use instant fallback
     if not _hf_ready:
         if _loading_in_progress:
-            logger.info("HF models still loading — returning simulation result")
+            logger.info("Disease models still loading")
         else:
-            logger.warning(f"HF models unavailable ({_hf_error}), using simulation fallback")
-        return _simulate_fallback(filename)
+            logger.warning(f"Disease models unavailable ({_hf_error})")
+        reason = "Disease models are still loading. Please retry shortly."
+        return [_unavailable(filename, reason) for _, filename in items]
 
-    try:
-        img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-
-        # Run both models
-        p1_raw = _pipe1(img) if _pipe1 else []
-        p2_raw = _pipe2(img) if _pipe2 else []
-
-        logger.info(f"Primary top-1: {p1_raw[0] if p1_raw else 'N/A'}")
-        logger.info(f"Secondary top-1: {p2_raw[0] if p2_raw else 'N/A'}")
-
-        # ── NON-PLANT IMAGE GUARD ──────────────────────────────────────────
-        # PlantVillage MobileNetV2 is trained ONLY on plant/leaf images.
-        # When it sees a non-plant image it spreads probability very flatly
-        # across 38 classes — top-1 score will be ~0.03-0.10 (near-uniform).
-        # If top-1 confidence from primary model is below threshold → reject.
-        p1_top_score = p1_raw[0]["score"] if p1_raw else 0.0
-        p2_top_score = p2_raw[0]["score"] if p2_raw else 0.0
-        NOT_PLANT_THRESHOLD = 0.20   # tuned: real leaf images score >= 0.40
-
-        if p1_top_score < NOT_PLANT_THRESHOLD and p2_top_score < NOT_PLANT_THRESHOLD:
-            logger.warning(
-                f"Non-plant image rejected: p1={p1_top_score:.3f}, p2={p2_top_score:.3f}"
-            )
-            raise ValueError(
-                "This image does not appear to be a plant or leaf. "
-                "Please upload a clear photo of a crop leaf for diagnosis."
+    results: list = [None] * len(items)
+    images, positions = [], []
+    for i, (image_bytes, filename) in enumerate(items):
+        try:
+            # Single reduced-size decode shared by both models (JPEG draft mode)
+            images.append(decode_image(image_bytes, _backend.decode_side))
+            positions.append(i)
+        except Exception as e:
+            logger.error(f"Image decode error ({filename}): {e}")
+            results[i] = ValueError("Could not read this image. Please upload a JPEG, PNG or WEBP photo.")
+
+    if images:
+        try:
+            raw_pairs = _infer_batch(images)
+        except Exception as e:
+            logger.error(f"Inference error: {e}")
+            raw_pairs = None
+
+        for i, pos in enumerate(positions):
+            filename = items[pos][1]
+            if raw_pairs is None:
+                results[pos] = _unavailable(filename, "Disease model inference failed.")
+                continue
+            try:
+                results[pos] = _build_result(_ensemble_raw(*raw_pairs[i]))
+            except ValueError as ve:
+                # Non-plant image guard — surfaced so router returns HTTP 400
+                results[pos] = ve
+            except Exception as e:
+                logger.error(f"Inference error: {e}")
+                results[pos] = _unavailable(filename, "Disease model inference failed.")
+
+    return results
+
+
+def warm_up(batch_size: int = 1):
+    """Run throw-away inferences so the first real request pays no lazy-init cost."""
+    if not _hf_ready:
+        raise ModelNotReadyError(_hf_error or "Disease models not loaded")
+    leaf = Image.new("RGB", (640, 480), (46, 125, 50))
+    for n in sorted({1, max(1, batch_size)}):
+        _infer_batch([leaf] * n)
+
+
+def diagnose_image_bytes(image_bytes: bytes, filename: str = "leaf.jpg") -> dict:
+    """
+    Run dual-model HF inference on raw image bytes.
+    Returns enriched disease info with top-3 predictions.
+    Raises ModelNotReadyError while models load (unless simulation fallback is enabled).
+    """
+    result = diagnose_image_batch([(image_bytes, filename)])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+_engine = None
+_executor = None
+
+
+def get_inference_executor():
+    """Worker-process pool for diagnosis, or None when DISEASE_WORKERS=0."""
+    global _executor
+    if _executor is None:
+        from config import get_settings
+        settings = get_settings()
+        if settings.DISEASE_WORKERS > 0:
+            from services.inference_executor import InferenceExecutor
+            _executor = InferenceExecutor(
+                workers=settings.DISEASE_WORKERS,
+                torch_threads=settings.DISEASE_TORCH_THREADS,
+                warmup_batch=settings.DISEASE_BATCH_SIZE,
             )
-        # ──────────────────────────────────────────────────────────────────
-
-        # Ensemble
-        all_preds = _ensemble_predictions(p1_raw, p2_raw)
-
-        # Build top-3 predictions
-        top3 = []
-        for pred in all_preds[:3]:
-            info = _get_disease_info(pred["label"])
-            severity = info.get("severity", "moderate")
-            top3.append({
-                "label": pred["label"],
-                "disease": info["disease"],
-                "confidence": round(pred["score"], 4),
-                "severity": severity,
-                "severity_label": SEVERITY_META[severity]["label"],
-                "severity_emoji": SEVERITY_META[severity]["emoji"],
-                "severity_color": SEVERITY_META[severity]["color"],
-                "crops": info["crops"],
-            })
-
-        # Primary result = highest confidence
-        best = top3[0]
-        primary_info = _get_disease_info(all_preds[0]["label"])
+    return _executor
+
+
+def get_diagnosis_engine():
+    """Shared micro-batching engine that feeds diagnose_image_batch."""
+    global _engine
+    if _engine is None:
+        from config import get_settings
+        from services.inference_engine import MicroBatchEngine
+        settings = get_settings()
+        executor = get_inference_executor()
+        _engine = MicroBatchEngine(
+            diagnose_image_batch,
+            max_batch_size=settings.DISEASE_BATCH_SIZE,
+            max_wait_ms=settings.DISEASE_BATCH_MAX_WAIT_MS,
+            name="disease",
+            executor=executor,
+            max_concurrency=executor.workers if executor else 1,
+            max_queue=settings.DISEASE_QUEUE_MAX,
+            timeout_s=settings.DISEASE_REQUEST_TIMEOUT_S,
+        )
+    return _engine
 
+
+def models_ready() -> bool:
+    """True once the disease models are loaded and warm wherever inference runs."""
+    from services.model_manager import get_model_manager
+    return get_model_manager().is_ready("disease")
+
+
+def register_models(manager):
+    """Register the disease ensemble with the model lifecycle manager."""
+    global _manager_loop
+    from config import get_settings
+    settings = get_settings()
+    executor = get_inference_executor()
+
+    if executor is not None:
+        async def _load():
+            # Each worker loads + warms its own copy in its initializer
+            executor.start()
+            await executor.warm_up()
+            if executor.stats()["workers_ready"] == 0:
+                errors = [w["error"] for w in executor.stats()["worker_status"] if w["error"]]
+                raise RuntimeError(errors[0] if errors else "no inference worker became ready")
+            return executor
+        manager.register("disease", _load, description=f"{settings.DISEASE_BACKEND} ensemble in "
+                         f"{executor.workers} worker process(es)")
+    else:
+        _manager_loop = asyncio.get_running_loop()
+
+        def _load():
+            _load_models()
+            if not _hf_ready:
+                raise RuntimeError(_hf_error or "Disease models failed to load")
+            return _backend
+        manager.register("disease", _load, warmup=lambda _: warm_up(settings.DISEASE_BATCH_SIZE),
+                         description=f"{settings.DISEASE_BACKEND} ensemble (in-process)")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESULT CACHE  (content-addressed — same photo never runs the models twice)
+#   key 1: SHA-256 of the raw upload bytes            → exact re-uploads
+#   key 2: 64-bit dHash of a 9×8 grayscale thumbnail  → WhatsApp re-encodes,
+#          resizes and re-compressions of the same leaf photo (optional)
+# Stores only the ensembled top predictions (label + score) or the non-plant
+# rejection; the full response is rebuilt from DISEASE_DB on every hit.
+# ─────────────────────────────────────────────────────────────────────────────
+def _perceptual_hash(image_bytes: bytes) -> Optional[str]:
+    """Difference hash (dHash) — robust to re-encoding, resizing and mild compression."""
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        img.draft("L", (64, 64))   # JPEG: decode at 1/8 scale — no full-size decode
+        small = img.convert("L").resize((9, 8), Image.BILINEAR)
+        px = list(small.getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+class DiagnosisCache:
+    """Bounded in-memory LRU with an optional on-disk JSON tier."""
+
+    def __init__(self, max_entries: int = 2048, use_phash: bool = True, disk_dir: str = ""):
+        self.max_entries = max(1, int(max_entries))
+        self.use_phash = use_phash
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.phash_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def keys_for(image_bytes: bytes, use_phash: bool = True) -> list[str]:
+        keys = ["sha256:" + hashlib.sha256(image_bytes).hexdigest()]
+        if use_phash:
+            ph = _perceptual_hash(image_bytes)
+            if ph:
+                keys.append("dhash:" + ph)
+        return keys
+
+    def get(self, keys: list[str]) -> Optional[dict]:
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if key.startswith("dhash:"):
+                        self.phash_hits += 1
+                    return entry
+        for key in keys:
+            entry = self._disk_get(key)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._insert(key, entry)
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, keys: list[str], entry: dict):
+        with self._lock:
+            for key in keys:
+                self._insert(key, entry)
+        self._disk_put_all(keys, entry)
+
+    async def aput(self, keys: list[str], entry: dict):
+        """put() for the event loop: memory tier inline, the JSON disk tier in a worker thread."""
+        with self._lock:
+            for key in keys:
+                self._insert(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_put_all, keys, entry)
+
+    def _insert(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key.replace(":", "_") + ".json")
+
+    def _disk_get(self, key: str) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put_all(self, keys: list[str], entry: dict):
+        for key in keys:
+            self._disk_put(key, entry)
+
+    def _disk_put(self, key: str, entry: dict):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)   # atomic — concurrent workers never read half a file
+        except OSError as e:
+            logger.warning(f"Diagnosis cache disk write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
         return {
-            # Primary result fields (backward compat)
-            "disease":          primary_info["disease"],
-            "confidence":       best["confidence"],
-            "severity":         best["severity"],
-            "severity_label":   best["severity_label"],
-            "severity_emoji":   best["severity_emoji"],
-            "severity_color":   best["severity_color"],
-            "crops":            primary_info["crops"],
-            "description":      primary_info["description"],
-            "symptoms":         primary_info["symptoms"],
-            "treatment":        primary_info["treatment"],
-            "prevention":       primary_info["prevention"],
-            # Enhanced fields
-            "top_predictions":  top3,
-            "models_used":      ["linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
-                                  "wambugu71/crop_leaf_diseases_vit"],
-            "inference_mode":   "dual_model_ensemble",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "perceptual_hits": self.phash_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "perceptual_hash": self.use_phash,
+            "disk_tier": bool(self.disk_dir),
         }
 
-    except ValueError:
-        # Non-plant image guard — re-raise so router returns HTTP 400
+
+_cache: Optional[DiagnosisCache] = None
+
+
+def get_diagnosis_cache() -> DiagnosisCache:
+    global _cache
+    if _cache is None:
+        from config import get_settings
+        settings = get_settings()
+        _cache = DiagnosisCache(
+            max_entries=settings.DISEASE_CACHE_SIZE,
+            use_phash=settings.DISEASE_CACHE_PHASH,
+            disk_dir=settings.DISEASE_CACHE_DIR,
+        )
+    return _cache
+
+
+def _result_from_cache(entry: dict) -> dict:
+    if "rejected" in entry:
+        raise ValueError(entry["rejected"])
+    result = _build_result(entry["predictions"])
+    result["cache_hit"] = True
+    return result
+
+
+async def diagnose_cached(image_bytes: bytes, filename: str = "leaf.jpg") -> dict:
+    """
+    Cache-first diagnosis used by the API: hashes the upload, serves a hit
+    straight from memory/disk, otherwise submits to the micro-batching engine
+    and stores the ensembled predictions. Simulation results are never cached.
+    """
+    from config import get_settings
+    if get_settings().DISEASE_CACHE_SIZE <= 0:
+        return await get_diagnosis_engine().submit((image_bytes, filename))
+
+    cache = get_diagnosis_cache()
+    keys = await asyncio.to_thread(DiagnosisCache.keys_for, image_bytes, cache.use_phash)
+    entry = await asyncio.to_thread(cache.get, keys)
+    if entry is not None:
+        return _result_from_cache(entry)
+
+    try:
+        result = await get_diagnosis_engine().submit((image_bytes, filename))
+    except ValueError as ve:
+        await cache.aput(keys, {"rejected": str(ve)})
         raise
-    except Exception as e:
-        logger.error(f"Inference error: {e}")
-        return _simulate_fallback(filename)
+    if result.get("inference_mode") == "dual_model_ensemble":
+        await cache.aput(keys, {"predictions": [
+            {"label": p["label"], "score": p["confidence"]} for p in result["top_predictions"]
+        ]})
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIELD SURVEYS  (many leaves from one field → per-image results + aggregate)
+# ─────────────────────────────────────────────────────────────────────────────
+async def diagnose_many(items: list[tuple[bytes, str]], window: int = 0):
+    """
+    Diagnose a list of (image_bytes, filename) and yield (index, result_or_exception)
+    in completion order. At most `window` images are in the engine at once
+    (default 2× DISEASE_BATCH_SIZE) so one large survey keeps batches full
+    without flooding the shared queue and starving single uploads.
+    """
+    from config import get_settings
+    window = window or 2 * get_settings().DISEASE_BATCH_SIZE
+    slots = asyncio.Semaphore(window)
+
+    async def _one(i: int, image_bytes: bytes, filename: str):
+        async with slots:
+            try:
+                return i, await diagnose_cached(image_bytes, filename)
+            except Exception as e:
+                return i, e
+
+    tasks = [asyncio.create_task(_one(i, b, fn)) for i, (b, fn) in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away mid-stream — don't keep inferring for nobody
+        for t in tasks:
+            t.cancel()
+
+
+class FieldSurveySummary:
+    """Running field-level aggregate: disease prevalence + severity distribution."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.diagnosed = 0
+        self.failed = 0
+        self.diseases: dict[str, dict] = {}
+        self.severity = {sev: 0 for sev in SEVERITY_META}
+
+    def add(self, result: dict):
+        self.diagnosed += 1
+        sev = result.get("severity", "moderate")
+        self.severity[sev] = self.severity.get(sev, 0) + 1
+        d = self.diseases.setdefault(result["disease"], {
+            "disease": result["disease"], "severity": sev, "count": 0, "confidence_sum": 0.0,
+        })
+        d["count"] += 1
+        d["confidence_sum"] += result.get("confidence", 0.0)
+
+    def add_failure(self):
+        self.failed += 1
+
+    def as_dict(self) -> dict:
+        n = self.diagnosed or 1
+        prevalence = sorted((
+            {
+                "disease": d["disease"],
+                "severity": d["severity"],
+                "count": d["count"],
+                "prevalence": round(d["count"] / n, 4),
+                "avg_confidence": round(d["confidence_sum"] / d["count"], 4),
+            }
+            for d in self.diseases.values()
+        ), key=lambda d: -d["count"])
+        diseased = self.diagnosed - self.severity.get("none", 0)
+        dominant = next((d for d in prevalence if d["severity"] != "none"), None)
+        return {
+            "images_total": self.total,
+            "images_diagnosed": self.diagnosed,
+            "images_failed": self.failed,
+            "infection_rate": round(diseased / n, 4) if self.diagnosed else 0.0,
+            "dominant_disease": dominant["disease"] if dominant else None,
+            "prevalence": prevalence,
+            "severity_distribution": {
+                sev: {
+                    "label": SEVERITY_META[sev]["label"] if sev in SEVERITY_META else sev,
+                    "count": count,
+                    "share": round(count / n, 4) if self.diagnosed else 0.0,
+                }
+                for sev, count in self.severity.items()
+            },
+        }
 
 
 def _simulate_fallback(filename: str) -> dict:
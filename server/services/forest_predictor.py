@@ -0,0 +1,147 @@
+"""
+SmartAgri AI - Compiled Tree-Ensemble Predictor
+Inference-only replacement for sklearn tree ensembles on the request path.
+
+sklearn's predict_proba on a single row spends most of its time in input
+validation and per-tree dispatch (200 trees → 200 Cython calls, plus a
+thread pool when n_jobs=-1). Here every tree is flattened once into shared
+contiguous node arrays:
+
+  feature[node]   int32    split feature (0 for leaves)
+  threshold[node] float64  split threshold (+inf for leaves → always "left")
+  children[2n+b]  int32    absolute left (b=0) / right (b=1) child; leaves
+                           point to themselves
+  leaf[node]      int32    row in the leaf-value table
+
+and all trees are walked together: one gather/compare/step per level for an
+(n_trees, n_rows) frontier, max_depth steps in total. Leaves are self-loops,
+so no per-node branching is needed.
+
+Follows sklearn's arithmetic: inputs are cast to float32 (as sklearn does
+before comparing against float64 thresholds), leaf class counts are
+normalized per tree, and tree probabilities are summed in tree order before
+dividing by n_trees. Results agree with predict_proba to ~1e-17 (last-ulp
+differences from SIMD summation in the normalization), and
+compile_classifier() verifies that on sample rows before it is used.
+"""
+from __future__ import annotations
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger("forest_predictor")
+
+
+class _FlatTrees:
+    """Node arrays for many sklearn `Tree` objects laid end to end."""
+
+    def __init__(self, trees: list, leaf_values: list):
+        features, thresholds, lefts, rights, leaf_rows, values = [], [], [], [], [], []
+        roots = []
+        node_offset = leaf_offset = 0
+        self.max_depth = 0
+        for tree, vals in zip(trees, leaf_values):
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(n, dtype=np.int64) + node_offset
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, own, tree.children_left + node_offset).astype(np.int32))
+            rights.append(np.where(is_leaf, own, tree.children_right + node_offset).astype(np.int32))
+
+            rows = np.full(n, -1, dtype=np.int32)
+            rows[is_leaf] = np.arange(is_leaf.sum(), dtype=np.int32) + leaf_offset
+            leaf_rows.append(rows)
+            values.append(vals[is_leaf])
+
+            roots.append(node_offset)
+            node_offset += n
+            leaf_offset += int(is_leaf.sum())
+            self.max_depth = max(self.max_depth, int(tree.max_depth))
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        # children[2*node] = left, children[2*node + 1] = right → branch-free step
+        self.children = np.empty(2 * node_offset, dtype=np.int32)
+        self.children[0::2] = np.concatenate(lefts)
+        self.children[1::2] = np.concatenate(rights)
+        self.leaf = np.concatenate(leaf_rows)
+        self.values = np.ascontiguousarray(np.concatenate(values))
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.n_trees = len(roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf-value row reached in every tree for every input row → (n_trees, n_rows)."""
+        n, n_features = X.shape
+        flat = X.ravel()
+        row_base = (np.arange(n, dtype=np.int64) * n_features)[None, :]
+        node = np.repeat(self.roots[:, None].astype(np.int64), n, axis=1)
+        for _ in range(self.max_depth):
+            x = flat.take(row_base + self.feature.take(node))
+            go_right = x > self.threshold.take(node)
+            node = self.children.take(2 * node + go_right)
+        return self.leaf.take(node)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children,
+                                      self.leaf, self.values, self.roots))
+
+
+class CompiledForestClassifier:
+    """Drop-in predict_proba for a fitted RandomForestClassifier / ExtraTreesClassifier."""
+
+    def __init__(self, forest):
+        trees = [est.tree_ for est in forest.estimators_]
+        leaf_values = []
+        for tree in trees:
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            vals = tree.value[:, 0, :].astype(np.float64)
+            normalizer = vals.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_values.append(vals / normalizer)
+        self._trees = _FlatTrees(trees, leaf_values)
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.n_classes_ = len(forest.classes_)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+        leaves = self._trees.apply(X)
+        # (n_trees, n_rows, n_classes) summed over axis 0 → sequential, tree order
+        proba = self._trees.values[leaves].sum(axis=0)
+        proba /= self._trees.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    @property
+    def nbytes(self) -> int:
+        return self._trees.nbytes
+
+
+def max_proba_error(reference, compiled, X: np.ndarray) -> float:
+    """Largest absolute predict_proba difference between two models on X."""
+    return float(np.max(np.abs(reference.predict_proba(X) - compiled.predict_proba(X))))
+
+
+def compile_classifier(model, check_rows: Optional[np.ndarray] = None, tolerance: float = 1e-9):
+    """
+    Compile a fitted tree-ensemble classifier. With `check_rows`, verify it
+    against the original predict_proba and return the ORIGINAL model (with a
+    warning) if they disagree beyond `tolerance`.
+    """
+    compiled = CompiledForestClassifier(model)
+    if check_rows is not None and len(check_rows):
+        err = max_proba_error(model, compiled, check_rows)
+        if err > tolerance:
+            logger.warning(f"⚠️  Compiled forest differs from sklearn by {err:.2e}; keeping sklearn backend")
+            return model
+    return compiled
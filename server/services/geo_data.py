@@ -240,6 +240,23 @@ STATE_DISTRICTS = {
     ],
 }
 
+# ─────────────────────────────────────────────────────────────────────
+# DISTRICT COORDINATES — map pins and district-level weather
+# (approximate lat/lng for key districts)
+# ─────────────────────────────────────────────────────────────────────
+DISTRICT_COORDS = {
+    "Pune":       {"lat": 18.5204, "lng": 73.8567},
+    "Nashik":     {"lat": 19.9975, "lng": 73.7898},
+    "Nagpur":     {"lat": 21.1458, "lng": 79.0882},
+    "Aurangabad": {"lat": 19.8762, "lng": 75.3433},
+    "Kolhapur":   {"lat": 16.7050, "lng": 74.2433},
+    "Solapur":    {"lat": 17.6599, "lng": 75.9064},
+    "Satara":     {"lat": 17.6805, "lng": 74.0183},
+    "Sangli":     {"lat": 16.8524, "lng": 74.5815},
+    "Latur":      {"lat": 18.4088, "lng": 76.5604},
+    "Ahmednagar": {"lat": 19.0948, "lng": 74.7480},
+}
+
 # ─────────────────────────────────────────────────────────────────────
 # REGIONAL CROPS — loaded from the authoritative per-district JSON
 # ─────────────────────────────────────────────────────────────────────
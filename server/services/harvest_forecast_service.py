@@ -13,12 +13,9 @@ Data sources:
   - AGMARKNET wholesale price records (2015-2025)
   - ICAR yield data by state
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 import math
-from services.real_crop_prices import (
-    get_monthly_price, get_all_monthly_history, REAL_MSP, REAL_SEASONAL
-)
 
 # ──────────────────────────────────────────────────────────────
 # CROP PRICE PROFILES — 50 crops with real Indian data
@@ -465,51 +462,6 @@ def _get_state_yield(crop: str, state: str, base_yield: float) -> float:
     factor = state_data.get(crop, state_data.get("_default", 1.0))
     return round(base_yield * factor, 1)
 
-# ──────────────────────────────────────────────────────────────
-# EXPONENTIAL SMOOTHING ENGINE
-# ──────────────────────────────────────────────────────────────
-
-def _holt_forecast(prices: List[float], alpha: float = 0.4, beta: float = 0.2, steps: int = 1) -> tuple:
-    """
-    Holt's Double Exponential Smoothing (trend-aware).
-    Returns (forecast, trend, forecast_error_pct).
-    """
-    if len(prices) < 2:
-        return prices[-1] if prices else 0, 0, 15.0
-
-    # Initialize
-    level = prices[0]
-    trend = prices[1] - prices[0]
-    errors = []
-
-    for i, actual in enumerate(prices[1:], 1):
-        forecast = level + trend
-        error = abs(actual - forecast) / actual * 100 if actual > 0 else 0
-        errors.append(error)
-        level = alpha * actual + (1 - alpha) * (level + trend)
-        trend = beta * (level - (alpha * actual + (1 - alpha) * level - trend * (1 - alpha))) + (1 - beta) * trend
-        # Simpler trend update
-        trend = beta * (level - (level - trend / beta * beta)) + (1 - beta) * trend
-
-    # Re-do with cleaner formulation
-    level = prices[0]
-    trend = (prices[-1] - prices[0]) / (len(prices) - 1) if len(prices) > 1 else 0
-    errors = []
-
-    for actual in prices[1:]:
-        prev_level = level
-        level = alpha * actual + (1 - alpha) * (level + trend)
-        trend = beta * (level - prev_level) + (1 - beta) * trend
-        forecast = prev_level + trend
-        if actual > 0:
-            errors.append(abs(actual - forecast) / actual * 100)
-
-    # Forecast ahead
-    prediction = level + trend * steps
-    avg_error = sum(errors) / len(errors) if errors else 10.0
-
-    return prediction, trend, avg_error
-
 
 def predict_harvest_price(
     crop: str,
@@ -519,186 +471,15 @@ def predict_harvest_price(
 ) -> Dict:
     """
     Predict the price of a crop at harvest time using REAL historical data
-    and Holt's Double Exponential Smoothing.
+    and Holt's Double Exponential Smoothing (precomputed per harvest month
+    in services/harvest_forecast_tables.py).
     """
-    profile = CROP_PROFILES.get(crop)
-    if not profile:
-        for k, v in CROP_PROFILES.items():
-            if k.lower() == crop.lower():
-                crop = k
-                profile = v
-                break
-    if not profile:
+    from services.harvest_forecast_tables import get_forecast_tables
+    tables = get_forecast_tables()
+    row = tables.index(crop)
+    if row is None:
         return {"error": f"Crop '{crop}' not found. Available: {len(CROP_PROFILES)} crops."}
-
-    today = datetime.now()
-    if sowing_date:
-        try:
-            sow = datetime.strptime(sowing_date, "%Y-%m-%d")
-        except ValueError:
-            sow = today
-    else:
-        sow = today
-
-    growth_days = profile["growth_days"]
-    harvest_date = sow + timedelta(days=growth_days)
-    harvest_month = harvest_date.month
-
-    # ── Step 1: Get REAL historical prices for harvest month (2015-2025) ──
-    all_hist = get_all_monthly_history(crop)
-    harvest_month_prices = [r for r in all_hist if r["month"] == harvest_month]
-    yearly_prices = [r["price"] for r in harvest_month_prices]
-
-    # ── Step 2: Holt's Exponential Smoothing on 11 years of data ──
-    if len(yearly_prices) >= 3:
-        predicted, trend, forecast_error = _holt_forecast(yearly_prices, alpha=0.4, beta=0.2, steps=1)
-        # Apply seasonal adjustment from REAL AGMARKNET data
-        seasonal = REAL_SEASONAL.get(crop)
-        if seasonal:
-            annual_avg = sum(yearly_prices[-3:]) / 3  # last 3 years avg
-            seasonal_factor = seasonal[harvest_month - 1]
-            # Blend: 70% exponential smoothing + 30% seasonal-adjusted latest
-            latest_year_price = yearly_prices[-1] if yearly_prices else predicted
-            seasonal_prediction = latest_year_price * (1 + trend / latest_year_price) * seasonal_factor
-            predicted = 0.7 * predicted + 0.3 * seasonal_prediction
-        r_squared = max(0, 1 - (forecast_error / 100)) ** 2
-    else:
-        seasonal_factor = profile["seasonal_curve"][harvest_month - 1]
-        predicted = profile["base_price"] * seasonal_factor
-        r_squared = 0.5
-        forecast_error = 10.0
-
-    # ── Step 3: Apply state multiplier ──
-    state_factor = STATE_PRICE_FACTOR.get(state, 1.0)
-    predicted *= state_factor
-
-    # ── Step 4: MSP floor ──
-    msp = profile.get("msp", 0)
-    if msp > 0:
-        predicted = max(predicted, msp * 0.98)
-
-    predicted = round(predicted)
-
-    # ── Step 5: Current price from REAL data ──
-    current_month = today.month
-    current_price_raw = get_monthly_price(crop, 2025, current_month)
-    current_price = round(current_price_raw * state_factor) if current_price_raw else round(profile["base_price"] * state_factor)
-
-    # ── Step 6: Peak (best sell) price from REAL data ──
-    peak_months = profile.get("peak_months", [])
-    if peak_months:
-        peak_prices = [get_monthly_price(crop, 2025, m) for m in peak_months]
-        peak_prices = [p for p in peak_prices if p > 0]
-        if peak_prices:
-            peak_price = round(max(peak_prices) * state_factor)
-        else:
-            peak_idx = peak_months[0] - 1
-            peak_price = round(profile["base_price"] * profile["seasonal_curve"][peak_idx] * state_factor)
-    else:
-        peak_price = predicted
-
-    # ── Step 7: Price change ──
-    price_change = predicted - current_price
-    price_change_pct = round((price_change / current_price * 100), 1) if current_price else 0
-
-    # ── Step 8: Revenue (state-adjusted yield + cultivation cost) ──
-    base_yield = profile["yield_per_acre"]
-    yield_per_acre = _get_state_yield(crop, state, base_yield)
-    total_yield = round(yield_per_acre * land_size, 1)
-    harvest_revenue = round(total_yield * predicted)
-    peak_revenue = round(total_yield * peak_price)
-    extra_if_held = peak_revenue - harvest_revenue
-
-    # Cultivation cost
-    cost_per_acre = CULTIVATION_COST.get(crop, 12000)
-    total_cost = round(cost_per_acre * land_size)
-    net_profit = harvest_revenue - total_cost
-    peak_net_profit = peak_revenue - total_cost
-
-    # ── Step 9: Best sell window ──
-    hold_days = profile.get("hold_advice_days", 0)
-    best_sell_date = harvest_date + timedelta(days=hold_days)
-    month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                   "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    best_sell_months = [month_names[m - 1] for m in peak_months] if peak_months else []
-
-    # ── Step 10: Confidence (based on data years + forecast error) ──
-    data_years = len(yearly_prices) if 'yearly_prices' in dir() else 0
-    if r_squared > 0.7 and data_years >= 8:
-        confidence = "high"
-    elif r_squared > 0.4 and data_years >= 5:
-        confidence = "medium"
-    else:
-        confidence = "low"
-
-    # ── Step 11: Advice ──
-    storage_loss = profile.get("storage_loss_pct", 1.0)
-    if hold_days <= 3 or storage_loss > 10:
-        advice = f"Sell immediately after harvest — {crop} is perishable with {storage_loss}% monthly loss."
-        sell_strategy = "sell_now"
-    elif extra_if_held > 0 and hold_days <= 90:
-        net_gain = extra_if_held - (harvest_revenue * storage_loss / 100 * (hold_days / 30))
-        if net_gain > 0:
-            advice = f"Store for {hold_days} days after harvest. Prices peak in {', '.join(best_sell_months)}. Expected extra revenue: ₹{round(net_gain):,}."
-            sell_strategy = "hold"
-        else:
-            advice = f"Sell at harvest — storage costs outweigh the ₹{extra_if_held:,} price gain."
-            sell_strategy = "sell_at_harvest"
-    else:
-        advice = f"Sell at harvest. Current trend suggests stable prices."
-        sell_strategy = "sell_at_harvest"
-
-    # ── Build monthly price curve from REAL data ──
-    monthly_curve = []
-    for m in range(12):
-        real_price = get_monthly_price(crop, 2025, m + 1)
-        avg = real_price if real_price > 0 else profile["base_price"] * profile["seasonal_curve"][m]
-        monthly_curve.append({
-            "month": month_names[m],
-            "price": round(avg * state_factor),
-            "is_harvest": (m + 1) in profile.get("harvest_months", []),
-            "is_peak": (m + 1) in peak_months,
-        })
-
-    return {
-        "crop": crop,
-        "category": profile.get("category", ""),
-        "state": state,
-        "sowing_date": sow.strftime("%Y-%m-%d"),
-        "harvest_date": harvest_date.strftime("%Y-%m-%d"),
-        "growth_days": growth_days,
-        "days_to_harvest": max(0, (harvest_date - today).days),
-
-        "current_price": current_price,
-        "predicted_harvest_price": predicted,
-        "price_change": price_change,
-        "price_change_pct": price_change_pct,
-        "price_unit": "₹/quintal",
-        "msp": msp,
-
-        "peak_price": peak_price,
-        "best_sell_date": best_sell_date.strftime("%Y-%m-%d"),
-        "best_sell_months": best_sell_months,
-        "hold_days": hold_days,
-        "sell_strategy": sell_strategy,
-
-        "yield_per_acre": yield_per_acre,
-        "yield_unit": "quintals",
-        "land_size": land_size,
-        "total_yield": total_yield,
-        "cultivation_cost": total_cost,
-        "harvest_revenue": harvest_revenue,
-        "net_profit": net_profit,
-        "peak_revenue": peak_revenue,
-        "peak_net_profit": peak_net_profit,
-        "extra_if_held": max(0, extra_if_held),
-
-        "confidence": confidence,
-        "r_squared": round(r_squared, 3),
-        "advice": advice,
-
-        "monthly_curve": monthly_curve,
-    }
+    return tables.forecast([row], state, sowing_date, land_size)[0]
 
 
 def get_bulk_forecast(
@@ -707,16 +488,15 @@ def get_bulk_forecast(
     sowing_date: str = None,
     crops: List[str] = None,
 ) -> Dict:
-    """Forecast for multiple crops at once (regional or specified)."""
+    """Forecast for multiple crops at once (regional or specified) — one array pass over the tables."""
+    from services.harvest_forecast_tables import get_forecast_tables
+    tables = get_forecast_tables()
     if not crops:
         # Use all crops except Sugarcane (priced per tonne, not per quintal)
         crops = [c for c in CROP_PROFILES.keys() if c != "Sugarcane"]
 
-    results = []
-    for crop in crops:
-        fc = predict_harvest_price(crop, state, sowing_date, land_size)
-        if "error" not in fc:
-            results.append(fc)
+    rows = [r for r in (tables.index(c) for c in crops) if r is not None]
+    results = tables.forecast(rows, state, sowing_date, land_size)
 
     # Sort by revenue potential (descending)
     results.sort(key=lambda x: x.get("harvest_revenue", 0), reverse=True)
@@ -0,0 +1,251 @@
+"""
+SmartAgri AI - Precomputed Harvest Forecast Tables
+Everything in a harvest forecast that does not depend on the farmer —
+Holt forecasts per harvest month, seasonal blending, 2025 monthly curves,
+peak prices, MSP floors, costs and yields — compiled once into arrays over
+(crop) and (crop, month). A request then only applies its state price /
+yield factors, land size and sowing date across all crops at once.
+
+  build    : one vectorized Holt pass (services/smoothing.py) over the
+             crop × harvest month × year slice of the real 2015-2025 price
+             tensor (services/price_tensor.py), then the seasonal blend
+  forecast : numpy over the selected crops — harvest month from the sowing
+             date, state scaling, MSP floor, rounding, revenue and profit;
+             only advice strings and the response dicts are built per crop
+
+The inputs (CROP_PROFILES, services/real_crop_prices.py) are code, so the
+tables are built once per process and a data change ships with a restart.
+
+Results are identical to the per-crop computation they replace.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.smoothing import holt
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+CURVE_YEAR = 2025          # monthly curve / current / peak prices come from this year
+
+
+class HarvestForecastTables:
+    """Per-crop and per-(crop, harvest month) forecast inputs as arrays."""
+
+    def __init__(self):
+        from services.harvest_forecast_service import CROP_PROFILES, CULTIVATION_COST
+        from services.price_tensor import get_price_tensor
+        from services.real_crop_prices import REAL_SEASONAL
+
+        self.crops = list(CROP_PROFILES)
+        self.lookup = {name.lower(): i for i, name in enumerate(self.crops)}
+        n = len(self.crops)
+        profiles = [CROP_PROFILES[c] for c in self.crops]
+
+        self.category = [p.get("category", "") for p in profiles]
+        self.growth_days = np.array([p["growth_days"] for p in profiles], dtype=np.int64)
+        self.hold_days = np.array([p.get("hold_advice_days", 0) for p in profiles], dtype=np.int64)
+        self.storage_loss = [p.get("storage_loss_pct", 1.0) for p in profiles]
+        self.msp = np.array([p.get("msp", 0) for p in profiles], dtype=np.float64)
+        self.base_yield = [p["yield_per_acre"] for p in profiles]
+        self.cost_per_acre = np.array([CULTIVATION_COST.get(c, 12000) for c in self.crops], dtype=np.float64)
+        self.best_sell_months = [[MONTH_NAMES[m - 1] for m in p.get("peak_months", [])] for p in profiles]
+        self.harvest_mask = np.zeros((n, 12), dtype=bool)
+        self.peak_mask = np.zeros((n, 12), dtype=bool)
+
+        self.has_peak = np.zeros(n, dtype=bool)
+        self.peak = np.zeros(n)
+
+        # crop × harvest month × year tensor of rounded prices (NaN = no price that year)
+        # sliced from the (crop, year, month) price tensor → one vectorized Holt pass
+        prices = get_price_tensor()
+        history = np.stack([prices.history(c) for c in self.crops]).transpose(0, 2, 1)
+        tensor = np.where(history > 0, np.round(history), np.nan)
+        curve_year = np.stack([prices.curve(c, CURVE_YEAR) for c in self.crops])
+        seasonal = np.full((n, 12), np.nan)
+        for i, crop in enumerate(self.crops):
+            if REAL_SEASONAL.get(crop):
+                seasonal[i] = REAL_SEASONAL[crop]
+        self.data_years = np.count_nonzero(~np.isnan(tensor), axis=-1)
+        holt_pred, trend, error = holt(tensor, alpha=0.4, beta=0.2, steps=1)
+
+        # 70% exponential smoothing + 30% seasonal-adjusted latest year (where REAL_SEASONAL has the crop)
+        observed = ~np.isnan(tensor)
+        last_year = tensor.shape[-1] - 1 - np.argmax(observed[..., ::-1], axis=-1)
+        latest = np.take_along_axis(tensor, last_year[..., None], axis=-1)[..., 0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            seasonal_prediction = latest * (1 + trend / latest) * seasonal
+        blended = np.where(np.isnan(seasonal), holt_pred, 0.7 * holt_pred + 0.3 * seasonal_prediction)
+        fallback = np.array([[p["base_price"] * p["seasonal_curve"][m] for m in range(12)] for p in profiles])
+        enough = self.data_years >= 3
+        self.predicted = np.where(enough, blended, fallback)
+        self.r_squared = np.where(enough, np.maximum(0, 1 - (error / 100)) ** 2, 0.5)
+
+        base_price = np.array([p["base_price"] for p in profiles], dtype=np.float64)
+        self.current = np.where(curve_year != 0, curve_year, base_price[:, None])
+        self.curve = np.where(curve_year > 0, curve_year, fallback)
+
+        for i, (crop, profile) in enumerate(zip(self.crops, profiles)):
+
+            for m in profile.get("harvest_months", []):
+                self.harvest_mask[i, m - 1] = True
+            peak_months = profile.get("peak_months", [])
+            for m in peak_months:
+                self.peak_mask[i, m - 1] = True
+            if peak_months:
+                self.has_peak[i] = True
+                self.peak[i] = (prices.peak(crop, CURVE_YEAR, peak_months)
+                                or profile["base_price"] * profile["seasonal_curve"][peak_months[0] - 1])
+
+        self._yield_by_state: Dict[str, np.ndarray] = {}
+
+    def index(self, crop: str) -> Optional[int]:
+        """Row of a (case-insensitive) crop name; None if unknown."""
+        return self.lookup.get(crop.lower())
+
+    def state_yield(self, state: str) -> np.ndarray:
+        """State-adjusted yield per acre for every crop (cached per state)."""
+        ypa = self._yield_by_state.get(state)
+        if ypa is None:
+            from services.harvest_forecast_service import _get_state_yield
+            ypa = np.array([_get_state_yield(c, state, y) for c, y in zip(self.crops, self.base_yield)])
+            self._yield_by_state[state] = ypa
+        return ypa
+
+    def forecast(self, rows: List[int], state: str, sowing_date: Optional[str], land_size: float) -> List[Dict]:
+        """Forecast dicts (predict_harvest_price format) for table rows, in order."""
+        from services.harvest_forecast_service import STATE_PRICE_FACTOR
+
+        idx = np.asarray(rows, dtype=np.int64)
+        today = datetime.now()
+        sow = today
+        if sowing_date:
+            try:
+                sow = datetime.strptime(sowing_date, "%Y-%m-%d")
+            except ValueError:
+                pass
+
+        # ── Dates: harvest = sowing + growth days, best sell = harvest + hold days ──
+        sow64 = np.datetime64(sow, "us")
+        harvest = sow64 + self.growth_days[idx].astype("timedelta64[D]")
+        harvest_month = harvest.astype("datetime64[M]").astype(np.int64) % 12      # 0 = Jan
+        best_sell = harvest + self.hold_days[idx].astype("timedelta64[D]")
+        days_to_harvest = np.maximum(0, (harvest - np.datetime64(today, "us")) // np.timedelta64(1, "D"))
+
+        # ── Prices: state factor, MSP floor, rounding ──
+        state_factor = STATE_PRICE_FACTOR.get(state, 1.0)
+        predicted = self.predicted[idx, harvest_month] * state_factor
+        msp = self.msp[idx]
+        predicted = np.round(np.where(msp > 0, np.maximum(predicted, msp * 0.98), predicted))
+        current = np.round(self.current[idx, today.month - 1] * state_factor)
+        peak = np.where(self.has_peak[idx], np.round(self.peak[idx] * state_factor), predicted)
+        curves = np.round(self.curve[idx] * state_factor).astype(np.int64)
+
+        # ── Revenue ──
+        yield_per_acre = self.state_yield(state)[idx]
+        total_yield = np.array([round(y, 1) for y in (yield_per_acre * land_size).tolist()])
+        harvest_revenue = np.round(total_yield * predicted)
+        peak_revenue = np.round(total_yield * peak)
+        total_cost = np.round(self.cost_per_acre[idx] * land_size)
+
+        r_squared = self.r_squared[idx, harvest_month]
+        data_years = self.data_years[idx, harvest_month]
+        sow_str = sow.strftime("%Y-%m-%d")
+        harvest_str = np.datetime_as_string(harvest.astype("datetime64[D]"), unit="D").tolist()
+        best_sell_str = np.datetime_as_string(best_sell.astype("datetime64[D]"), unit="D").tolist()
+
+        results = []
+        columns = zip(idx.tolist(), predicted.astype(np.int64).tolist(), current.astype(np.int64).tolist(),
+                      peak.astype(np.int64).tolist(), harvest_revenue.astype(np.int64).tolist(),
+                      peak_revenue.astype(np.int64).tolist(), total_cost.astype(np.int64).tolist(),
+                      total_yield.tolist(), yield_per_acre.tolist(), r_squared.tolist(),
+                      data_years.tolist(), days_to_harvest.tolist(), harvest_str, best_sell_str, curves.tolist())
+        for (i, pred, cur, pk, h_rev, p_rev, cost, t_yield, ypa, r2, years, to_harvest,
+             harvest_date, best_sell_date, curve) in columns:
+            crop = self.crops[i]
+            price_change = pred - cur
+            extra_if_held = p_rev - h_rev
+            hold_days = int(self.hold_days[i])
+            advice, sell_strategy = _sell_advice(crop, hold_days, self.storage_loss[i], extra_if_held,
+                                                 h_rev, self.best_sell_months[i])
+            if r2 > 0.7 and years >= 8:
+                confidence = "high"
+            elif r2 > 0.4 and years >= 5:
+                confidence = "medium"
+            else:
+                confidence = "low"
+            results.append({
+                "crop": crop,
+                "category": self.category[i],
+                "state": state,
+                "sowing_date": sow_str,
+                "harvest_date": harvest_date,
+                "growth_days": int(self.growth_days[i]),
+                "days_to_harvest": int(to_harvest),
+
+                "current_price": cur,
+                "predicted_harvest_price": pred,
+                "price_change": price_change,
+                "price_change_pct": round((price_change / cur * 100), 1) if cur else 0,
+                "price_unit": "₹/quintal",
+                "msp": _plain(self.msp[i]),
+
+                "peak_price": pk,
+                "best_sell_date": best_sell_date,
+                "best_sell_months": list(self.best_sell_months[i]),
+                "hold_days": hold_days,
+                "sell_strategy": sell_strategy,
+
+                "yield_per_acre": ypa,
+                "yield_unit": "quintals",
+                "land_size": land_size,
+                "total_yield": t_yield,
+                "cultivation_cost": cost,
+                "harvest_revenue": h_rev,
+                "net_profit": h_rev - cost,
+                "peak_revenue": p_rev,
+                "peak_net_profit": p_rev - cost,
+                "extra_if_held": max(0, extra_if_held),
+
+                "confidence": confidence,
+                "r_squared": round(r2, 3),
+                "advice": advice,
+
+                "monthly_curve": [
+                    {"month": MONTH_NAMES[m], "price": curve[m],
+                     "is_harvest": bool(self.harvest_mask[i, m]), "is_peak": bool(self.peak_mask[i, m])}
+                    for m in range(12)
+                ],
+            })
+        return results
+
+
+def _plain(value: float):
+    """Profile numbers back to the int / float they were declared as."""
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def _sell_advice(crop: str, hold_days: int, storage_loss: float, extra_if_held: int,
+                 harvest_revenue: int, best_sell_months: List[str]) -> tuple:
+    """(advice, sell_strategy) — same rules as the per-crop forecast."""
+    if hold_days <= 3 or storage_loss > 10:
+        return (f"Sell immediately after harvest — {crop} is perishable with {storage_loss}% monthly loss.",
+                "sell_now")
+    if extra_if_held > 0 and hold_days <= 90:
+        net_gain = extra_if_held - (harvest_revenue * storage_loss / 100 * (hold_days / 30))
+        if net_gain > 0:
+            return (f"Store for {hold_days} days after harvest. Prices peak in {', '.join(best_sell_months)}. "
+                    f"Expected extra revenue: ₹{round(net_gain):,}.", "hold")
+        return f"Sell at harvest — storage costs outweigh the ₹{extra_if_held:,} price gain.", "sell_at_harvest"
+    return "Sell at harvest. Current trend suggests stable prices.", "sell_at_harvest"
+
+
+_tables: Optional[HarvestForecastTables] = None
+
+
+def get_forecast_tables() -> HarvestForecastTables:
+    global _tables
+    if _tables is None:
+        _tables = HarvestForecastTables()
+    return _tables
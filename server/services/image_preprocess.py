@@ -0,0 +1,116 @@
+"""
+SmartAgri AI - Shared Image Preprocessing
+Single-pass decode → resize → normalize for the disease ensemble.
+
+A 5 MB phone photo used to be decoded once and then resized/normalized
+separately by each HF pipeline. Here the upload is decoded ONCE, at reduced
+size when the format allows it (JPEG draft mode decodes at 1/2, 1/4 or 1/8
+scale directly from the DCT coefficients), and each model's input tensor is
+produced by a single resize of that decode straight to 224×224:
+
+  MobileNetV2 (resize shortest edge 256 → center-crop 224)
+      ≡ resize the centered square of side  shortest_edge × 224/256  → 224×224
+  ViT (resize to 224×224)
+      ≡ resize the full frame → 224×224
+
+Models whose specs are identical share one tensor.
+"""
+from __future__ import annotations
+import io
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class PreprocessSpec:
+    """Geometry + normalization one classifier expects for its pixel_values."""
+
+    size: int = 224                       # output height = width
+    crop_pct: float = 1.0                 # centered square kept, as a fraction of the shortest edge
+    squash: bool = False                  # True: full frame → size×size, aspect ratio ignored
+    resample: int = Image.BILINEAR
+    rescale: float = 1 / 255
+    mean: tuple = (0.5, 0.5, 0.5)
+    std: tuple = (0.5, 0.5, 0.5)
+
+    @classmethod
+    def from_processor(cls, cfg: dict) -> "PreprocessSpec":
+        """Derive a spec from an HF image-processor config (to_dict() / exported JSON)."""
+        size = cfg.get("size") or {}
+        crop = cfg.get("crop_size") or {}
+        if cfg.get("do_center_crop") and "shortest_edge" in size:
+            out = crop.get("height", 224)
+            crop_pct = out / size["shortest_edge"]
+            squash = False
+        elif "height" in size:
+            out, crop_pct, squash = size["height"], 1.0, True
+        else:
+            out, crop_pct, squash = size.get("shortest_edge", 224), 1.0, False
+
+        mean = cfg.get("image_mean", [0.5, 0.5, 0.5]) if cfg.get("do_normalize", True) else [0.0] * 3
+        std = cfg.get("image_std", [0.5, 0.5, 0.5]) if cfg.get("do_normalize", True) else [1.0] * 3
+        return cls(
+            size=int(out),
+            crop_pct=float(crop_pct),
+            squash=squash,
+            resample=int(cfg.get("resample", Image.BILINEAR)),
+            rescale=float(cfg.get("rescale_factor", 1 / 255)) if cfg.get("do_rescale", True) else 1.0,
+            mean=tuple(float(m) for m in mean),
+            std=tuple(float(s) for s in std),
+        )
+
+    @property
+    def min_source_side(self) -> int:
+        """Smallest source shortest-edge that avoids upsampling for this spec."""
+        return int(round(self.size / self.crop_pct))
+
+
+def decode_image(image_bytes: bytes, min_side: int = 256) -> Image.Image:
+    """
+    Decode once, as small as possible while keeping ≥ `min_side` px on both axes.
+    JPEG: draft mode picks the largest DCT scale-down that still satisfies it.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("RGB", (min_side, min_side))
+    return img.convert("RGB")
+
+
+def _to_tensor(img: Image.Image, spec: PreprocessSpec) -> np.ndarray:
+    w, h = img.size
+    if spec.squash:
+        box = (0, 0, w, h)
+    else:
+        side = min(w, h) * spec.crop_pct
+        box = ((w - side) / 2, (h - side) / 2, (w + side) / 2, (h + side) / 2)
+    # One resample from the decoded frame; reducing_gap does a cheap integer
+    # downscale first for large non-JPEG inputs (PNG/WEBP have no draft mode).
+    small = img.resize((spec.size, spec.size), spec.resample, box=box, reducing_gap=2.0)
+
+    # (x * rescale - mean) / std  fused into one multiply-add
+    scale = np.float32(spec.rescale) / np.asarray(spec.std, dtype=np.float32)
+    offset = -np.asarray(spec.mean, dtype=np.float32) / np.asarray(spec.std, dtype=np.float32)
+    arr = np.asarray(small, dtype=np.float32) * scale + offset
+    return arr.transpose(2, 0, 1)
+
+
+def build_batches(images: list, specs: list) -> list[np.ndarray]:
+    """
+    Produce one contiguous (N, 3, size, size) float32 batch per spec.
+    Identical specs are computed once and shared.
+    """
+    done: dict[PreprocessSpec, np.ndarray] = {}
+    out = []
+    for spec in specs:
+        if spec not in done:
+            batch = np.empty((len(images), 3, spec.size, spec.size), dtype=np.float32)
+            for i, img in enumerate(images):
+                batch[i] = _to_tensor(img, spec)
+            done[spec] = batch
+        out.append(done[spec])
+    return out
+
+
+def required_side(specs: list) -> int:
+    return max((s.min_source_side for s in specs), default=256)
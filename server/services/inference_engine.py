@@ -0,0 +1,248 @@
+"""
+SmartAgri AI - Micro-batching Inference Engine
+Collects concurrent requests into small batches so a model runs once per batch
+instead of once per request.
+
+  submit(item) ──► asyncio.Queue ──► worker: wait for first item, then collect
+                                     up to `max_batch_size` items or until
+                                     `max_wait_ms` has passed ──► batch_fn(items)
+                                     ──► each waiting future gets its result
+
+`batch_fn` is a plain synchronous function  list[item] -> list[result]  whose
+output is aligned with its input. A result that is an Exception instance is
+raised in the caller that submitted that item only.
+
+Back-pressure: the queue is bounded (`max_queue`) and at most `max_concurrency`
+batches are in flight, so when every executor worker is busy the queue fills
+and new submissions fail fast with QueueFullError instead of piling up.
+Each caller waits at most `timeout_s` for its own result.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("inference_engine")
+
+
+class QueueFullError(RuntimeError):
+    """Raised by submit() when the request queue is at capacity."""
+
+
+class MicroBatchEngine:
+    """Async request queue + background worker that runs `batch_fn` on micro-batches."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 25,
+        name: str = "engine",
+        executor=None,
+        max_concurrency: int = 1,
+        max_queue: int = 0,
+        timeout_s: Optional[float] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000)
+        self.name = name
+        self.executor = executor                # InferenceExecutor, or None → default thread pool
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))  # 0 = unbounded
+        self.timeout_s = timeout_s
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._size_histogram: dict[int, int] = {}
+        self._queue_waits: deque = deque(maxlen=1000)   # seconds, most recent items
+        self._batch_times: deque = deque(maxlen=200)    # seconds, most recent batches
+
+    # ── Lifecycle ──────────────────────────────────────
+
+    def start(self):
+        """Start the worker on the running event loop (idempotent)."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._worker = asyncio.create_task(self._run(), name=f"{self.name}-batcher")
+        logger.info(
+            f"[{self.name}] micro-batcher started "
+            f"(batch≤{self.max_batch_size}, wait≤{self.max_wait * 1000:.0f} ms)"
+        )
+
+    async def stop(self):
+        """Cancel the worker; callers still waiting receive CancelledError."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, fut, _ = self._queue.get_nowait()
+            if not fut.done():
+                fut.cancel()
+
+    # ── Public API ─────────────────────────────────────
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its result.
+        Raises QueueFullError when saturated, TimeoutError after `timeout_s`.
+        """
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, fut, time.perf_counter()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.max_queue} pending)")
+        if self.timeout_s is None:
+            return await fut
+        try:
+            return await asyncio.wait_for(fut, timeout=self.timeout_s)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise TimeoutError(f"{self.name} inference timed out after {self.timeout_s:g}s")
+
+    def stats(self) -> dict:
+        waits = sorted(self._queue_waits)
+        batch_times = list(self._batch_times)
+        avg_batch = self._items / self._batches if self._batches else 0.0
+        return {
+            "name": self.name,
+            "running": self._worker is not None and not self._worker.done(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "max_queue": self.max_queue,
+            "max_concurrency": self.max_concurrency,
+            "timeout_s": self.timeout_s,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_flight_batches": len(self._in_flight),
+            "batches": self._batches,
+            "items": self._items,
+            "failed_batches": self._failed_batches,
+            "rejected": self._rejected,
+            "timeouts": self._timeouts,
+            "avg_batch_size": round(avg_batch, 2),
+            "avg_batch_fill": round(avg_batch / self.max_batch_size, 3),
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+            "queue_wait_ms": {
+                "avg": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "p50": round(_percentile(waits, 0.50) * 1000, 2),
+                "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+            },
+            "avg_batch_ms": round(sum(batch_times) / len(batch_times) * 1000, 2) if batch_times else 0.0,
+        }
+
+    # ── Worker ─────────────────────────────────────────
+
+    async def _collect(self) -> list:
+        """Block for the first item, then fill the batch until full or the deadline passes."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # Still drain whatever is already queued — costs no extra latency
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _execute(self, items: list) -> list:
+        """Run batch_fn off the event loop so other routes keep serving."""
+        if self.executor is not None:
+            return await self.executor.run(self.batch_fn, items)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.batch_fn, items)
+
+    async def _run(self):
+        while True:
+            # Wait for a free executor slot BEFORE collecting, so the batch keeps
+            # growing (and the queue applies back-pressure) while workers are busy.
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: list):
+        try:
+            await self._process(batch)
+        finally:
+            self._slots.release()
+
+    async def _process(self, batch: list):
+        # Skip callers that already gave up (timeout / client disconnect)
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_waits.append(started - enqueued)
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self._execute(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} items"
+                )
+        except asyncio.CancelledError:
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"[{self.name}] batch of {len(items)} failed: {e}")
+            self._failed_batches += 1
+            results = [e] * len(items)
+
+        self._batch_times.append(time.perf_counter() - started)
+        self._batches += 1
+        self._items += len(items)
+        self._size_histogram[len(items)] = self._size_histogram.get(len(items), 0) + 1
+
+        for (_, fut, _), result in zip(batch, results):
+            if fut.done():  # caller went away (client disconnect / timeout)
+                continue
+            if isinstance(result, BaseException):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
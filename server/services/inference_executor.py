@@ -0,0 +1,128 @@
+"""
+SmartAgri AI - Inference Executor
+Dedicated worker-process pool for CPU-bound model inference.
+
+PyTorch forward passes hold the GIL long enough to stall the uvicorn event
+loop, so disease diagnosis runs in separate processes. Each worker loads the
+HF pipelines ONCE in its initializer and then serves batches sent by the
+micro-batcher (services/inference_engine.py), which owns the bounded queue,
+back-pressure and per-request timeouts.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("inference_executor")
+
+
+# ── Worker-process side ────────────────────────────────────
+def _worker_init(torch_threads: int, warmup_batch: int):
+    """Runs once in every worker process: cap BLAS threads, load + warm the models."""
+    if torch_threads > 0:
+        os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+        os.environ["MKL_NUM_THREADS"] = str(torch_threads)
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except Exception:
+            pass
+    from services import disease_service
+    disease_service._load_models()
+    if disease_service._hf_ready:
+        disease_service.warm_up(warmup_batch)
+
+
+def _worker_status() -> dict:
+    from services import disease_service
+    return {
+        "pid": os.getpid(),
+        "models_ready": disease_service._hf_ready,
+        "error": disease_service._hf_error,
+    }
+
+
+# ── Parent-process side ────────────────────────────────────
+class InferenceExecutor:
+    """Process pool whose workers each hold their own copy of the disease models."""
+
+    def __init__(self, workers: int = 1, torch_threads: int = 0, warmup_batch: int = 1):
+        self.workers = max(1, int(workers))
+        self.torch_threads = int(torch_threads)
+        self.warmup_batch = int(warmup_batch)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._worker_status: dict[int, dict] = {}
+        self._restarts = 0
+        self._started_at: Optional[float] = None
+        self._rewarm: Optional[asyncio.Task] = None
+
+    def _create_pool(self):
+        # "spawn" — forking a process that already imported torch is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.torch_threads, self.warmup_batch),
+        )
+        self._started_at = time.time()
+
+    def start(self):
+        if self._pool is None:
+            self._create_pool()
+            logger.info(f"Inference executor started with {self.workers} worker process(es)")
+
+    async def warm_up(self):
+        """Spawn every worker now (so models load + warm at startup, not on the first upload)."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        statuses = await asyncio.gather(
+            *[loop.run_in_executor(self._pool, _worker_status) for _ in range(self.workers)],
+            return_exceptions=True,
+        )
+        for st in statuses:
+            if isinstance(st, dict):
+                self._worker_status[st["pid"]] = st
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run a picklable top-level function in a worker process."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM-killed, segfault in native code) — rebuild the pool once:
+            # every request in flight on it fails together, and only the first replaces it
+            if self._pool is pool:
+                logger.error("Inference worker crashed — restarting process pool")
+                self._restarts += 1
+                self._worker_status.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._create_pool()
+                # Load + warm the new workers now rather than on the next upload
+                self._rewarm = asyncio.create_task(self.warm_up())
+            raise RuntimeError("Inference worker crashed; please retry")
+
+    def shutdown(self):
+        if self._rewarm is not None:
+            self._rewarm.cancel()
+            self._rewarm = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._pool is not None,
+            "torch_threads": self.torch_threads,
+            "restarts": self._restarts,
+            "workers_ready": sum(1 for s in self._worker_status.values() if s["models_ready"]),
+            "worker_status": list(self._worker_status.values()),
+            "uptime_s": round(time.time() - self._started_at, 1) if self._started_at and self._pool else 0,
+        }
@@ -0,0 +1,327 @@
+"""
+SmartAgri AI - Mandi Feed Ingestion
+Streams daily AGMARKNET / data.gov.in price feeds into `market_prices` and
+the live in-memory market indexes.
+
+  read      : CSV (pandas chunks), JSON Lines (chunks) or a data.gov.in JSON
+              payload ({"records": [...]}) — MANDI_INGEST_CHUNK_ROWS at a time
+  normalize : AGMARKNET / data.gov.in column names → our schema, day-first
+              dates, numeric prices
+  validate  : required fields, prices > 0, min ≤ modal ≤ max, date not in the
+              future and not older than MANDI_INGEST_MAX_AGE_DAYS
+  dedupe    : (commodity, market, date) — the last row in the feed wins
+  upsert    : PostgreSQL → COPY into a temp table + INSERT … ON CONFLICT;
+              SQLite → multi-row INSERT … ON CONFLICT (executemany). Every
+              row written (or updated) by a chunk gets that chunk's
+              ingested_at stamp
+  refresh   : MarketService.add_prices() merges the chunk into this worker's
+              indexes; after a saving run, publish_store() writes that merged
+              index as the next shared store generation, so every worker (and
+              every restart) serves the ingested rows
+  alerts    : PriceAlertEngine, rebuilt from the DB at the start of a saving
+              run, matches each saved chunk against price alert subscriptions
+              and records the firings in price_alert_events
+              (services/alert_engine.py)
+
+Run against a local feed (from the server/ directory):
+
+    python -m services.mandi_ingest ../data/fixtures/agmarknet_sample.csv
+    python -m services.mandi_ingest ../data/fixtures/datagov_sample.json --no-db
+"""
+import asyncio
+import io
+import json
+import os
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import IO, Iterator, Optional, Union
+
+import pandas as pd
+from sqlalchemy import text
+
+from config import get_settings
+
+# Feed column (lower-cased, "_x0020_" / spaces → "_") → our column
+_ALIASES = {
+    "commodity": "commodity", "commodity_name": "commodity",
+    "state": "state", "state_name": "state",
+    "district": "district", "district_name": "district",
+    "market": "market", "market_name": "market", "mandi": "market",
+    "date": "date", "arrival_date": "date", "price_date": "date",
+    "min_price": "min_price", "minimum_price": "min_price", "min_price_rs_quintal": "min_price",
+    "max_price": "max_price", "maximum_price": "max_price", "max_price_rs_quintal": "max_price",
+    "modal_price": "modal_price", "modal_price_rs_quintal": "modal_price",
+}
+REQUIRED = ("commodity", "state", "market", "date", "min_price", "max_price", "modal_price")
+COLUMNS = ("commodity", "state", "district", "market", "date", "min_price", "max_price", "modal_price")
+DEDUPE_KEY = ["commodity", "market", "date"]
+
+Source = Union[str, bytes, IO]
+
+
+# ── Read ───────────────────────────────────────────────────
+
+def _feed_format(source: Source, filename: Optional[str]) -> str:
+    name = (filename or (source if isinstance(source, str) else "") or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".json"):
+        return "json"
+    return "csv"
+
+
+def iter_feed(source: Source, chunk_rows: int, filename: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Raw feed chunks as DataFrames (path, bytes or file object)."""
+    fmt = _feed_format(source, filename)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+    elif fmt == "jsonl":
+        yield from pd.read_json(source, lines=True, chunksize=chunk_rows, dtype=False)
+    else:
+        if isinstance(source, str):
+            with open(source, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        else:
+            payload = json.load(source)
+        records = payload.get("records", []) if isinstance(payload, dict) else payload
+        for start in range(0, len(records), chunk_rows):
+            yield pd.DataFrame.from_records(records[start:start + chunk_rows])
+
+
+# ── Normalize + validate ───────────────────────────────────
+
+def normalize_chunk(raw: pd.DataFrame, max_age_days: int) -> tuple:
+    """
+    (clean rows in COLUMNS order, Counter of rejection reasons). Clean rows
+    are deduplicated on (commodity, market, date), keeping the last.
+    """
+    rejected: Counter = Counter()
+    renamed = {}
+    for col in raw.columns:
+        key = str(col).strip().lower().replace("_x0020_", "_").replace(" ", "_").replace("(", "").replace(")", "")
+        if key in _ALIASES and _ALIASES[key] not in renamed.values():
+            renamed[col] = _ALIASES[key]
+    df = raw.rename(columns=renamed)[list(renamed.values())]
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        rejected[f"missing column(s): {', '.join(missing)}"] += len(raw)
+        return pd.DataFrame(columns=list(COLUMNS)), rejected
+    if "district" not in df.columns:
+        df["district"] = ""
+
+    for col in ("commodity", "state", "district", "market"):
+        df[col] = df[col].fillna("").astype(str).str.strip()
+    df["commodity"] = df["commodity"].str.lower()
+    df["date"] = pd.to_datetime(df["date"].astype(str).str.strip(), format="mixed", dayfirst=True, errors="coerce")
+    for col in ("min_price", "max_price", "modal_price"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    today = pd.Timestamp(date.today())
+    checks = [
+        ("missing commodity/state/market", (df["commodity"] == "") | (df["state"] == "") | (df["market"] == "")),
+        ("invalid date", df["date"].isna()),
+        ("date in the future", df["date"] > today + pd.Timedelta(days=1)),
+        ("date too old", df["date"] < today - pd.Timedelta(days=max_age_days)),
+        ("invalid price", df[["min_price", "max_price", "modal_price"]].isna().any(axis=1)
+         | (df[["min_price", "max_price", "modal_price"]] <= 0).any(axis=1)),
+        ("min > modal > max", (df["min_price"] > df["modal_price"]) | (df["modal_price"] > df["max_price"])),
+    ]
+    bad = pd.Series(False, index=df.index)
+    for reason, mask in checks:
+        mask = mask & ~bad  # count each row once, under its first failure
+        if mask.any():
+            rejected[reason] += int(mask.sum())
+        bad |= mask
+
+    df = df[~bad]
+    before = len(df)
+    df = df.drop_duplicates(DEDUPE_KEY, keep="last")
+    if before > len(df):
+        rejected["duplicate in feed"] += before - len(df)
+    return df[list(COLUMNS)].reset_index(drop=True), rejected
+
+
+# ── Upsert ─────────────────────────────────────────────────
+
+_DB_COLUMNS = ("commodity", "state", "district", "market_name", "date", "min_price", "max_price", "modal_price",
+               "ingested_at")
+_UPDATE_COLUMNS = ("state", "district", "min_price", "max_price", "modal_price", "ingested_at")
+
+
+def _db_rows(df: pd.DataFrame, stamp: datetime) -> list:
+    return [
+        {
+            "commodity": r.commodity, "state": r.state, "district": r.district or None,
+            "market_name": r.market, "date": r.date.date(),
+            "min_price": float(r.min_price), "max_price": float(r.max_price), "modal_price": float(r.modal_price),
+            "ingested_at": stamp,
+        }
+        for r in df.itertuples(index=False)
+    ]
+
+
+async def ensure_schema(db):
+    """
+    create_all() does not alter a pre-existing table — make sure the conflict
+    target and the ingested_at column (+ index) exist, and stamp rows written
+    before it existed so store watermarks cover them. Committed.
+    """
+    from sqlalchemy import inspect
+
+    await db.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_market_prices_commodity_market_date "
+        "ON market_prices (commodity, market_name, date)"
+    ))
+    conn = await db.connection()
+    columns = await conn.run_sync(lambda c: {col["name"] for col in inspect(c).get_columns("market_prices")})
+    if "ingested_at" not in columns:
+        await db.execute(text("ALTER TABLE market_prices ADD COLUMN ingested_at TIMESTAMP"))
+    await db.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_market_prices_ingested_at ON market_prices (ingested_at)"
+    ))
+    await db.execute(text("UPDATE market_prices SET ingested_at = :now WHERE ingested_at IS NULL"),
+                     {"now": datetime.now(timezone.utc).replace(tzinfo=None)})
+    await db.commit()
+
+
+async def _upsert_executemany(db, rows: list, dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    from db_models import MarketPrice
+
+    stmt = insert(MarketPrice)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["commodity", "market_name", "date"],
+        set_={c: getattr(stmt.excluded, c) for c in _UPDATE_COLUMNS},
+    )
+    await db.execute(stmt, rows)
+
+
+async def _upsert_copy(db, rows: list) -> bool:
+    """PostgreSQL + asyncpg: COPY into a temp staging table, then one INSERT … ON CONFLICT."""
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    if not hasattr(raw, "copy_records_to_table"):
+        return False
+    cols = ", ".join(_DB_COLUMNS)
+    await raw.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS market_prices_stage "
+        "(LIKE market_prices INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    await raw.copy_records_to_table(
+        "market_prices_stage", columns=list(_DB_COLUMNS),
+        records=[tuple(r[c] for c in _DB_COLUMNS) for r in rows],
+    )
+    await raw.execute(
+        f"INSERT INTO market_prices ({cols}) SELECT {cols} FROM market_prices_stage "
+        "ON CONFLICT (commodity, market_name, date) DO UPDATE SET "
+        + ", ".join(f"{c} = EXCLUDED.{c}" for c in _UPDATE_COLUMNS)
+    )
+    return True
+
+
+async def upsert_prices(db, df: pd.DataFrame) -> Optional[datetime]:
+    """Insert-or-update one validated chunk into market_prices (committed); returns its ingested_at stamp."""
+    stamp = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = _db_rows(df, stamp)
+    if not rows:
+        return None
+    dialect = db.bind.dialect.name
+    if not (dialect == "postgresql" and await _upsert_copy(db, rows)):
+        await _upsert_executemany(db, rows, dialect)
+    await db.commit()
+    return stamp
+
+
+# ── Pipeline ───────────────────────────────────────────────
+
+async def ingest_feed(source: Source, filename: Optional[str] = None, save: bool = True,
+                      refresh: bool = True, chunk_rows: Optional[int] = None) -> dict:
+    """
+    Stream one feed through normalize → validate → dedupe → upsert → index
+    refresh, chunk by chunk. Returns a report with per-reason rejections.
+    """
+    settings = get_settings()
+    chunk_rows = chunk_rows or settings.MANDI_INGEST_CHUNK_ROWS
+    report = {"rows_read": 0, "rows_valid": 0, "rows_saved": 0, "index_inserted": 0, "index_updated": 0,
+              "alerts_triggered": 0, "alert_users": 0, "rejected": Counter(), "chunks": 0}
+    started = time.perf_counter()
+
+    from database import async_session
+    from services.alert_engine import PriceAlertEngine, save_events
+    from services.market_service import init_market_service
+    market = await init_market_service() if refresh else None
+    alerts = PriceAlertEngine()
+    alert_users = set()
+    stamps = []                     # ingested_at of every saved chunk
+
+    feed = iter_feed(source, chunk_rows, filename)
+    async with async_session() as db:
+        if save:
+            await ensure_schema(db)
+            # Alerts fire only for saved prices; state comes from the DB, so every process agrees
+            history = market or await init_market_service()
+            await alerts.rebuild(db, history.get_daily_max)
+        while True:
+            # Parsing + validation are CPU-bound → off the event loop
+            raw = await asyncio.to_thread(next, feed, None)
+            if raw is None:
+                break
+            clean, rejected = await asyncio.to_thread(normalize_chunk, raw, settings.MANDI_INGEST_MAX_AGE_DAYS)
+            report["chunks"] += 1
+            report["rows_read"] += len(raw)
+            report["rows_valid"] += len(clean)
+            report["rejected"].update(rejected)
+            if clean.empty:
+                continue
+            if save:
+                stamps.append(await upsert_prices(db, clean))
+                report["rows_saved"] += len(clean)
+            if market is not None:
+                # Merged off the loop; readers see the old index until the swap
+                merged = await market.add_prices(clean)
+                report["index_inserted"] += merged["inserted"]
+                report["index_updated"] += merged["updated"]
+            if save:
+                events = alerts.evaluate(clean)
+                await save_events(db, events)
+                report["alerts_triggered"] += len(events)
+                alert_users.update(e["user_id"] for e in events)
+
+    if save and report["rows_saved"]:
+        merged = market is not None
+        market = market or await init_market_service()
+        await market.publish_store(stamps, merged=merged)
+
+    report["rejected"] = dict(report["rejected"])
+    report["alert_users"] = len(alert_users)
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    if market is not None:
+        report["index_rows"] = market._index.n_rows
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest a mandi price feed (CSV / JSON / JSONL)")
+    parser.add_argument("path")
+    parser.add_argument("--no-db", action="store_true", help="validate + refresh indexes only")
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    args = parser.parse_args()
+
+    async def _main():
+        import db_models  # noqa: F401 — register tables for init_db
+        from database import init_db
+        if not args.no_db:
+            await init_db()
+        report = await ingest_feed(args.path, filename=os.path.basename(args.path),
+                                   save=not args.no_db, chunk_rows=args.chunk_rows)
+        print(json.dumps(report, indent=2))
+
+    asyncio.run(_main())
@@ -0,0 +1,108 @@
+"""
+SmartAgri AI - Price History Windowing & Downsampling
+Shapes a crop's price history for charts on slow connections. Input is a
+date-ordered window of MarketIndex positions; output is column-oriented
+(one list per field) so a payload carries each key once, not once per row.
+
+  raw      : every mandi report in the window
+  daily /
+  weekly /
+  monthly  : OHLC-style buckets of the modal price — open / close are the
+             first / last report, high / low the extreme max / min prices,
+             modal_price the mean — via one np.*.reduceat per column
+  points   : Largest-Triangle-Three-Buckets (LTTB) on top of either, keeping
+             the visually significant points of the modal-price line
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from services.market_index import MarketIndex
+
+RAW_COLUMNS = ("state", "district", "market", "min_price", "max_price", "modal_price")
+
+
+def _bucket_keys(days: np.ndarray, interval: str) -> np.ndarray:
+    """Bucket start (days since epoch) for each row."""
+    days = days.astype(np.int64)
+    if interval == "daily":
+        return days
+    if interval == "weekly":
+        return days - (days + 3) % 7          # 1970-01-01 was a Thursday → weeks start Monday
+    month = days.astype("datetime64[D]").astype("datetime64[M]")
+    return month.astype("datetime64[D]").astype(np.int64)
+
+
+def _dates(days: np.ndarray) -> list:
+    return np.datetime_as_string(np.asarray(days, dtype=np.int64).astype("datetime64[D]"), unit="D").tolist()
+
+
+def ohlc(index: MarketIndex, positions: np.ndarray, interval: str) -> Dict[str, np.ndarray]:
+    """Aggregate date-ordered positions into contiguous daily / weekly / monthly buckets."""
+    keys = _bucket_keys(index.days[positions], interval)
+    modal = index.prices["modal_price"][positions].astype(np.float64)
+    if not len(keys):
+        return {k: modal[:0] for k in ("day", "open", "high", "low", "close", "modal_price", "count")}
+    # Rows are date-ordered → each bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    return {
+        "day": keys[starts],
+        "open": modal[starts],
+        "high": np.maximum.reduceat(index.prices["max_price"][positions], starts),
+        "low": np.minimum.reduceat(index.prices["min_price"][positions], starts),
+        "close": modal[ends - 1],
+        "modal_price": np.add.reduceat(modal, starts) / (ends - starts),
+        "count": ends - starts,
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the `n_out` (>= 3) points Largest-Triangle-Three-Buckets keeps
+    from (x, y) — always the first and last point, then per bucket the point
+    that forms the largest triangle with the previous pick and the next
+    bucket's mean.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out - 2 interior buckets
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def price_history(index: MarketIndex, crop: str, days: int, state: Optional[str] = None,
+                  interval: str = "raw", points: Optional[int] = None) -> Dict:
+    """Column-oriented history of one crop over the last `days` days of its data."""
+    positions = index.history(crop, state, days=days)
+    if interval == "raw":
+        cols = {"day": index.days[positions], **{c: index.prices[c][positions] for c in RAW_COLUMNS[3:]}}
+    else:
+        cols = ohlc(index, positions, interval)
+    n = len(cols["day"])
+
+    keep = None
+    if points and n > points:
+        keep = lttb(cols["day"], cols["modal_price"], points)
+        cols = {k: v[keep] for k, v in cols.items()}
+
+    out = {"date": _dates(cols.pop("day"))}
+    if interval == "raw":
+        rows = positions if keep is None else positions[keep]
+        for c in RAW_COLUMNS[:3]:
+            out[c] = index.column(c, rows)
+    for k, v in cols.items():
+        out[k] = np.round(v, 2).tolist() if v.dtype.kind == "f" else v.tolist()
+    return {"interval": interval, "points": len(out["date"]), "source_points": n, "history": out}
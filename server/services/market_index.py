@@ -0,0 +1,382 @@
+"""
+SmartAgri AI - Indexed Mandi Price Store
+The mandi price table compiled once into sorted column arrays so market
+lookups are dictionary hits and array slices instead of full-frame scans.
+
+  codes     : commodity / state / district / market as int32 codes; names
+              are matched case-insensitively through a lower-cased vocabulary
+  order     : rows sorted by (commodity, date) — a commodity's history is
+              one contiguous slice, oldest first
+  latest    : precomputed "latest record per commodity" tables for every
+              state, district and (state, district), plus the whole country
+  stats     : per-commodity mean / std of the modal price
+
+merged() builds a new index with newly ingested rows merged in — corrections
+to an existing (commodity, market, date) overwrite it, new rows are placed by
+one searchsorted — copying the columns once and touching only the affected
+latest-table entries and stats. The old index is never modified, so it can
+keep serving reads while the merge runs in a worker thread.
+
+from_arrays() wraps columns that are already in that order without copying
+them — this is how workers share the memory-mapped MarketStore
+(services/market_store.py) instead of each parsing the CSV.
+
+Ties (the same commodity reported by several mandis on the same date) are
+ordered by their position in the source file, so results are deterministic.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("commodity", "state", "district", "market", "date", "min_price", "max_price", "modal_price")
+_CATEGORICAL = ("commodity", "state", "district", "market")
+_PRICES = ("min_price", "max_price", "modal_price")
+_SCOPES = ((), ("state",), ("district",), ("state", "district"))
+ARRAYS = ("commodity", "state", "district", "market", "days", *_PRICES)
+
+
+def _days(dates: pd.Series) -> np.ndarray:
+    """Dates → int32 days since the epoch."""
+    return pd.to_datetime(dates).to_numpy(dtype="datetime64[D]").astype(np.int64).astype(np.int32)
+
+
+def _encode(values: pd.Series, names: Optional[List[str]] = None,
+            lookup: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, List[str], Dict[str, int]]:
+    """
+    int32 codes + display names + lower-cased name → code (case-insensitive
+    lookup). Pass an existing vocabulary to extend it with new names.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    names = [] if names is None else names
+    lookup = {} if lookup is None else lookup
+    remap = np.empty(len(uniques), dtype=np.int32)
+    for i, name in enumerate(uniques):
+        key = str(name).lower()
+        if key not in lookup:
+            lookup[key] = len(names)
+            names.append(str(name))
+        remap[i] = lookup[key]
+    out = np.full(len(codes), -1, dtype=np.int32)
+    valid = codes >= 0
+    out[valid] = remap[codes[valid]]
+    return out, names, lookup
+
+
+class MarketIndex:
+    """Read-only, precomputed view of the mandi price table (merged() returns a new one)."""
+
+    def __init__(self, df: pd.DataFrame):
+        if df.empty:
+            df = pd.DataFrame({c: pd.Series(dtype="object") for c in COLUMNS})
+            df["date"] = pd.to_datetime(df["date"])
+        df = df.reset_index(drop=True)
+
+        self.names: Dict[str, List[str]] = {}
+        self.lookup: Dict[str, Dict[str, int]] = {}
+        codes = {}
+        for col in _CATEGORICAL:
+            codes[col], self.names[col], self.lookup[col] = _encode(df[col])
+        days = _days(df["date"])
+
+        # Sort by (commodity, date); lexsort is stable → ties keep file order
+        order = np.lexsort((days, codes["commodity"]))
+        arrays = {col: codes[col][order] for col in _CATEGORICAL}
+        arrays["days"] = days[order]
+        arrays.update({col: df[col].to_numpy()[order] for col in _PRICES})
+        self._init_arrays(arrays)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], names: Dict[str, List[str]],
+                    slices: Optional[List[Tuple[int, int]]] = None) -> "MarketIndex":
+        """
+        Index over columns that are already in (commodity, date) order, e.g.
+        memory-mapped from a MarketStore — nothing is copied or re-sorted.
+        """
+        self = cls.__new__(cls)
+        self.names = {col: list(names[col]) for col in _CATEGORICAL}
+        self.lookup = {col: {name.lower(): i for i, name in enumerate(self.names[col])} for col in _CATEGORICAL}
+        self._init_arrays(arrays, slices)
+        return self
+
+    def _init_arrays(self, arrays: Dict[str, np.ndarray], slices: Optional[List[Tuple[int, int]]] = None):
+        self.commodity = arrays["commodity"]
+        self.state = arrays["state"]
+        self.district = arrays["district"]
+        self.market = arrays["market"]
+        self.days = arrays["days"]
+        self.prices = {col: arrays[col] for col in _PRICES}
+        self.n_rows = len(self.commodity)
+
+        if slices is None:
+            self._build_slices()
+        else:
+            self._slices = [tuple(s) for s in slices]
+        self._latest = self._build_latest()
+        self._latest_sorted: Dict[tuple, List[Dict]] = {}
+        self._stats = self._build_stats()
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The sorted column arrays by name (ARRAYS order)."""
+        return {
+            "commodity": self.commodity, "state": self.state, "district": self.district,
+            "market": self.market, "days": self.days, **self.prices,
+        }
+
+    @property
+    def slices(self) -> List[Tuple[int, int]]:
+        """Commodity code → [start, stop) of its rows (one partition per commodity)."""
+        return list(self._slices)
+
+    # ── Build-time tables ───────────────────────────────
+
+    def _build_slices(self):
+        """Commodity → [start, stop) slice of the sorted arrays."""
+        n_commodities = len(self.names["commodity"])
+        bounds = np.searchsorted(self.commodity, np.arange(n_commodities + 1))
+        self._slices = [(int(bounds[i]), int(bounds[i + 1])) for i in range(n_commodities)]
+
+    def _build_latest(self) -> Dict[tuple, Dict[int, tuple]]:
+        """(state_code | None, district_code | None) → {commodity: latest row tuple (see _row)}."""
+        pos = pd.DataFrame({
+            "commodity": self.commodity, "state": self.state, "district": self.district,
+        })
+        tables: Dict[tuple, Dict[int, tuple]] = {}
+        for keys in _SCOPES:
+            # Rows are date-ordered within a commodity → the last duplicate is the latest
+            rows = pos.drop_duplicates(subset=[*keys, "commodity"], keep="last").index.to_numpy()
+            states = self.state[rows].tolist() if "state" in keys else [None] * len(rows)
+            districts = self.district[rows].tolist() if "district" in keys else [None] * len(rows)
+            for s, d, row in zip(states, districts, self._rows(rows)):
+                tables.setdefault((s, d), {})[row[1]] = row
+        return tables
+
+    def _rows(self, positions) -> List[tuple]:
+        """
+        Compact (day, commodity, state, district, market, min, max, modal)
+        tuples — codes, not names, so the latest tables stay small per worker
+        and are unaffected by later inserts shifting positions.
+        """
+        cols = [self.days, self.commodity, self.state, self.district, self.market,
+                *(self.prices[c] for c in _PRICES)]
+        return list(zip(*(col[positions].tolist() for col in cols)))
+
+    def _record(self, row: tuple) -> Dict:
+        """A _rows() tuple as a records()-style dict."""
+        day, *codes = row[:5]
+        prices = row[5:]
+        record = {col: (self.names[col][code] if code >= 0 else None) for col, code in zip(_CATEGORICAL, codes)}
+        record["date"] = str(np.datetime64(day, "D"))
+        record.update(zip(_PRICES, prices))
+        return {col: record[col] for col in COLUMNS}
+
+    def _build_stats(self) -> List[Optional[Dict]]:
+        """Per-commodity mean / sample std of the modal price (None if < 2 rows)."""
+        modal = pd.Series(self.prices["modal_price"], dtype=np.float64)
+        agg = modal.groupby(self.commodity).agg(["mean", "std", "count"])
+        stats: List[Optional[Dict]] = [None] * len(self._slices)
+        for code, row in agg.iterrows():
+            if code >= 0 and row["count"] >= 2:
+                stats[int(code)] = {"mean": float(row["mean"]), "std": float(row["std"])}
+        return stats
+
+    # ── Incremental updates ─────────────────────────────
+
+    def _sort_keys(self, commodity: np.ndarray, days: np.ndarray) -> np.ndarray:
+        return (commodity.astype(np.int64) << 32) | (days.astype(np.int64) + (1 << 31))
+
+    def merged(self, df: pd.DataFrame) -> Tuple["MarketIndex", np.ndarray]:
+        """
+        A new index with rows (same columns as the source table) merged in;
+        self is left untouched, so readers keep using it until the caller
+        swaps the reference. A row whose (commodity, market, date) already
+        exists replaces it; others are inserted. Also returns, in df order,
+        True where a row was inserted and False where it updated a row.
+        """
+        if df.empty:
+            return self, np.zeros(0, dtype=bool)
+        df = df.reset_index(drop=True)
+        names = {col: list(self.names[col]) for col in _CATEGORICAL}
+        lookup = {col: dict(self.lookup[col]) for col in _CATEGORICAL}
+        codes = {col: _encode(df[col], names[col], lookup[col])[0] for col in _CATEGORICAL}
+        days = _days(df["date"])
+        prices = {}
+        for col in _PRICES:
+            dtype = self._price_dtype(col, df[col].to_numpy())
+            prices[col] = df[col].to_numpy() if dtype.kind == "O" else df[col].to_numpy().astype(dtype)
+
+        # Corrections: match (commodity, day, market) against rows on/after the feed's first day
+        recent = np.flatnonzero(self.days >= days.min())
+        existing = pd.DataFrame({
+            "commodity": self.commodity[recent], "day": self.days[recent],
+            "market": self.market[recent], "pos": recent,
+        }).drop_duplicates(["commodity", "day", "market"], keep="last")
+        incoming = pd.DataFrame({"commodity": codes["commodity"], "day": days, "market": codes["market"]})
+        match = incoming.merge(existing, on=["commodity", "day", "market"], how="left")["pos"].to_numpy()
+        is_new = np.isnan(match)
+        upd = np.flatnonzero(~is_new)
+        new = np.flatnonzero(is_new)
+        # Stable sort of the new rows, then insert after equal keys → file order kept
+        new = new[np.lexsort((days[new], codes["commodity"][new]))]
+
+        # One searchsorted places every new row; each column is then one scatter of old + new
+        at = np.searchsorted(self._sort_keys(self.commodity, self.days),
+                             self._sort_keys(codes["commodity"][new], days[new]), side="right")
+        total = self.n_rows + len(new)
+        final = at + np.arange(len(new))                 # positions of the inserted rows
+        old_pos = np.ones(total, dtype=bool)
+        old_pos[final] = False
+        moved = np.flatnonzero(old_pos)                  # where the existing rows land
+        incoming_cols = {"commodity": codes["commodity"], "state": codes["state"], "district": codes["district"],
+                         "market": codes["market"], "days": days, **prices}
+        arrays = {}
+        for col, current in self.arrays().items():
+            out = np.empty(total, dtype=np.result_type(current, incoming_cols[col]))
+            out[moved] = current
+            out[final] = incoming_cols[col][new]
+            arrays[col] = out
+        if len(upd):
+            pos = moved[match[upd].astype(np.int64)]
+            for col in ("state", "district", *_PRICES):
+                arrays[col][pos] = incoming_cols[col][upd]
+        else:
+            pos = np.zeros(0, dtype=np.int64)
+
+        index = MarketIndex.__new__(MarketIndex)
+        index.names, index.lookup = names, lookup
+        index.commodity, index.state, index.district = arrays["commodity"], arrays["state"], arrays["district"]
+        index.market, index.days = arrays["market"], arrays["days"]
+        index.prices = {col: arrays[col] for col in _PRICES}
+        index.n_rows = total
+        index._build_slices()
+        index._latest = {key: dict(table) for key, table in self._latest.items()}
+        index._latest_sorted = dict(self._latest_sorted)
+        index._refresh_latest(pos, correction=True)
+        index._refresh_latest(final)
+        index._stats = self._stats + [None] * (len(index._slices) - len(self._stats))
+        touched = np.unique(np.concatenate([arrays["commodity"][pos], arrays["commodity"][final]]))
+        for c in touched.tolist():
+            start, stop = index._slices[c]
+            modal = index.prices["modal_price"][start:stop].astype(np.float64)
+            index._stats[c] = ({"mean": float(modal.mean()), "std": float(modal.std(ddof=1))}
+                               if len(modal) >= 2 else None)
+        return index, is_new
+
+    def _price_dtype(self, col: str, values: np.ndarray) -> np.dtype:
+        """Column dtype after merging `values`; an int column widens to float for fractional prices."""
+        current = self.prices[col].dtype
+        if current.kind in "iu" and values.dtype.kind == "f" and np.any(values != np.round(values)):
+            return np.dtype(np.float64)
+        return current
+
+    def _refresh_latest(self, positions: np.ndarray, correction: bool = False):
+        """
+        Update the latest tables for rows at `positions` — one check per
+        (scope, commodity) they touch, not per row. An insert wins ties with
+        the current entry (it sorts last); a correction replaces an entry
+        only if it IS that entry's (day, market).
+        """
+        if not len(positions):
+            return
+        positions = np.sort(positions)                   # (commodity, date) order → last per group is latest
+        rows = self._rows(positions)
+        frame = pd.DataFrame({"commodity": self.commodity[positions], "state": self.state[positions],
+                              "district": self.district[positions]})
+        for keys in _SCOPES:
+            last = frame.drop_duplicates(subset=[*keys, "commodity"], keep="last").index.tolist()
+            for i in last:
+                row = rows[i]
+                day, c, s, d, market = row[:5]
+                key = (s if "state" in keys else None, d if "district" in keys else None)
+                table = self._latest.setdefault(key, {})
+                current = table.get(c)
+                if correction:
+                    if current is None or current[0] != day or current[4] != market:
+                        continue
+                elif current is not None and current[0] > day:
+                    continue
+                table[c] = row
+                self._latest_sorted.pop(key, None)
+
+    # ── Lookups ─────────────────────────────────────────
+
+    def code(self, column: str, name: Optional[str]) -> Optional[int]:
+        """Code for a (case-insensitive) name; None if it never occurs."""
+        if name is None:
+            return None
+        return self.lookup[column].get(name.lower())
+
+    def commodities(self) -> List[str]:
+        return list(self.names["commodity"])
+
+    def latest(self, state: Optional[str] = None, district: Optional[str] = None) -> List[Dict]:
+        """Latest record per commodity (sorted by commodity) for a state and/or district."""
+        s = self.code("state", state) if state else None
+        d = self.code("district", district) if district else None
+        if (state and s is None) or (district and d is None):
+            return []
+        key = (s, d)
+        records = self._latest_sorted.get(key)
+        if records is None:
+            table = self._latest.get(key, {})
+            records = sorted((self._record(row) for row in table.values()), key=lambda r: r["commodity"])
+            self._latest_sorted[key] = records
+        return list(records)
+
+    def history(self, crop: str, state: Optional[str] = None, days: Optional[int] = None) -> np.ndarray:
+        """
+        Sorted-array positions of a crop's rows (optionally one state), oldest
+        first. `days` keeps only the last N days up to the crop's latest date —
+        a binary search on its date-sorted slice.
+        """
+        c = self.code("commodity", crop)
+        if c is None:
+            return np.empty(0, dtype=np.int64)
+        start, stop = self._slices[c]
+        if days is not None and stop > start:
+            since = int(self.days[stop - 1]) - days + 1
+            start += int(np.searchsorted(self.days[start:stop], since, side="left"))
+        positions = np.arange(start, stop)
+        if state:
+            s = self.code("state", state)
+            if s is None:
+                return np.empty(0, dtype=np.int64)
+            positions = positions[self.state[start:stop] == s]
+        return positions
+
+    def daily_max(self, crop: str) -> Tuple[np.ndarray, np.ndarray]:
+        """A crop's reporting days (days since the epoch, ascending) and the highest modal price on each."""
+        c = self.code("commodity", crop)
+        if c is None or self._slices[c][0] == self._slices[c][1]:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        start, stop = self._slices[c]
+        days = self.days[start:stop]
+        first = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        modal = self.prices["modal_price"][start:stop].astype(np.float64)
+        return days[first].astype(np.int64), np.maximum.reduceat(modal, first)
+
+    def stats(self, crop: str) -> Optional[Dict]:
+        c = self.code("commodity", crop)
+        return None if c is None else self._stats[c]
+
+    def dates(self, positions) -> List[str]:
+        return np.datetime_as_string(self.days[positions].astype("datetime64[D]"), unit="D").tolist()
+
+    def column(self, name: str, positions) -> list:
+        """One column for some rows as plain Python values (names for categorical columns)."""
+        if name == "date":
+            return self.dates(positions)
+        if name in self.prices:
+            return self.prices[name][positions].tolist()
+        names = self.names[name]
+        return [names[c] if c >= 0 else None for c in getattr(self, name)[positions].tolist()]
+
+    def records(self, positions, columns=COLUMNS) -> List[Dict]:
+        """Row dicts (date as YYYY-MM-DD) for positions in the sorted arrays."""
+        cols = [self.column(c, positions) for c in columns]
+        return [dict(zip(columns, values)) for values in zip(*cols)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
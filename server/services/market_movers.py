@@ -0,0 +1,188 @@
+"""
+SmartAgri AI - Top Movers Index
+Price-change rankings for every commodity, nationally and per state and
+district, kept up to date as new mandi rows arrive.
+
+A commodity's change is the same as in MarketService.get_trend: mean of its
+3 latest modal prices vs mean of its 3 earliest, within the scope. Each
+(scope, commodity) only needs those two 3-value windows, so:
+
+  build  : one vectorized sort + groupby head/tail(3) per scope level
+  added(): a new row touches 3 windows (country, its state, its district),
+           copied into a new index; the affected scopes are re-ranked
+           lazily on the next read
+  read   : gainers / losers are slices of an already-ranked list → O(k)
+"""
+from __future__ import annotations
+import bisect
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.market_index import MarketIndex
+
+WINDOW = 3
+_LEVELS = ("country", "state", "district")
+
+
+class _Window:
+    """Earliest / latest WINDOW (day, seq, modal, state) rows of one commodity in one scope."""
+
+    __slots__ = ("first", "last", "count")
+
+    def __init__(self, first: list, last: list, count: int):
+        self.first, self.last, self.count = first, last, count
+
+    def add(self, row: tuple):
+        self.count += 1
+        if len(self.first) < WINDOW or row < self.first[-1]:
+            bisect.insort(self.first, row)
+            del self.first[WINDOW:]
+        if len(self.last) < WINDOW or row > self.last[0]:
+            bisect.insort(self.last, row)
+            del self.last[:-WINDOW]
+
+
+class MoversIndex:
+    """Ranked price movers per scope: None (all India), ("state", name), ("district", name)."""
+
+    def __init__(self, index: MarketIndex):
+        self._display: Dict[str, str] = {}        # lower-cased name → display name
+        self._windows: Dict[tuple, Dict[str, _Window]] = {}
+        self._ranked: Dict[tuple, List[Dict]] = {}
+        self._dirty: set = set()
+        self._seq = index.n_rows
+        self._build(index)
+
+    # ── Build ───────────────────────────────────────────
+
+    def _build(self, index: MarketIndex):
+        names = index.names
+        for col in ("commodity", "state", "district"):
+            for name in names[col]:
+                self._display.setdefault(name.lower(), name)
+        # MarketIndex rows are already in (commodity, date, file order); seq = that position
+        frame = pd.DataFrame({
+            "commodity": index.commodity, "state": index.state, "district": index.district,
+            "day": index.days, "seq": np.arange(index.n_rows), "modal": index.prices["modal_price"],
+        })
+        frame = frame[frame["commodity"] >= 0]
+        for level in _LEVELS:
+            keys = ["commodity"] if level == "country" else [level, "commodity"]
+            grouped = frame.groupby(keys, sort=False)
+            counts = grouped.size()
+            heads = self._rows_by_group(grouped.head(WINDOW), keys, names["state"])
+            tails = self._rows_by_group(grouped.tail(WINDOW), keys, names["state"])
+            for key, count in counts.items():
+                scope_code, commodity = (None, key) if level == "country" else key
+                if level != "country" and scope_code < 0:
+                    continue
+                scope = None if level == "country" else (level, names[level][scope_code].lower())
+                window = _Window(heads[key], tails[key], int(count))
+                self._windows.setdefault(scope, {})[names["commodity"][commodity].lower()] = window
+        self._dirty = set(self._windows)
+
+    @staticmethod
+    def _rows_by_group(part: pd.DataFrame, keys: list, state_names: List[str]) -> dict:
+        """group key → sorted [(day, seq, modal, state)] (groupby keeps the date order)."""
+        out: dict = {}
+        group_keys = part[keys[0]].tolist() if len(keys) == 1 else list(zip(*(part[k].tolist() for k in keys)))
+        for key, day, seq, modal, state in zip(group_keys, part["day"].tolist(), part["seq"].tolist(),
+                                               part["modal"].tolist(), part["state"].tolist()):
+            out.setdefault(key, []).append((day, seq, modal, state_names[state] if state >= 0 else ""))
+        return out
+
+    # ── Incremental updates ─────────────────────────────
+
+    def added(self, rows: pd.DataFrame) -> "MoversIndex":
+        """
+        A new index with price rows (commodity, state, district, date,
+        modal_price) folded into the windows. self is not modified — windows
+        the rows touch are copied first, the rest are shared — so it keeps
+        serving reads while this runs in a worker thread.
+        """
+        clone = MoversIndex.__new__(MoversIndex)
+        clone._display = dict(self._display)
+        clone._windows = {scope: dict(windows) for scope, windows in self._windows.items()}
+        clone._ranked = dict(self._ranked)
+        clone._dirty = set(self._dirty)
+        clone._seq = self._seq
+        copied = set()
+
+        commodities = rows["commodity"].astype(str).tolist()
+        states = rows["state"].fillna("").astype(str).tolist()
+        districts = rows["district"].fillna("").astype(str).tolist()
+        days = pd.to_datetime(rows["date"]).to_numpy(dtype="datetime64[D]").astype(np.int64).tolist()
+        for commodity, state, district, day, modal in zip(commodities, states, districts, days,
+                                                          rows["modal_price"].tolist()):
+            for name in (commodity, state, district):
+                if name:
+                    clone._display.setdefault(name.lower(), name)
+            clone._seq += 1
+            row = (day, clone._seq, modal, state)
+            scopes = [None]
+            if state:
+                scopes.append(("state", state.lower()))
+            if district:
+                scopes.append(("district", district.lower()))
+            key = commodity.lower()
+            for scope in scopes:
+                windows = clone._windows.setdefault(scope, {})
+                window = windows.get(key)
+                if window is None:
+                    windows[key] = _Window([row], [row], 1)
+                    copied.add((scope, key))
+                else:
+                    if (scope, key) not in copied:
+                        window = windows[key] = _Window(list(window.first), list(window.last), window.count)
+                        copied.add((scope, key))
+                    window.add(row)
+                clone._dirty.add(scope)
+        return clone
+
+    # ── Ranking ─────────────────────────────────────────
+
+    def _entry(self, commodity: str, window: _Window) -> Dict:
+        if window.count < 2:
+            return {"crop": self._display.get(commodity, commodity), "state": "",
+                    "current_price": 0, "change_pct": 0}
+        recent = sum(r[2] for r in window.last) / len(window.last)
+        older = sum(r[2] for r in window.first) / len(window.first)
+        change = ((recent - older) / older) * 100 if older > 0 else 0
+        return {
+            "crop": self._display.get(commodity, commodity),
+            "state": window.first[0][3],
+            "current_price": float(recent),
+            "change_pct": round(float(change), 2),
+        }
+
+    def _rank(self, scope) -> List[Dict]:
+        if scope in self._dirty or scope not in self._ranked:
+            windows = self._windows.get(scope, {})
+            entries = [self._entry(c, w) for c, w in sorted(windows.items())]
+            entries.sort(key=lambda e: e["change_pct"])   # ascending: losers first
+            self._ranked[scope] = entries
+            self._dirty.discard(scope)
+        return self._ranked[scope]
+
+    def top(self, direction: str, limit: int = 5,
+            state: Optional[str] = None, district: Optional[str] = None) -> List[Dict]:
+        """Top `limit` gainers or losers for all India, a state or a district (district wins)."""
+        if district:
+            scope = ("district", district.lower())
+        elif state:
+            scope = ("state", state.lower())
+        else:
+            scope = None
+        ranked = self._rank(scope)
+        if direction == "gainers":
+            return ranked[max(0, len(ranked) - limit):][::-1]
+        return ranked[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "scopes": len(self._windows),
+            "windows": sum(len(w) for w in self._windows.values()),
+            "dirty_scopes": len(self._dirty),
+        }
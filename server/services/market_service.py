@@ -1,83 +1,267 @@
 """
 SmartAgri AI - Market Service
 Handles mandi price data, trends, volatility analysis.
+
+The CSV plus ingested market_prices rows live in a MarketIndex
+(services/market_index.py) whose columns are memory-mapped from a
+MarketStore (services/market_store.py), so every worker shares one copy; each
+lookup below is a dictionary hit or a slice of its pre-sorted arrays. Top
+movers come from a MoversIndex (services/market_movers.py) ranked per scope.
+
+An ingest merges its rows into this worker's indexes right away
+(add_prices) and, once saved, writes that merged index as the next store
+generation (publish_store); the other workers pick it up in watch_store().
+A starting worker maps the published store and merges only the rows stamped
+after its watermark (sync).
 """
+import asyncio
 import os
 import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence
+from services.market_index import MarketIndex
+from services.market_movers import MoversIndex
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data", "raw")
 
 
+def _ingested_frame(rows: list) -> tuple:
+    """One page of market_prices rows → (MarketIndex columns, newest ingested_at in it)."""
+    df = pd.DataFrame(rows, columns=["commodity", "state", "district", "market", "date",
+                                     "min_price", "max_price", "modal_price", "ingested_at", "id"])
+    newest = df["ingested_at"].dropna().max() if len(df) else None
+    df["district"] = df["district"].fillna("")
+    df["date"] = pd.to_datetime(df["date"])
+    return df.drop(columns=["ingested_at", "id"]), (None if pd.isna(newest) else newest)
+
+
+async def fetch_ingested_prices(after: Optional[datetime] = None, include: Sequence[datetime] = (),
+                                exclude: Sequence[datetime] = (), page_rows: int = 50000) -> tuple:
+    """
+    market_prices rows stamped after `after` (all rows when None), plus rows
+    stamped with any of `include`, minus rows stamped with any of `exclude` →
+    (MarketIndex columns, newest ingested_at read). Read in id-ordered pages;
+    each page is turned into a DataFrame in a worker thread.
+    """
+    from sqlalchemy import or_, select
+    from database import async_session
+    from db_models import MarketPrice
+    from services.mandi_ingest import ensure_schema
+
+    stamp = MarketPrice.ingested_at
+    cols = (MarketPrice.commodity, MarketPrice.state, MarketPrice.district, MarketPrice.market_name,
+            MarketPrice.date, MarketPrice.min_price, MarketPrice.max_price, MarketPrice.modal_price,
+            stamp, MarketPrice.id)
+    query = select(*cols)
+    if after is not None:
+        query = query.where(or_(stamp > after, stamp.in_(list(include))) if include else stamp > after)
+    if exclude:
+        query = query.where(stamp.notin_(list(exclude)))
+
+    frames, newest, last_id = [], None, 0
+    async with async_session() as db:
+        await ensure_schema(db)
+        while True:
+            result = await db.execute(query.where(MarketPrice.id > last_id).order_by(MarketPrice.id).limit(page_rows))
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            frame, page_newest = await asyncio.to_thread(_ingested_frame, rows)
+            frames.append(frame)
+            if page_newest is not None and (newest is None or page_newest > newest):
+                newest = page_newest
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return frame, newest
+
+
 class MarketService:
     def __init__(self):
-        self._price_data = None
+        self._index: Optional[MarketIndex] = None
+        self._movers: Optional[MoversIndex] = None
+        self._store: Optional[str] = None              # published store generation this worker maps
+        self._watermark: Optional[datetime] = None     # newest market_prices.ingested_at in the index
+        self._merge_lock = asyncio.Lock()
         self._load_data()
 
     def _load_data(self):
+        self._index = self._open_index()
+        self._movers = MoversIndex(self._index)
+
+    @staticmethod
+    def _csv_path() -> str:
+        return os.path.join(DATA_DIR, "mandi_prices.csv")
+
+    def _open_index(self) -> MarketIndex:
+        """The published store (CSV + ingested rows up to its watermark), or the CSV alone."""
+        from config import get_settings
+        settings = get_settings()
+        csv_path = self._csv_path()
+        if settings.MARKET_STORE_ENABLED and os.path.exists(csv_path):
+            try:
+                # Columns memory-mapped from disk → shared by every worker via the page cache
+                from services.market_store import load_index
+                index, name = load_index(csv_path, settings.MARKET_STORE_DIR,
+                                         lambda: MarketIndex(self._read_csv(csv_path)))
+                self._set_store(name)
+                print(f"✅ Market data mapped: {index.n_rows} records ({settings.MARKET_STORE_DIR}/{name})")
+                return index
+            except Exception as e:
+                print(f"⚠ Market store unavailable, loading CSV: {e}")
         try:
-            csv_path = os.path.join(DATA_DIR, "mandi_prices.csv")
-            self._price_data = pd.read_csv(csv_path)
-            self._price_data["date"] = pd.to_datetime(self._price_data["date"])
-            print(f"✅ Market data loaded: {len(self._price_data)} records")
+            price_data = self._read_csv(csv_path)
+            print(f"✅ Market data loaded: {len(price_data)} records")
         except Exception as e:
             print(f"⚠ Could not load market data: {e}")
-            self._price_data = pd.DataFrame()
+            price_data = pd.DataFrame()
+        return MarketIndex(price_data)
+
+    def _set_store(self, name: str):
+        from config import get_settings
+        from services.market_store import read_watermark
+        watermark = read_watermark(os.path.join(get_settings().MARKET_STORE_DIR, name))
+        self._store = name
+        self._watermark = datetime.fromisoformat(watermark) if watermark else None
+
+    @staticmethod
+    def _read_csv(csv_path: str) -> pd.DataFrame:
+        price_data = pd.read_csv(csv_path)
+        price_data["date"] = pd.to_datetime(price_data["date"])
+        return price_data
+
+    # ── Ingested rows + store generations ───────────────
+
+    async def _catch_up(self, include: Sequence[datetime] = (), exclude: Sequence[datetime] = ()) -> int:
+        """Merge market_prices rows stamped after the watermark (caller holds the merge lock)."""
+        from config import get_settings
+        rows, newest = await fetch_ingested_prices(self._watermark, include, exclude,
+                                                   get_settings().MANDI_INGEST_CHUNK_ROWS)
+        if not rows.empty:
+            await self._merge(rows)
+        self._advance(newest)
+        return len(rows)
+
+    def _advance(self, stamp: Optional[datetime]):
+        if stamp is not None and (self._watermark is None or stamp > self._watermark):
+            self._watermark = stamp
+
+    async def _remap(self, name: str):
+        from config import get_settings
+        from services.market_store import open_store
+        index = await asyncio.to_thread(open_store, os.path.join(get_settings().MARKET_STORE_DIR, name))
+        if index is None:
+            raise RuntimeError(f"published market store {name} is unreadable")
+        movers = await asyncio.to_thread(MoversIndex, index)
+        self._index, self._movers = index, movers
+        self._set_store(name)
+
+    async def sync(self):
+        """
+        Startup: merge the market_prices rows newer than the mapped store's
+        watermark and, if there were any, publish the result for the other
+        workers. Without a store only this worker's indexes are brought up to date.
+        """
+        async with self._merge_lock:
+            pulled = await self._catch_up()
+        if pulled:
+            print(f"✅ Market data: {pulled} ingested rows merged")
+            await self.publish_store()
+
+    async def publish_store(self, saved: Sequence[datetime] = (), merged: bool = True):
+        """
+        Write this worker's merged index as the next store generation and map
+        it; other workers follow in watch_store(). `saved` are the ingested_at
+        stamps of the rows an ingest run just wrote, already merged here via
+        add_prices when `merged`. If another worker published first, its
+        generation is mapped instead and this run's rows are merged into it.
+        """
+        from config import get_settings
+        from services.market_store import open_store, publish_index, published
+        settings = get_settings()
+        csv_path = self._csv_path()
+        if not (settings.MARKET_STORE_ENABLED and os.path.exists(csv_path)):
+            return
+        store_dir = settings.MARKET_STORE_DIR
+        async with self._merge_lock:
+            remapped = False
+            while True:
+                base = await asyncio.to_thread(published, store_dir)
+                if base is not None and base != self._store:
+                    await self._remap(base)
+                    remapped = True
+                own_merged = merged and not remapped
+                await self._catch_up(include=() if own_merged else saved, exclude=saved if own_merged else ())
+                for stamp in saved:
+                    self._advance(stamp)
+                watermark = self._watermark.isoformat(sep=" ") if self._watermark else None
+                name = await asyncio.to_thread(publish_index, csv_path, store_dir, self._index, watermark, base)
+                if name is not None:
+                    break
+            # Same rows, now shared through the page cache; the movers index does not depend on positions
+            index = await asyncio.to_thread(open_store, os.path.join(store_dir, name))
+            if index is not None:
+                self._index = index
+            self._set_store(name)
+
+    async def watch_store(self, interval_s: float):
+        """Remap whenever another worker (or the ingest CLI) publishes a new store generation."""
+        from config import get_settings
+        from services.market_store import published
+        store_dir = get_settings().MARKET_STORE_DIR
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                name = await asyncio.to_thread(published, store_dir)
+                if name and name != self._store:
+                    async with self._merge_lock:
+                        await self._remap(name)
+            except Exception as e:
+                print(f"⚠ Market store refresh failed: {e}")
 
     def get_all_prices(self, state: Optional[str] = None, district: Optional[str] = None) -> List[Dict]:
         """Get latest prices for all commodities, optionally filtered by state/district."""
-        if self._price_data.empty:
-            return []
-        df = self._price_data.copy()
-        if state:
-            df = df[df["state"].str.lower() == state.lower()]
-        if district:
-            df = df[df["district"].str.lower() == district.lower()]
-        # Get the latest record per commodity
-        latest = df.sort_values("date", ascending=False).groupby("commodity").first().reset_index()
-        records = latest.to_dict("records")
-        for r in records:
-            if "date" in r and hasattr(r["date"], "strftime"):
-                r["date"] = r["date"].strftime("%Y-%m-%d")
-        return records
+        return self._index.latest(state, district)
 
     def get_prices(self, crop: str, state: Optional[str] = None) -> List[Dict]:
         """Get current prices for a crop."""
-        if self._price_data.empty:
-            return []
-        mask = self._price_data["commodity"].str.lower() == crop.lower()
-        if state:
-            mask &= self._price_data["state"].str.lower() == state.lower()
-        df = self._price_data[mask].sort_values("date", ascending=False)
-        return df.head(10).to_dict("records")
-
-    def get_price_history(self, crop: str, days: int = 90) -> List[Dict]:
-        """Get historical price data for a crop."""
-        if self._price_data.empty:
-            return []
-        mask = self._price_data["commodity"].str.lower() == crop.lower()
-        df = self._price_data[mask].sort_values("date")
-        records = df.to_dict("records")
-        for r in records:
-            r["date"] = r["date"].strftime("%Y-%m-%d")
-        return records
+        positions = self._index.history(crop, state)
+        return self._index.records(positions[::-1][:10])
+
+    def get_price_history(self, crop: str, days: int = 90, state: Optional[str] = None,
+                          interval: str = "raw", points: Optional[int] = None) -> Dict:
+        """
+        Column-oriented price history for the last `days` days of a crop's data:
+        raw reports or daily / weekly / monthly OHLC buckets, optionally LTTB
+        downsampled to `points` (services/market_history.py).
+        """
+        from services.market_history import price_history
+        return price_history(self._index, crop, days, state, interval, points)
+
+    def get_recent_range(self, crop: str, state: Optional[str] = None, days: int = 30) -> Optional[tuple]:
+        """Mean (min_price, max_price) over the last `days` days of a crop's data; None if no rows."""
+        positions = self._index.history(crop, state, days=days)
+        if not len(positions):
+            return None
+        prices = self._index.prices
+        return float(prices["min_price"][positions].mean()), float(prices["max_price"][positions].mean())
+
+    def get_daily_max(self, crop: str) -> tuple:
+        """(days since the epoch, highest modal price that day) for every day a crop was reported."""
+        return self._index.daily_max(crop)
 
     def get_trend(self, crop: str) -> Dict:
         """Analyze price trend for a crop."""
-        if self._price_data.empty:
-            return {"trend_direction": "stable", "price_change_pct": 0}
-
-        mask = self._price_data["commodity"].str.lower() == crop.lower()
-        df = self._price_data[mask].sort_values("date")
-        if len(df) < 2:
+        idx = self._index
+        positions = idx.history(crop)
+        if len(positions) < 2:
             return {"trend_direction": "stable", "price_change_pct": 0}
 
-        recent = df.tail(3)["modal_price"].mean()
-        older = df.head(3)["modal_price"].mean()
+        modal = idx.prices["modal_price"][positions]
+        recent = modal[-3:].mean()
+        older = modal[:3].mean()
         change = ((recent - older) / older) * 100 if older > 0 else 0
 
         if change > 3:
@@ -87,37 +271,25 @@ class MarketService:
         else:
             direction = "stable"
 
-        data_points = []
-        for _, row in df.iterrows():
-            data_points.append({
-                "date": row["date"].strftime("%Y-%m-%d"),
-                "min_price": row["min_price"],
-                "max_price": row["max_price"],
-                "modal_price": row["modal_price"],
-            })
+        data_points = idx.records(positions, ("date", "min_price", "max_price", "modal_price"))
 
         return {
             "crop": crop,
-            "state": df["state"].iloc[0] if len(df) > 0 else "",
+            "state": idx.column("state", positions[:1])[0],
             "current_price": float(recent),
-            "price_change_pct": round(change, 2),
+            "price_change_pct": round(float(change), 2),
             "trend_direction": direction,
             "data_points": data_points,
         }
 
     def get_volatility(self, crop: str) -> Dict:
         """Calculate price volatility for a crop."""
-        if self._price_data.empty:
-            return {"volatility_index": 0, "risk_level": "Low"}
-
-        mask = self._price_data["commodity"].str.lower() == crop.lower()
-        df = self._price_data[mask]
-        if len(df) < 2:
+        stats = self._index.stats(crop)
+        if stats is None:
             return {"volatility_index": 0, "risk_level": "Low"}
 
-        prices = df["modal_price"]
-        avg = prices.mean()
-        std = prices.std()
+        avg = stats["mean"]
+        std = stats["std"]
         volatility = (std / avg) * 100 if avg > 0 else 0
 
         if volatility < 5:
@@ -135,26 +307,35 @@ class MarketService:
             "std_dev": round(std, 2),
         }
 
-    def get_top_movers(self, direction: str = "gainers") -> List[Dict]:
-        """Get crops with highest price changes."""
-        if self._price_data.empty:
-            return []
+    def get_top_movers(self, direction: str = "gainers", limit: int = 5,
+                       state: Optional[str] = None, district: Optional[str] = None) -> List[Dict]:
+        """Get crops with highest price changes, nationally or within a state / district."""
+        return self._movers.top(direction, limit, state, district)
+
+    async def add_prices(self, rows: pd.DataFrame) -> Dict:
+        """
+        Merge newly ingested rows (MarketIndex columns) into the live indexes.
+        The merged price and movers indexes are built in a worker thread while
+        requests keep reading the current ones, then swapped in. New rows
+        update the movers windows incrementally; corrections to already-loaded
+        rows rebuild the movers index.
+        """
+        async with self._merge_lock:        # concurrent ingests merge one after another
+            return await self._merge(rows)
 
-        results = []
-        for crop in self._price_data["commodity"].unique():
-            trend = self.get_trend(crop)
-            results.append({
-                "crop": crop,
-                "state": trend.get("state", ""),
-                "current_price": trend.get("current_price", 0),
-                "change_pct": trend.get("price_change_pct", 0),
-            })
+    async def _merge(self, rows: pd.DataFrame) -> Dict:
+        index, movers = self._index, self._movers
 
-        results.sort(
-            key=lambda x: x["change_pct"],
-            reverse=(direction == "gainers"),
-        )
-        return results[:5]
+        def _merged():
+            merged, is_new = index.merged(rows)
+            if not is_new.all():
+                return merged, MoversIndex(merged), is_new
+            return merged, movers.added(rows), is_new
+
+        merged, movers, is_new = await asyncio.to_thread(_merged)
+        self._index, self._movers = merged, movers
+        inserted = int(is_new.sum())
+        return {"inserted": inserted, "updated": len(is_new) - inserted, "rows": merged.n_rows}
 
 
 _market_instance: Optional[MarketService] = None
@@ -165,3 +346,17 @@ def get_market_service() -> MarketService:
     if _market_instance is None:
         _market_instance = MarketService()
     return _market_instance
+
+
+async def init_market_service() -> MarketService:
+    """
+    Create the service from async code (startup, ingest CLI): the store or
+    CSV is loaded in a worker thread, then ingested rows newer than the
+    store's watermark are merged (MarketService.sync).
+    """
+    global _market_instance
+    if _market_instance is None:
+        service = await asyncio.to_thread(MarketService)
+        await service.sync()
+        _market_instance = service
+    return _market_instance
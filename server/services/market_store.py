@@ -0,0 +1,192 @@
+"""
+SmartAgri AI - On-Disk Mandi Price Store
+The sorted MarketIndex columns persisted as one .npy file per column and
+memory-mapped by every worker process. N uvicorn / gunicorn workers then
+share one copy of the price history through the OS page cache instead of
+each parsing the CSV into its own heap.
+
+  layout     : <MARKET_STORE_DIR>/<signature>/<column>.npy + meta.json
+               (vocabularies, row count, commodity partitions)
+  partitions : rows are sorted by (commodity, date), so a commodity is one
+               contiguous [start, stop) range — a history query only faults
+               in that range of the columns it actually reads
+  source     : generation 0 is the CSV; later generations are the index a
+               worker had already merged ingested market_prices rows into
+               (MarketService.publish_store). meta.json records the newest
+               market_prices.ingested_at it contains (the watermark), so a
+               starting worker reads only rows stamped after it
+  freshness  : <signature> is the source CSV's size and mtime plus a
+               generation "-g<n>"; <MARKET_STORE_DIR>/CURRENT names the
+               published store. A changed CSV builds generation 0 once under
+               a file lock; publish_index() writes the next generation only if
+               CURRENT still names the one the writer started from, renames it
+               into place and rewrites CURRENT atomically; every worker polls
+               CURRENT (MarketService.watch_store) and remaps
+  writes     : arrays are mapped copy-on-write and never written; an
+               ingest merge (MarketIndex.merged) builds new private arrays in
+               the worker that applies it
+"""
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from services.market_index import ARRAYS, MarketIndex
+
+FORMAT_VERSION = 2
+_META = "meta.json"
+_CURRENT = "CURRENT"
+
+
+def source_signature(csv_path: str) -> str:
+    st = os.stat(csv_path)
+    return f"v{FORMAT_VERSION}-{st.st_size}-{st.st_mtime_ns}"
+
+
+def write_store(index: MarketIndex, path: str, watermark: Optional[str] = None) -> str:
+    """
+    Persist an index's sorted columns under `path` (`watermark`: newest
+    market_prices.ingested_at it contains). Written to a temp dir and
+    renamed into place, so concurrent workers never see a partial store.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in index.arrays().items():
+        array = np.asarray(array)
+        if array.dtype.kind == "O":      # e.g. prices parsed as mixed objects
+            array = array.astype(np.float64)
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    meta = {
+        "version": FORMAT_VERSION,
+        "n_rows": index.n_rows,
+        "names": index.names,
+        "partitions": index.slices,
+        "watermark": watermark,
+    }
+    with open(os.path.join(tmp, _META), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Another worker finished the same store first — use theirs
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def open_store(path: str) -> Optional[MarketIndex]:
+    """MarketIndex over the memory-mapped columns at `path` (None if absent)."""
+    meta_path = os.path.join(path, _META)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        return None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c") for name in ARRAYS}
+    return MarketIndex.from_arrays(arrays, meta["names"], meta["partitions"])
+
+
+def read_watermark(path: str) -> Optional[str]:
+    """Newest market_prices.ingested_at in the store at `path` (None: no ingested rows)."""
+    try:
+        with open(os.path.join(path, _META), "r", encoding="utf-8") as f:
+            return json.load(f).get("watermark")
+    except (OSError, ValueError):
+        return None
+
+
+def _prune(store_dir: str, keep: str):
+    """Drop superseded stores — older CSVs or generations (best effort; mapped files stay valid)."""
+    for entry in os.listdir(store_dir):
+        if entry != keep and entry.startswith("v"):
+            shutil.rmtree(os.path.join(store_dir, entry), ignore_errors=True)
+
+
+def published(store_dir: str) -> Optional[str]:
+    """Name of the store every worker should map (None before the first build)."""
+    try:
+        with open(os.path.join(store_dir, _CURRENT), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _publish(store_dir: str, name: str):
+    tmp = os.path.join(store_dir, f"{_CURRENT}.tmp-{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(store_dir, _CURRENT))
+
+
+def _generation(name: Optional[str]) -> int:
+    try:
+        return int(name.rsplit("-g", 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return -1
+
+
+def load_index(csv_path: str, store_dir: str, build: Callable[[], MarketIndex]) -> Tuple[MarketIndex, str]:
+    """
+    (memory-mapped index, store name) of the published store for `csv_path`.
+    Builds generation 0 with `build()` (CSV → MarketIndex) when none is
+    published for this CSV yet, then publishes and maps it.
+    """
+    prefix = source_signature(csv_path)
+    name = published(store_dir)
+    if name and name.startswith(f"{prefix}-g"):
+        index = open_store(os.path.join(store_dir, name))
+        if index is not None:
+            return index, name
+    os.makedirs(store_dir, exist_ok=True)
+    with _build_lock(store_dir):
+        latest = published(store_dir)
+        if latest and latest.startswith(f"{prefix}-g"):
+            index = open_store(os.path.join(store_dir, latest))   # built by another worker while we waited
+            if index is not None:
+                return index, latest
+        name = f"{prefix}-g0"
+        write_store(build(), os.path.join(store_dir, name))
+        _publish(store_dir, name)
+        _prune(store_dir, keep=name)
+        return open_store(os.path.join(store_dir, name)), name
+
+
+def publish_index(csv_path: str, store_dir: str, index: MarketIndex, watermark: Optional[str],
+                  base: Optional[str]) -> Optional[str]:
+    """
+    Write `index` as the next generation and publish it — only if CURRENT
+    still names `base`, the store the caller's index was derived from.
+    Returns the new store name, or None if another worker published first.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    with _build_lock(store_dir):
+        latest = published(store_dir)
+        if latest != base:
+            return None
+        # Same CSV signature as the base: a CSV replaced meanwhile still triggers a fresh generation 0
+        prefix = base.rsplit("-g", 1)[0] if base else source_signature(csv_path)
+        name = f"{prefix}-g{_generation(latest) + 1}"
+        write_store(index, os.path.join(store_dir, name), watermark)
+        _publish(store_dir, name)
+        _prune(store_dir, keep=name)
+        return name
+
+
+@contextmanager
+def _build_lock(store_dir: str):
+    """Exclusive lock so workers starting together build the store only once."""
+    try:
+        import fcntl
+    except ImportError:                   # Windows: builds may race; the rename keeps them safe
+        yield
+        return
+    with open(os.path.join(store_dir, ".build.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
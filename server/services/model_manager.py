@@ -0,0 +1,200 @@
+"""
+SmartAgri AI - Model Lifecycle Manager
+One registry for every model the API serves (disease ensemble, crop
+RandomForest, yield / price regressors, ...).
+
+  register(name, loader, warmup, required)  ← each service, at startup
+  preload()                                 ← app lifespan, in the background
+  status() / all_required_ready()           ← /api/health/ready
+
+Each model moves  pending → loading → warming → ready  (or failed), with its
+load and warm-up time recorded. A failed load is retried in the background
+with exponential backoff (MODEL_RETRY_BASE_S doubling up to MODEL_RETRY_MAX_S)
+until it succeeds; a service that loads its model lazily on its own reports
+that with mark_ready(). /api/health/ready keeps failing until every
+model listed in REQUIRED_MODELS is ready, so traffic is only routed to an
+instance once real inference is possible.
+"""
+from __future__ import annotations
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("model_manager")
+
+PENDING, LOADING, WARMING, READY, FAILED = "pending", "loading", "warming", "ready", "failed"
+
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when a request needs a model that is still loading (→ HTTP 503)."""
+
+
+class _ManagedModel:
+    def __init__(self, name: str, loader: Callable, warmup: Optional[Callable],
+                 required: bool, description: str):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.required = required
+        self.description = description
+        self.state = PENDING
+        self.obj: Any = None
+        self.error: Optional[str] = None
+        self.load_s: Optional[float] = None
+        self.warmup_s: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.attempts = 0                      # failed loads since the last success
+        self.retry_at: Optional[float] = None  # wall-clock time of the next retry
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "state": self.state,
+            "required": self.required,
+            "load_s": round(self.load_s, 3) if self.load_s is not None else None,
+            "warmup_s": round(self.warmup_s, 3) if self.warmup_s is not None else None,
+            "ready_at": self.ready_at,
+            "error": self.error,
+            "attempts": self.attempts,
+            "retry_at": self.retry_at,
+        }
+
+
+async def _call(fn: Callable, *args):
+    """Await coroutine functions; run blocking ones in a thread."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+class ModelManager:
+    """Registry + loader for all served models."""
+
+    def __init__(self, required: Optional[set[str]] = None,
+                 retry_base_s: float = 5.0, retry_max_s: float = 300.0):
+        self._models: dict[str, _ManagedModel] = {}
+        self._required_names = required
+        self._preload_task: Optional[asyncio.Task] = None
+        self._retry_tasks: dict[str, asyncio.Task] = {}
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+
+    def register(self, name: str, loader: Callable, warmup: Optional[Callable] = None,
+                 required: Optional[bool] = None, description: str = ""):
+        """
+        loader() returns the loaded model object (sync or async) and raises on failure.
+        warmup(obj) runs a few representative inferences (sync or async).
+        `required` defaults to membership in REQUIRED_MODELS.
+        """
+        if required is None:
+            required = self._required_names is None or name in self._required_names
+        self._models[name] = _ManagedModel(name, loader, warmup, required, description)
+
+    async def load(self, name: str) -> bool:
+        m = self._models[name]
+        m.state, m.error = LOADING, None
+        try:
+            t0 = time.perf_counter()
+            m.obj = await _call(m.loader)
+            m.load_s = time.perf_counter() - t0
+            if m.warmup is not None:
+                m.state = WARMING
+                t0 = time.perf_counter()
+                await _call(m.warmup, m.obj)
+                m.warmup_s = time.perf_counter() - t0
+            m.state, m.ready_at = READY, time.time()
+            m.attempts, m.retry_at = 0, None
+            logger.info(f"✅ Model '{name}' ready (load {m.load_s:.2f}s, warm-up {m.warmup_s or 0:.2f}s)")
+            return True
+        except Exception as e:
+            m.state, m.error = FAILED, str(e)
+            m.attempts += 1
+            delay = min(self.retry_base_s * 2 ** (m.attempts - 1), self.retry_max_s)
+            m.retry_at = time.time() + delay
+            logger.error(f"❌ Model '{name}' failed to load: {e} — retrying in {delay:.0f}s")
+            self._retry_tasks[name] = asyncio.create_task(self._retry(name, delay), name=f"model-retry-{name}")
+            return False
+
+    async def _retry(self, name: str, delay: float):
+        await asyncio.sleep(delay)
+        if self._models[name].state == FAILED:   # not loaded lazily in the meantime
+            await self.load(name)
+
+    def mark_ready(self, name: str, obj: Any):
+        """Record a model its service loaded outside the manager (e.g. lazily on first request)."""
+        m = self._models.get(name)
+        if m is None or m.state in (READY, LOADING, WARMING):
+            return
+        m.obj, m.state, m.error, m.ready_at = obj, READY, None, time.time()
+        m.attempts, m.retry_at = 0, None
+        logger.info(f"✅ Model '{name}' ready (loaded on demand)")
+
+    async def preload(self):
+        """Load + warm every registered model concurrently."""
+        await asyncio.gather(*(self.load(name) for name in self._models))
+
+    def start_preload(self) -> asyncio.Task:
+        """Kick off preload() in the background so the server can answer probes meanwhile."""
+        if self._preload_task is None or self._preload_task.done():
+            self._preload_task = asyncio.create_task(self.preload(), name="model-preload")
+        return self._preload_task
+
+    def stop(self):
+        """Cancel pending load retries (app shutdown)."""
+        for task in self._retry_tasks.values():
+            task.cancel()
+        self._retry_tasks.clear()
+
+    def get(self, name: str) -> Any:
+        """Loaded object for `name`; raises ModelNotReadyError until it is warm."""
+        m = self._models.get(name)
+        if m is None or m.state != READY:
+            state = m.state if m else "unregistered"
+            raise ModelNotReadyError(f"Model '{name}' is not ready ({state})")
+        return m.obj
+
+    def is_ready(self, name: str) -> bool:
+        m = self._models.get(name)
+        return m is not None and m.state == READY
+
+    def all_required_ready(self) -> bool:
+        return all(m.state == READY for m in self._models.values() if m.required)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.all_required_ready(),
+            "models": {name: m.as_dict() for name, m in self._models.items()},
+        }
+
+
+_manager: Optional[ModelManager] = None
+
+
+def get_model_manager() -> ModelManager:
+    global _manager
+    if _manager is None:
+        from config import get_settings
+        settings = get_settings()
+        required = {n.strip() for n in settings.REQUIRED_MODELS.split(",") if n.strip()}
+        _manager = ModelManager(required=required, retry_base_s=settings.MODEL_RETRY_BASE_S,
+                                retry_max_s=settings.MODEL_RETRY_MAX_S)
+    return _manager
+
+
+def configure_model_cache(cache_dir: str, offline: bool = False):
+    """
+    Point the HF hub at a local model cache so workers load from disk instead
+    of downloading on startup. Must run before transformers is imported (and
+    before worker processes are spawned — they inherit the environment).
+    """
+    if cache_dir:
+        cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ.setdefault("HF_HOME", cache_dir)
+    if offline:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
@@ -0,0 +1,203 @@
+"""
+SmartAgri AI - Price Forecasting Service
+Serves the GradientBoosting price model trained by ml/train_price_model.py
+(price_forecaster.joblib) with its label_encoder_commodity /
+label_encoder_price_state / scaler_price artifacts, all loaded once.
+
+  features : [commodity, state, month, ISO week, min_price, max_price] —
+             the preprocess.py layout. Week is the ISO week of the 15th of
+             the target month; min / max are the mean mandi min / max price
+             of the commodity in the state over the last
+             PRICE_FORECAST_WINDOW_DAYS of data (country-wide if the state
+             has none)
+  batching : predict_many() encodes every (commodity, state, month) query
+             through code arrays, then runs ONE scaler.transform + predict
+             over the feature matrix; a query without a state is the mean
+             over every state the encoder knows
+  cache    : answers are memoized per (commodity, state, month) for the
+             current day — the inputs only move when new mandi data lands
+
+Queries the model cannot answer (unknown commodity, no mandi data, model
+not loaded) return None, and callers keep their previous estimate.
+"""
+import os
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+
+Query = Tuple[str, Optional[str], int]      # (commodity, state or None, month 1-12)
+
+
+class _Artifacts:
+    """One loaded model + scaler + encoder vocabularies; a reload replaces the whole set."""
+
+    def __init__(self, model, scaler, commodities: List[str], states: List[str]):
+        self.model = model
+        self.scaler = scaler
+        self.commodities = commodities
+        self.states = states
+        self.commodity_code: Dict[str, int] = {c.lower(): i for i, c in enumerate(commodities)}
+        self.state_code: Dict[str, int] = {s.lower(): i for i, s in enumerate(states)}
+
+
+class PriceForecaster:
+    """Loaded price model + encoders; batched (commodity, state, month) → ₹/quintal."""
+
+    def __init__(self, model_dir: str, window_days: int = 30):
+        self.model_dir = model_dir
+        self.window_days = window_days
+        self._artifacts: Optional[_Artifacts] = None
+        self._cache: Dict[tuple, Optional[float]] = {}
+        self._cache_day: Optional[date] = None
+        self._lock = threading.Lock()
+        self._load_models()
+
+    def _load_models(self):
+        try:
+            model = joblib.load(os.path.join(self.model_dir, "price_forecaster.joblib"))
+            commodity_enc = joblib.load(os.path.join(self.model_dir, "label_encoder_commodity.joblib"))
+            state_enc = joblib.load(os.path.join(self.model_dir, "label_encoder_price_state.joblib"))
+            scaler = joblib.load(os.path.join(self.model_dir, "scaler_price.joblib"))
+            artifacts = _Artifacts(model, scaler, [str(c) for c in commodity_enc.classes_],
+                                   [str(s) for s in state_enc.classes_])
+        except Exception as e:
+            if self._artifacts is None:
+                print(f"⚠ Price forecaster not available, using trend / table estimates: {e}")
+            else:
+                print(f"⚠ Price forecaster reload failed, keeping the loaded model: {e}")
+            return
+        with self._lock:
+            self._artifacts = artifacts
+            self._cache.clear()
+        print(f"✅ Price forecaster loaded ({len(artifacts.commodities)} commodities, {len(artifacts.states)} states)")
+
+    @property
+    def ready(self) -> bool:
+        return self._artifacts is not None
+
+    @property
+    def commodities(self) -> List[str]:
+        return self._artifacts.commodities if self._artifacts else []
+
+    @property
+    def states(self) -> List[str]:
+        return self._artifacts.states if self._artifacts else []
+
+    def predict(self, commodity: str, state: Optional[str] = None, month: Optional[int] = None) -> Optional[float]:
+        """Modal price forecast for one commodity / state / month (default: this month)."""
+        return self.predict_many([(commodity, state, month or date.today().month)])[0]
+
+    def predict_many(self, queries: Sequence[Query]) -> List[Optional[float]]:
+        """Forecasts for many (commodity, state, month) queries, in order; None where unanswerable."""
+        art = self._artifacts       # one artifact set for the whole batch, even across a reload
+        if art is None:
+            return [None] * len(queries)
+
+        today = date.today()
+        keys = [self._key(art, *q) for q in queries]
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            if self._cache_day != today:
+                self._cache.clear()
+                self._cache_day = today
+            known = {k: self._cache[k] for k in unique if k in self._cache} if self._artifacts is art else {}
+        missing = [k for k in unique if k not in known]
+        if missing:
+            known.update(zip(missing, self._predict_keys(art, missing, today.year)))
+            with self._lock:
+                if self._artifacts is art:      # codes of a replaced set must not land in the new cache
+                    self._cache.update((k, known[k]) for k in missing)
+        return [known[k] for k in keys]
+
+    # ── Encoding ──────────────────────────────────────────
+    @staticmethod
+    def _key(art: _Artifacts, commodity: str, state: Optional[str], month: int) -> tuple:
+        """(commodity code, state code / -1 for all states / -2 unknown, month)."""
+        c = art.commodity_code.get((commodity or "").strip().lower(), -1)
+        if not state:
+            s = -1
+        else:
+            s = art.state_code.get(state.strip().lower(), -2)
+        return c, s, int(month)
+
+    def _price_inputs(self, art: _Artifacts, pairs: np.ndarray) -> np.ndarray:
+        """(commodity, state) code pairs → recent mean [min_price, max_price] (NaN without data)."""
+        from services.market_service import get_market_service
+        service = get_market_service()
+        out = np.full((len(pairs), 2), np.nan)
+        national: Dict[int, Optional[tuple]] = {}
+        for row, (c, s) in enumerate(pairs.tolist()):
+            commodity = art.commodities[c]
+            price_range = service.get_recent_range(commodity, art.states[s], self.window_days)
+            if price_range is None:
+                if c not in national:
+                    national[c] = service.get_recent_range(commodity, None, self.window_days)
+                price_range = national[c]
+            if price_range is not None:
+                out[row] = price_range
+        return out
+
+    def _predict_keys(self, art: _Artifacts, keys: List[tuple], year: int) -> List[Optional[float]]:
+        """One feature matrix for all keys (all-state keys expand to one row per state)."""
+        key_arr = np.array(keys, dtype=np.int64).reshape(-1, 3)
+        n_states = len(art.states)
+        all_states = key_arr[:, 1] == -1
+        valid = (key_arr[:, 0] >= 0) & (key_arr[:, 1] >= -1) & (key_arr[:, 2] >= 1) & (key_arr[:, 2] <= 12)
+
+        # Rows: each valid key once, or once per state when it asks for all states
+        reps = np.where(valid, np.where(all_states, n_states, 1), 0)
+        owner = np.repeat(np.arange(len(keys)), reps)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(reps) - reps, reps)
+        commodity = key_arr[owner, 0]
+        state = np.where(all_states[owner], offset, key_arr[owner, 1])
+        month = key_arr[owner, 2]
+        if not len(owner):
+            return [None] * len(keys)
+
+        # Unique (commodity, state) pairs → recent mandi min / max
+        pairs, inverse = np.unique(np.stack([commodity, state], axis=1), axis=0, return_inverse=True)
+        prices = self._price_inputs(art, pairs)[inverse.ravel()]
+        week = np.array([date(year, m, 15).isocalendar()[1] for m in range(1, 13)])[month - 1]
+
+        features = np.column_stack([commodity, state, month, week, prices]).astype(np.float64)
+        has_data = ~np.isnan(prices).any(axis=1)
+        preds = np.full(len(owner), np.nan)
+        if has_data.any():
+            preds[has_data] = art.model.predict(art.scaler.transform(features[has_data]))
+
+        # Mean per key over its rows with data
+        sums = np.bincount(owner[has_data], weights=preds[has_data], minlength=len(keys))
+        counts = np.bincount(owner[has_data], minlength=len(keys))
+        return [round(float(s / n), 2) if n else None for s, n in zip(sums.tolist(), counts.tolist())]
+
+
+# Singleton forecaster instance
+_forecaster: Optional[PriceForecaster] = None
+
+
+def get_price_forecaster(model_dir: Optional[str] = None) -> PriceForecaster:
+    global _forecaster
+    if _forecaster is None:
+        from config import get_settings
+        settings = get_settings()
+        _forecaster = PriceForecaster(model_dir or settings.MODEL_DIR, settings.PRICE_FORECAST_WINDOW_DAYS)
+    return _forecaster
+
+
+def register_models(manager, model_dir: str):
+    """Register the GradientBoosting price model with the model lifecycle manager."""
+    def _load():
+        forecaster = get_price_forecaster(model_dir)
+        if not forecaster.ready:
+            raise RuntimeError(f"price_forecaster.joblib could not be loaded from {model_dir}")
+        return forecaster
+
+    def _warmup(forecaster: PriceForecaster):
+        # One batch over every commodity fills today's national cache
+        forecaster.predict_many([(c, None, date.today().month) for c in forecaster.commodities])
+
+    manager.register("price_forecaster", _load, warmup=_warmup,
+                     description="GradientBoosting mandi price forecaster")
@@ -0,0 +1,154 @@
+"""
+SmartAgri AI - Dense Crop Price Tensor
+REAL_MSP × MARKET_TO_MSP_RATIO, NON_MSP_PRICES and REAL_SEASONAL
+(services/real_crop_prices.py) compiled once into a single array of shape
+(crop, year, month) plus a crop name → row map, so history and curve
+lookups are array slices instead of three nested dict lookups per
+(year, month). Scalar monthly / peak lookups read a nested-list copy of the
+same values, which is faster than indexing the array one element at a time.
+
+  values   : exactly get_monthly_price() — MSP crops are MSP × market
+             premium, others their market price, × the seasonal factor where
+             REAL_SEASONAL has the crop; 0 where there is no price
+  dtype    : float64 — float32 moves a few x.5 prices across a rounding
+             boundary, and the whole tensor is only ~50 KB either way
+  storage  : <MARKET_STORE_DIR>/crop_prices/<signature>/prices.npy +
+             meta.json, memory-mapped read-only by every worker; <signature>
+             comes from real_crop_prices.py, so editing the data rebuilds it
+"""
+import json
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services import real_crop_prices as source
+
+FORMAT_VERSION = 1
+YEARS = (2015, 2025)
+FALLBACK_YEAR = 2025       # years outside the data use this year's price, as get_historical_price does
+_META = "meta.json"
+
+
+class PriceTensor:
+    """(crop, year, month) price array with a case-sensitive crop name → row map."""
+
+    def __init__(self, prices: np.ndarray, crops: List[str], first_year: int = YEARS[0]):
+        self.prices = prices.view(np.ndarray)      # a plain view of the memmap: no subclass overhead per index
+        self._rows = self.prices.tolist()          # same values as nested lists: scalar lookups without numpy boxing
+        self.crops = crops
+        self.lookup: Dict[str, int] = {c: i for i, c in enumerate(crops)}
+        self.first_year = first_year
+        self.n_years = prices.shape[1]
+
+    @classmethod
+    def compile(cls) -> "PriceTensor":
+        """Build the tensor from the dicts in services/real_crop_prices.py."""
+        crops = list(source.REAL_MSP) + [c for c in source.NON_MSP_PRICES if c not in source.REAL_MSP]
+        years = range(YEARS[0], YEARS[1] + 1)
+        prices = np.zeros((len(crops), len(years), 12), dtype=np.float64)
+        for i, crop in enumerate(crops):
+            seasonal = source.REAL_SEASONAL.get(crop)
+            for j, year in enumerate(years):
+                base = source.get_historical_price(crop, year)
+                prices[i, j] = [base * s for s in seasonal] if seasonal else base
+        return cls(prices, crops)
+
+    def row(self, crop: str) -> Optional[int]:
+        return self.lookup.get(crop)
+
+    def year_column(self, year: int) -> int:
+        j = year - self.first_year
+        return j if 0 <= j < self.n_years else FALLBACK_YEAR - self.first_year
+
+    def monthly(self, crop: str, year: int, month: int) -> float:
+        i = self.lookup.get(crop)
+        return 0 if i is None else self._rows[i][self.year_column(year)][month - 1]
+
+    def curve(self, crop: str, year: int) -> np.ndarray:
+        """12 monthly prices of one year (zeros for an unknown crop)."""
+        i = self.lookup.get(crop)
+        return np.zeros(12) if i is None else self.prices[i, self.year_column(year)]
+
+    def history(self, crop: str) -> np.ndarray:
+        """(year, month) view of a crop's prices over YEARS (zeros for an unknown crop)."""
+        i = self.lookup.get(crop)
+        return np.zeros((self.n_years, 12)) if i is None else self.prices[i]
+
+    def peak(self, crop: str, year: int, months: Sequence[int]) -> float:
+        """Highest positive price over `months` (1-12) of `year`; 0 if none."""
+        i = self.lookup.get(crop)
+        if not months or i is None:
+            return 0
+        curve = self._rows[i][self.year_column(year)]
+        peak = max(curve[m - 1] for m in months)
+        return peak if peak > 0 else 0
+
+
+# ── Serialized form ───────────────────────────────────────
+
+def write_tensor(tensor: PriceTensor, path: str) -> str:
+    """Persist under `path` via a temp dir + rename, like services/market_store.py."""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "prices.npy"), np.ascontiguousarray(tensor.prices))
+    with open(os.path.join(tmp, _META), "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "crops": tensor.crops, "first_year": tensor.first_year}, f)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def open_tensor(path: str) -> Optional[PriceTensor]:
+    """PriceTensor over the memory-mapped array at `path` (None if absent)."""
+    meta_path = os.path.join(path, _META)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        return None
+    prices = np.load(os.path.join(path, "prices.npy"), mmap_mode="r")
+    return PriceTensor(prices, meta["crops"], meta["first_year"])
+
+
+def load_tensor(store_dir: str) -> PriceTensor:
+    """Map the tensor for the current real_crop_prices.py, compiling and persisting it once."""
+    from services.market_store import _build_lock, _prune, source_signature
+
+    signature = f"{source_signature(source.__file__)}-t{FORMAT_VERSION}"
+    path = os.path.join(store_dir, signature)
+    tensor = open_tensor(path)
+    if tensor is None:
+        os.makedirs(store_dir, exist_ok=True)
+        with _build_lock(store_dir):
+            tensor = open_tensor(path)
+            if tensor is None:
+                write_tensor(PriceTensor.compile(), path)
+                _prune(store_dir, keep=signature)
+                tensor = open_tensor(path)
+    return tensor
+
+
+# ── Singleton ────────────────────────────────────────────
+
+_tensor: Optional[PriceTensor] = None
+
+
+def get_price_tensor() -> PriceTensor:
+    global _tensor
+    if _tensor is None:
+        from config import get_settings
+        settings = get_settings()
+        if settings.MARKET_STORE_ENABLED:
+            try:
+                _tensor = load_tensor(os.path.join(settings.MARKET_STORE_DIR, "crop_prices"))
+            except OSError as e:
+                print(f"⚠️ Crop price tensor store unavailable ({e}), compiling in memory")
+        if _tensor is None:
+            _tensor = PriceTensor.compile()
+    return _tensor
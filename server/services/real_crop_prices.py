@@ -7,6 +7,8 @@ Actual year-by-year MSP and market price data from:
   - State-wise modal price variations
 
 Each crop has ACTUAL MSP progression + real market price multipliers per year.
+Lookups are served from the dense (crop, year, month) array compiled from
+these tables in services/price_tensor.py.
 """
 
 # ── REAL MSP PROGRESSION (₹/quintal) from GOI CACP notifications ──
@@ -134,28 +136,42 @@ def get_historical_price(crop: str, year: int) -> float:
     return 0
 
 
+_tensor = None
+
+
+def _price_tensor():
+    """The compiled price tensor, resolved once (a per-call import costs more than the lookup)."""
+    global _tensor
+    if _tensor is None:
+        from services.price_tensor import get_price_tensor
+        _tensor = get_price_tensor()
+    return _tensor
+
+
 def get_monthly_price(crop: str, year: int, month: int) -> float:
     """Get the price for a specific crop/year/month using real seasonal patterns."""
-    base = get_historical_price(crop, year)
-    if base == 0:
-        return 0
-    seasonal = REAL_SEASONAL.get(crop)
-    if seasonal:
-        return base * seasonal[month - 1]
-    return base
+    return _price_tensor().monthly(crop, year, month)
+
+
+def get_peak_price(crop: str, year: int, months: list) -> float:
+    """Highest monthly price of a crop over the given months (1-12) of a year; 0 if none."""
+    return _price_tensor().peak(crop, year, months)
 
 
 def get_all_monthly_history(crop: str) -> list:
     """Get full 11-year monthly history for a crop (2015-2025)."""
-    records = []
-    for year in range(2015, 2026):
-        for month in range(1, 13):
-            price = get_monthly_price(crop, year, month)
-            if price > 0:
-                records.append({
-                    "year": year, "month": month,
-                    "price": round(price),
-                    "min_price": round(price * 0.88),
-                    "max_price": round(price * 1.12),
-                })
-    return records
+    import numpy as np
+
+    tensor = _price_tensor()
+    prices = tensor.history(crop)
+    year_idx, month_idx = np.nonzero(prices > 0)
+    values = prices[year_idx, month_idx]
+    return [
+        {"year": year, "month": month, "price": price, "min_price": low, "max_price": high}
+        for year, month, price, low, high in zip(
+            (year_idx + tensor.first_year).tolist(), (month_idx + 1).tolist(),
+            np.round(values).astype(np.int64).tolist(),
+            np.round(values * 0.88).astype(np.int64).tolist(),
+            np.round(values * 1.12).astype(np.int64).tolist(),
+        )
+    ]
@@ -3,10 +3,16 @@ SmartAgri AI - Recommendation Service
 Orchestrates the 6-step crop recommendation pipeline.
 """
 import os
+import copy
 import json
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 import joblib
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+
+from services.crop_constraints import CropConstraintMatrix
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data", "raw")
@@ -15,6 +21,7 @@ DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data", "raw")
 with open(os.path.join(DATA_DIR, "crop_encyclopedia.json"), "r", encoding="utf-8") as f:
     CROP_DATABASE = json.load(f)
 CROP_LOOKUP = {c["name"].lower(): c for c in CROP_DATABASE}
+CROP_MATRIX = CropConstraintMatrix(CROP_DATABASE)
 
 
 class RecommendationEngine:
@@ -22,20 +29,56 @@ class RecommendationEngine:
 
     def __init__(self, model_dir: str):
         self.model_dir = model_dir
-        self.crop_model = None
-        self.label_encoder = None
-        self.scaler = None
+        # (serving backend — compiled forest or sklearn, original estimator as loaded
+        # from joblib, label_encoder, scaler); replaced as one tuple so a reload never
+        # pairs a new model with an old scaler
+        self._models: Optional[tuple] = None
         self._load_models()
 
     def _load_models(self):
         try:
-            self.crop_model = joblib.load(os.path.join(self.model_dir, "crop_recommender.joblib"))
-            self.label_encoder = joblib.load(os.path.join(self.model_dir, "label_encoder_crop.joblib"))
-            self.scaler = joblib.load(os.path.join(self.model_dir, "scaler_crop.joblib"))
-            print("✅ ML models loaded successfully")
+            sklearn_model = joblib.load(os.path.join(self.model_dir, "crop_recommender.joblib"))
+            label_encoder = joblib.load(os.path.join(self.model_dir, "label_encoder_crop.joblib"))
+            scaler = joblib.load(os.path.join(self.model_dir, "scaler_crop.joblib"))
+            crop_model = self._select_backend(sklearn_model)
         except Exception as e:
-            print(f"⚠ ML models not found, using rule-based fallback: {e}")
-            self.crop_model = None
+            if self._models is None:
+                print(f"⚠ ML models not found, using rule-based fallback: {e}")
+            else:
+                print(f"⚠ ML model reload failed, keeping the loaded models: {e}")
+            return
+        self._models = (crop_model, sklearn_model, label_encoder, scaler)
+        print("✅ ML models loaded successfully")
+
+    @property
+    def crop_model(self):
+        return self._models[0] if self._models else None
+
+    @property
+    def sklearn_model(self):
+        return self._models[1] if self._models else None
+
+    @property
+    def label_encoder(self):
+        return self._models[2] if self._models else None
+
+    @property
+    def scaler(self):
+        return self._models[3] if self._models else None
+
+    @staticmethod
+    def _select_backend(model):
+        """Serve the forest via CROP_MODEL_BACKEND (compiled node arrays, or sklearn as-is)."""
+        from config import get_settings
+        if get_settings().CROP_MODEL_BACKEND != "compiled":
+            return model
+        from services.forest_predictor import compile_classifier
+        # Parity gate on rows spanning the standardized feature space
+        check_rows = np.random.default_rng(0).normal(0.0, 1.5, size=(256, model.n_features_in_))
+        compiled = compile_classifier(model, check_rows=check_rows)
+        if compiled is not model:
+            print(f"✅ Crop model compiled ({compiled.nbytes / 1e6:.1f} MB node arrays)")
+        return compiled
 
     def get_recommendation(self, params: dict) -> dict:
         """Run full 6-step pipeline and return structured recommendation."""
@@ -44,14 +87,60 @@ class RecommendationEngine:
         state = params["state"]
         season = weather["season"]
         irrigation = params.get("irrigation_type", "Rainfed")
-        land_size = params.get("land_size_acres", 1.0)
 
         # Step 1: Crop Suitability Filtering
         suitable_crops = self._filter_crops(soil, weather, season, irrigation)
 
         # Step 2: ML-based scoring (if model available)
-        if self.crop_model and self.scaler:
-            ml_scores = self._ml_predict(soil, weather)
+        ml_scores = self._ml_predict(soil, weather) if self._models else None
+        return self._rank_and_enrich(params, suitable_crops, ml_scores)
+
+    def get_recommendations_bulk(self, plots: List[dict]) -> List[dict]:
+        """
+        Same pipeline for many plots (cooperative / FPO onboarding): one
+        vectorized suitability pass over plots × crops, ONE scaler +
+        predict_proba call on the whole feature matrix, and one yield / price
+        model batch over the distinct top crops of all plots.
+        """
+        if not plots:
+            return []
+        suitable = CROP_MATRIX.filter_many([
+            (p["soil"], p["weather"], p["weather"]["season"], p.get("irrigation_type", "Rainfed"))
+            for p in plots
+        ])
+        if self._models:
+            ml_scores = self._ml_predict_bulk([p["soil"] for p in plots], [p["weather"] for p in plots])
+        else:
+            ml_scores = [None] * len(plots)
+        tops = [self._rank(p, s, m) for p, s, m in zip(plots, suitable, ml_scores)]
+
+        # One yield and one price batch for every distinct (crop, state, season) across all plots
+        yield_keys = list(dict.fromkeys(
+            (c["name"], p["state"], p["weather"]["season"]) for p, top in zip(plots, tops) for c in top))
+        price_keys = list(dict.fromkeys((crop, state) for crop, state, _ in yield_keys))
+        yields = dict(zip(yield_keys, self._estimate_yields_many(yield_keys)))
+        prices = dict(zip(price_keys, self._estimate_prices_many(price_keys)))
+        return [
+            self._enrich(p, top,
+                         [yields[(c["name"], p["state"], p["weather"]["season"])] for c in top],
+                         [prices[(c["name"], p["state"])] for c in top])
+            for p, top in zip(plots, tops)
+        ]
+
+    def _rank_and_enrich(self, params: dict, suitable_crops: List[dict],
+                         ml_scores: Optional[Dict[str, float]]) -> dict:
+        """Steps 2-6 for one plot, given its filtered crops and ML class probabilities."""
+        top_3 = self._rank(params, suitable_crops, ml_scores)
+        # Steps 2-3: yield and market evaluation — one batched call per model for all three crops
+        names = [c["name"] for c in top_3]
+        yields = self._estimate_yields(names, params["state"], params["weather"]["season"])
+        prices = self._estimate_prices(names, params["state"])
+        return self._enrich(params, top_3, yields, prices)
+
+    def _rank(self, params: dict, suitable_crops: List[dict],
+              ml_scores: Optional[Dict[str, float]]) -> List[dict]:
+        """Blend ML probabilities into the filtered crops; the top three (or the season fallback)."""
+        if ml_scores is not None:
             for crop_info in suitable_crops:
                 name_lower = crop_info["name"].lower()
                 if name_lower in ml_scores:
@@ -67,21 +156,27 @@ class RecommendationEngine:
         top_3 = suitable_crops[:3]
 
         if not top_3:
-            top_3 = self._fallback_recommendations(season)
+            top_3 = self._fallback_recommendations(params["weather"]["season"])
+        return top_3
+
+    def _enrich(self, params: dict, top_3: List[dict], yields: List[float], prices: List[float]) -> dict:
+        """Steps 3-6 for one plot's top crops, given their base yields and prices."""
+        soil = params["soil"]
+        weather = params["weather"]
+        state = params["state"]
+        season = weather["season"]
+        irrigation = params.get("irrigation_type", "Rainfed")
+        land_size = params.get("land_size_acres", 1.0)
 
         # Step 3-6: Enrich each crop
         crop_results = []
-        for rank, crop_info in enumerate(top_3, 1):
+        for rank, (crop_info, base_yield, price) in enumerate(zip(top_3, yields, prices), 1):
             crop_name = crop_info["name"]
             db_crop = CROP_LOOKUP.get(crop_name.lower(), {})
 
-            # Step 2: Yield estimation
-            base_yield = self._estimate_yield(crop_name, state, season)
+            # Step 2: Yield adjustment
             yield_adj = self._adjust_yield(base_yield, soil, weather, db_crop)
 
-            # Step 3: Market evaluation
-            price = self._estimate_price(crop_name)
-
             # Step 4: Risk scoring
             risk = self._calculate_risk(crop_name, weather, irrigation, db_crop)
 
@@ -103,7 +198,7 @@ class RecommendationEngine:
             })
 
         # Market insight (based on top crop)
-        market_insight = self._generate_market_insight(top_3[0]["name"], season)
+        market_insight = self._generate_market_insight(top_3[0]["name"], season, prices[0])
 
         # Overall risk assessment
         risk_assessment = self._generate_risk_assessment(weather, irrigation, season)
@@ -122,65 +217,7 @@ class RecommendationEngine:
 
     def _filter_crops(self, soil: dict, weather: dict, season: str, irrigation: str) -> List[dict]:
         """Step 1: Filter crops based on soil, weather, season compatibility."""
-        suitable = []
-        for crop in CROP_DATABASE:
-            score = 0.0
-            checks_passed = 0
-            total_checks = 5
-
-            # Season check
-            if season in crop.get("seasons", []):
-                checks_passed += 1
-                score += 0.2
-
-            # Irrigation check
-            if irrigation in crop.get("irrigation_types", []):
-                checks_passed += 1
-                score += 0.15
-
-            # Soil type check
-            soil_type = soil.get("soil_type", "Loamy")
-            if soil_type in crop.get("soil_types", []):
-                checks_passed += 1
-                score += 0.15
-
-            # NPK compatibility
-            n, p, k = soil["N"], soil["P"], soil["K"]
-            n_ok = crop.get("min_n", 0) <= n <= crop.get("max_n", 200)
-            p_ok = crop.get("min_p", 0) <= p <= crop.get("max_p", 200)
-            k_ok = crop.get("min_k", 0) <= k <= crop.get("max_k", 300)
-            npk_score = sum([n_ok, p_ok, k_ok]) / 3
-            score += npk_score * 0.25
-            if npk_score >= 0.66:
-                checks_passed += 1
-
-            # pH compatibility
-            ph = soil["ph"]
-            if crop.get("min_ph", 4) <= ph <= crop.get("max_ph", 9):
-                checks_passed += 1
-                score += 0.1
-            else:
-                ph_dist = min(abs(ph - crop.get("min_ph", 4)), abs(ph - crop.get("max_ph", 9)))
-                score += max(0, 0.1 - ph_dist * 0.05)
-
-            # Temperature bonus
-            temp = weather.get("temperature", 25)
-            if crop.get("min_temp", 10) <= temp <= crop.get("max_temp", 40):
-                score += 0.1
-
-            # Rainfall bonus
-            rain = weather.get("rainfall", 100)
-            if crop.get("min_rainfall", 0) <= rain <= crop.get("max_rainfall", 400):
-                score += 0.05
-
-            if checks_passed >= 3 and score >= 0.4:
-                suitable.append({
-                    "name": crop["name"],
-                    "suitability_score": min(score, 1.0),
-                    "checks_passed": checks_passed,
-                })
-
-        return suitable
+        return CROP_MATRIX.filter(soil, weather, season, irrigation)
 
     def _ml_predict(self, soil: dict, weather: dict) -> Dict[str, float]:
         """Use ML model to get probability scores for each crop."""
@@ -189,17 +226,48 @@ class RecommendationEngine:
             weather["temperature"], weather["humidity"],
             soil["ph"], weather["rainfall"]
         ]])
-        features_scaled = self.scaler.transform(features)
-        probas = self.crop_model.predict_proba(features_scaled)[0]
-        classes = self.label_encoder.classes_
+        crop_model, _, label_encoder, scaler = self._models
+        features_scaled = scaler.transform(features)
+        probas = crop_model.predict_proba(features_scaled)[0]
+        classes = label_encoder.classes_
 
         scores = {}
         for cls, prob in zip(classes, probas):
             scores[cls.lower()] = float(prob)
         return scores
 
+    def _ml_predict_bulk(self, soils: List[dict], weathers: List[dict]) -> List[Dict[str, float]]:
+        """_ml_predict for many plots: scale + predict_proba the whole matrix at once."""
+        features = np.array([
+            [s["N"], s["P"], s["K"], w["temperature"], w["humidity"], s["ph"], w["rainfall"]]
+            for s, w in zip(soils, weathers)
+        ], dtype=np.float64)
+        crop_model, _, label_encoder, scaler = self._models
+        probas = crop_model.predict_proba(scaler.transform(features))
+        classes = [cls.lower() for cls in label_encoder.classes_]
+        return [dict(zip(classes, row)) for row in probas.tolist()]
+
     def _estimate_yield(self, crop: str, state: str, season: str) -> float:
         """Step 2: Estimate yield based on region and crop."""
+        return self._estimate_yields([crop], state, season)[0]
+
+    def _estimate_yields(self, crops: List[str], state: str, season: str) -> List[float]:
+        """
+        Yield (tonnes / hectare) for several crops in one state and season:
+        the trained yield model (services/yield_prediction_service.py) in one
+        batch, the reference table for crops it does not cover.
+        """
+        return self._estimate_yields_many([(c, state, season) for c in crops])
+
+    def _estimate_yields_many(self, keys: List[tuple]) -> List[float]:
+        """_estimate_yields for arbitrary (crop, state, season) keys in one model batch."""
+        from services.yield_prediction_service import get_yield_predictor
+        predicted = get_yield_predictor(self.model_dir).predict_many(keys)
+        return [y if y is not None else self._table_yield(k[0]) for k, y in zip(keys, predicted)]
+
+    @staticmethod
+    def _table_yield(crop: str) -> float:
+        """Reference yield (tonnes / hectare) when the yield model has no answer."""
         yield_map = {
             "rice": 3.0, "wheat": 3.5, "maize": 2.5, "cotton": 1.5,
             "sugarcane": 70.0, "soybean": 1.2, "chickpea": 1.0,
@@ -246,8 +314,28 @@ class RecommendationEngine:
 
         return round(base_yield * adj, 2)
 
-    def _estimate_price(self, crop: str) -> float:
+    def _estimate_price(self, crop: str, state: Optional[str] = None) -> float:
         """Step 3: Estimate selling price per quintal."""
+        return self._estimate_prices([crop], state)[0]
+
+    def _estimate_prices(self, crops: List[str], state: Optional[str] = None) -> List[float]:
+        """
+        This month's price per quintal for several crops: the trained price
+        model (services/price_forecast_service.py) in one batch, the
+        reference table for crops it does not cover.
+        """
+        return self._estimate_prices_many([(c, state) for c in crops])
+
+    def _estimate_prices_many(self, keys: List[tuple]) -> List[float]:
+        """_estimate_prices for arbitrary (crop, state) keys in one model batch."""
+        from services.price_forecast_service import get_price_forecaster
+        month = time.localtime().tm_mon
+        forecasts = get_price_forecaster(self.model_dir).predict_many([(c, st, month) for c, st in keys])
+        return [f if f is not None else self._table_price(k[0]) for k, f in zip(keys, forecasts)]
+
+    @staticmethod
+    def _table_price(crop: str) -> float:
+        """Reference price per quintal when the price model has no answer."""
         price_map = {
             "rice": 2200, "wheat": 2350, "maize": 2000, "cotton": 6300,
             "sugarcane": 345, "soybean": 4600, "chickpea": 5100,
@@ -331,8 +419,10 @@ class RecommendationEngine:
 
         return ". ".join(reasons) if reasons else f"{crop} is a suitable crop for your conditions"
 
-    def _generate_market_insight(self, crop: str, season: str) -> dict:
+    def _generate_market_insight(self, crop: str, season: str, price: Optional[float] = None) -> dict:
         """Generate market insight for the top recommended crop."""
+        if price is None:
+            price = self._estimate_price(crop)
         trends = {
             "rice": ("Stable with slight upward trend", "Strong", "Oct-Dec"),
             "wheat": ("Rising due to winter demand", "High", "Mar-May"),
@@ -351,14 +441,14 @@ class RecommendationEngine:
                 "demand_outlook": t[1],
                 "best_selling_window": t[2],
                 "volatility_level": "Low" if t[1] == "Strong" else "Medium",
-                "price_range": f"₹{self._estimate_price(crop) * 0.9:,.0f} - ₹{self._estimate_price(crop) * 1.1:,.0f}/quintal",
+                "price_range": f"₹{price * 0.9:,.0f} - ₹{price * 1.1:,.0f}/quintal",
             }
         return {
             "current_trend": "Stable market conditions",
             "demand_outlook": "Moderate",
             "best_selling_window": "Post-harvest peak demand",
             "volatility_level": "Medium",
-            "price_range": f"₹{self._estimate_price(crop) * 0.9:,.0f} - ₹{self._estimate_price(crop) * 1.1:,.0f}/quintal",
+            "price_range": f"₹{price * 0.9:,.0f} - ₹{price * 1.1:,.0f}/quintal",
         }
 
     def _generate_risk_assessment(self, weather: dict, irrigation: str, season: str) -> dict:
@@ -494,3 +584,230 @@ def get_engine(model_dir: str) -> RecommendationEngine:
     if _engine_instance is None:
         _engine_instance = RecommendationEngine(model_dir)
     return _engine_instance
+
+
+def register_models(manager, model_dir: str):
+    """Register the crop RandomForest with the model lifecycle manager."""
+    def _load():
+        engine = get_engine(model_dir)
+        if engine.crop_model is None or engine.scaler is None:
+            raise RuntimeError(f"crop_recommender.joblib not found in {model_dir}")
+        return engine
+
+    def _warmup(engine: RecommendationEngine):
+        # First predict_proba allocates the tree-traversal buffers
+        engine._ml_predict(
+            {"N": 90, "P": 42, "K": 43, "ph": 6.5},
+            {"temperature": 25.0, "humidity": 80.0, "rainfall": 200.0},
+        )
+
+    manager.register("crop_recommender", _load, warmup=_warmup,
+                     description="RandomForest crop classifier")
+
+
+# ─── Recommendation result cache ──────────────────────────
+# Keyed on the normalized parameter tuple. Numeric inputs are snapped to
+# configurable buckets for the KEY only; the pipeline runs on the request's own
+# values, so a miss is exact and a hit returns the answer for a neighbouring
+# input in the same bucket. watch_model_artifacts() reloads the models and
+# clears the cache when MODEL_DIR changes, off the request path.
+_CACHE_FIELDS = [("soil", "N"), ("soil", "P"), ("soil", "K"), ("soil", "ph"),
+                 ("weather", "temperature"), ("weather", "humidity"), ("weather", "rainfall")]
+_ARTIFACT_SUFFIXES = (".joblib", ".pkl", ".npy", ".npz", ".json")
+
+
+def _parse_buckets(spec: str) -> Dict[str, float]:
+    """"N=5,P=5,ph=0.1" → {"N": 5.0, "P": 5.0, "ph": 0.1} (missing / 0 = exact)."""
+    buckets = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, step = part.split("=", 1)
+            buckets[name.strip()] = float(step)
+    return buckets
+
+
+class RecommendationCache:
+    """TTL + LRU memo of recommendation results, invalidated when MODEL_DIR artifacts change."""
+
+    def __init__(self, max_entries: int, ttl_s: float, buckets: Dict[str, float], model_dir: str):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.buckets = buckets
+        self.model_dir = model_dir
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = self._artifact_fingerprint()
+        self.generation = 0     # bumped on every clear; put() drops results computed before one
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    # ── Normalization ─────────────────────────────────────
+    def _snap(self, name: str, value: float) -> float:
+        step = self.buckets.get(name)
+        if not step:
+            return value
+        return round(round(value / step) * step, 6)
+
+    def normalize(self, params: dict) -> dict:
+        """Copy of params with soil / weather numbers snapped to their buckets (for key_for)."""
+        out = dict(params)
+        out["soil"] = dict(params["soil"])
+        out["weather"] = dict(params["weather"])
+        for group, name in _CACHE_FIELDS:
+            if out[group].get(name) is not None:
+                out[group][name] = self._snap(name, float(out[group][name]))
+        return out
+
+    @staticmethod
+    def key_for(kind: str, params: dict, *extra) -> tuple:
+        """(kind, state, season, irrigation, soil type, N, P, K, pH, temp, humidity, rain, *extra)."""
+        return (
+            kind,
+            (params.get("state") or "").strip().lower(),
+            params["weather"].get("season"),
+            params.get("irrigation_type", "Rainfed"),
+            params["soil"].get("soil_type", "Loamy"),
+            *(params[group].get(name) for group, name in _CACHE_FIELDS),
+            *extra,
+        )
+
+    # ── Invalidation ──────────────────────────────────────
+    def _artifact_fingerprint(self) -> tuple:
+        try:
+            names = sorted(n for n in os.listdir(self.model_dir) if n.endswith(_ARTIFACT_SUFFIXES))
+        except OSError:
+            return ()
+        fp = []
+        for n in names:
+            try:
+                st = os.stat(os.path.join(self.model_dir, n))
+                fp.append((n, st.st_mtime_ns, st.st_size))
+            except OSError:
+                continue
+        return tuple(fp)
+
+    def check_artifacts(self, reload: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Re-stat MODEL_DIR; if anything changed, run reload() and then clear the
+        cache. A result computed before the clear carries the old generation
+        and is dropped by put(). Returns True if the artifacts changed.
+        """
+        fp = self._artifact_fingerprint()
+        if fp == self._fingerprint:
+            return False
+        if reload is not None:
+            reload()
+        with self._lock:
+            self._fingerprint = fp
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+        print(f"♻️  Model artifacts changed in {self.model_dir} — recommendation cache cleared")
+        return True
+
+    # ── Lookup / store ────────────────────────────────────
+    def get(self, key: tuple):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: tuple, value, generation: Optional[int] = None):
+        """Store value, unless it was computed under an older cache `generation`."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_s, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.max_entries > 0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "buckets": self.buckets,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "artifacts_tracked": len(self._fingerprint),
+        }
+
+
+_rec_cache: Optional[RecommendationCache] = None
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    global _rec_cache
+    if _rec_cache is None:
+        from config import get_settings
+        settings = get_settings()
+        _rec_cache = RecommendationCache(
+            max_entries=settings.RECOMMEND_CACHE_SIZE,
+            ttl_s=settings.RECOMMEND_CACHE_TTL_S,
+            buckets=_parse_buckets(settings.RECOMMEND_CACHE_BUCKETS),
+            model_dir=settings.MODEL_DIR,
+        )
+    return _rec_cache
+
+
+def cached_recommendation(kind: str, params: dict, compute, *extra):
+    """
+    Memoized compute(params) for a recommendation-style endpoint, keyed on the
+    bucketed inputs. `extra` adds inputs outside the standard tuple (e.g.
+    crop, land size).
+    """
+    cache = get_recommendation_cache()
+    if cache.max_entries <= 0:
+        return compute(params)
+    key = cache.key_for(kind, cache.normalize(params), *extra)
+    result = cache.get(key)
+    if result is None:
+        generation = cache.generation
+        result = compute(params)
+        cache.put(key, result, generation)
+    return result
+
+
+def _reload_models():
+    """Reload the engine, price forecaster and yield predictor from MODEL_DIR."""
+    if _engine_instance is not None:
+        _engine_instance._load_models()
+    from services import price_forecast_service, yield_prediction_service
+    if price_forecast_service._forecaster is not None:
+        price_forecast_service._forecaster._load_models()
+    if yield_prediction_service._predictor is not None:
+        yield_prediction_service._predictor._load_models()
+
+
+async def watch_model_artifacts(interval_s: float):
+    """Background task: when MODEL_DIR artifacts change, reload the models, then clear the cache."""
+    import asyncio
+    cache = get_recommendation_cache()
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await asyncio.to_thread(cache.check_artifacts, _reload_models)
+        except Exception as e:
+            print(f"⚠ Model artifact reload failed: {e}")
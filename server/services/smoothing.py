@@ -0,0 +1,150 @@
+"""
+SmartAgri AI - Vectorized Exponential Smoothing
+Holt (double) and Holt-Winters (triple) exponential smoothing written as
+NumPy recurrences over the last axis, so every series in a tensor — e.g.
+crop × harvest_month × year — is smoothed in one pass of T steps instead of
+one Python loop per series.
+
+  holt          : level + trend; same arithmetic, step for step, as the
+                  original single-series forecast (kept as the reference
+                  in benchmarks/smoothing.py; results are bit-identical)
+  holt_winters  : level + trend + multiplicative / additive season of a
+                  fixed period (monthly series → period 12)
+  fit_holt      : per-series alpha / beta by grid search on the one-step
+                  forecast error, all grid points evaluated at once; fits
+                  are cached by tensor contents
+
+Missing observations are NaN. Holt skips them the way the scalar version
+sees only the years that have a price (values are packed to the front of
+each series); Holt-Winters needs dense series and returns NaN otherwise.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+import numpy as np
+
+GRID = tuple(round(0.1 * i, 1) for i in range(1, 10))   # 0.1 … 0.9
+_FIT_CACHE_SIZE = 32
+_fit_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def _pack(series: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Move each series' non-NaN values to the front (order kept); returns (packed, lengths)."""
+    missing = np.isnan(series)
+    order = np.argsort(missing, axis=-1, kind="stable")
+    return np.take_along_axis(series, order, axis=-1), (~missing).sum(axis=-1)
+
+
+def holt(series, alpha=0.4, beta=0.2, steps: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Holt's double exponential smoothing of every series along the last axis.
+    `alpha` / `beta` are scalars or arrays broadcastable to series.shape[:-1].
+    Returns (forecast `steps` ahead, final trend, mean one-step error %).
+    Series with < 2 observations give (last value or 0, 0, 15.0).
+    """
+    x, n = _pack(np.asarray(series, dtype=np.float64))
+    alpha = np.asarray(alpha, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    shape = np.broadcast_shapes(x.shape[:-1], alpha.shape, beta.shape)
+    x = np.broadcast_to(x, shape + x.shape[-1:])
+    n = np.broadcast_to(n, shape)
+
+    first = x[..., 0]
+    last = np.take_along_axis(x, np.maximum(n - 1, 0)[..., None], axis=-1)[..., 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        level = first.copy()
+        trend = np.where(n > 1, (last - first) / np.maximum(n - 1, 1), 0.0)
+        err_sum = np.zeros(shape)
+        err_count = np.zeros(shape, dtype=np.int64)
+        for t in range(1, x.shape[-1]):
+            actual = x[..., t]
+            active = t < n
+            new_level = alpha * actual + (1 - alpha) * (level + trend)
+            new_trend = beta * (new_level - level) + (1 - beta) * trend
+            forecast = level + new_trend
+            scored = active & (actual > 0)
+            err_sum = np.where(scored, err_sum + np.abs(actual - forecast) / actual * 100, err_sum)
+            err_count += scored
+            level = np.where(active, new_level, level)
+            trend = np.where(active, new_trend, trend)
+
+        prediction = level + trend * steps
+        error = np.where(err_count > 0, err_sum / np.maximum(err_count, 1), 10.0)
+
+    short = n < 2
+    prediction = np.where(short, np.where(n == 1, first, 0.0), prediction)
+    trend = np.where(short, 0.0, trend)
+    error = np.where(short, 15.0, error)
+    return prediction, trend, error
+
+
+def holt_winters(series, period: int = 12, alpha=0.3, beta=0.1, gamma=0.3,
+                 steps: int = 1, multiplicative: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Holt-Winters triple exponential smoothing along the last axis (needs at
+    least two full periods). Initial level / trend / season come from the
+    first two periods. Returns (forecasts 1..steps ahead as [..., steps],
+    mean one-step error %).
+    """
+    x = np.asarray(series, dtype=np.float64)
+    if x.shape[-1] < 2 * period:
+        raise ValueError(f"Holt-Winters needs at least {2 * period} observations, got {x.shape[-1]}")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        first, second = x[..., :period].mean(axis=-1), x[..., period:2 * period].mean(axis=-1)
+        level = first
+        trend = (second - first) / period
+        season = x[..., :period] / first[..., None] if multiplicative else x[..., :period] - first[..., None]
+        season = season.copy()
+        err_sum = np.zeros(level.shape)
+        err_count = np.zeros(level.shape, dtype=np.int64)
+
+        for t in range(x.shape[-1]):
+            actual = x[..., t]
+            s = season[..., t % period]
+            if multiplicative:
+                forecast = (level + trend) * s
+                new_level = alpha * actual / s + (1 - alpha) * (level + trend)
+            else:
+                forecast = level + trend + s
+                new_level = alpha * (actual - s) + (1 - alpha) * (level + trend)
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            season[..., t % period] = (gamma * actual / new_level + (1 - gamma) * s if multiplicative
+                                       else gamma * (actual - new_level) + (1 - gamma) * s)
+            level = new_level
+            scored = actual > 0
+            err_sum = np.where(scored, err_sum + np.abs(actual - forecast) / actual * 100, err_sum)
+            err_count += scored
+
+        h = np.arange(1, steps + 1)
+        idx = (x.shape[-1] + h - 1) % period
+        base = level[..., None] + trend[..., None] * h
+        forecasts = base * season[..., idx] if multiplicative else base + season[..., idx]
+        error = np.where(err_count > 0, err_sum / np.maximum(err_count, 1), np.nan)
+    return forecasts, error
+
+
+def fit_holt(series, alphas: Sequence[float] = GRID,
+             betas: Sequence[float] = GRID) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Best (alpha, beta) per series by grid search on the mean one-step error %
+    — every grid point is one extra leading axis of the same holt() pass.
+    Returns (alpha, beta, error) shaped like series.shape[:-1]; cached.
+    """
+    x = np.ascontiguousarray(series, dtype=np.float64)
+    key = (hashlib.sha1(x.tobytes()).hexdigest(), x.shape, tuple(alphas), tuple(betas))
+    if key in _fit_cache:
+        _fit_cache.move_to_end(key)
+        return _fit_cache[key]
+
+    a, b = np.meshgrid(np.asarray(alphas, dtype=np.float64), np.asarray(betas, dtype=np.float64), indexing="ij")
+    a, b = a.ravel(), b.ravel()
+    grid_shape = (len(a),) + (1,) * (x.ndim - 1)
+    _, _, error = holt(x[None], a.reshape(grid_shape), b.reshape(grid_shape))
+    best = np.argmin(error, axis=0)
+    fit = (a[best], b[best], np.take_along_axis(error, best[None], axis=0)[0])
+
+    _fit_cache[key] = fit
+    if len(_fit_cache) > _FIT_CACHE_SIZE:
+        _fit_cache.popitem(last=False)
+    return fit
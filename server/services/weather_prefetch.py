@@ -0,0 +1,140 @@
+"""
+SmartAgri AI - Weather Prefetch Scheduler
+Keeps the weather store warm so request handlers never wait on OpenWeatherMap.
+
+Every WEATHER_PREFETCH_INTERVAL_S the scheduler refreshes current + forecast
+weather for the grid cell (see WeatherService.resolve) of:
+  • every state capital in STATE_COORDS
+  • the district of every registered user that has DISTRICT_COORDS
+  • every farm with latitude/longitude
+Only entries that would expire before the next tick are refetched, so each
+location costs one current call per WEATHER_CURRENT_TTL_S and one forecast
+call per WEATHER_FORECAST_TTL_S. While it runs, WeatherService is switched to
+store-only reads. These cells are pinned in the service's cache; any other
+cell is refreshed only when a request finds it expired, and is dropped once
+unrequested for WEATHER_CELL_EXPIRY_TTLS forecast TTLs.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config import get_settings
+from services.weather_service import STATE_COORDS, WeatherService, get_weather_service
+
+logger = logging.getLogger("weather_prefetch")
+
+
+class WeatherPrefetcher:
+    """Background task refreshing every known farming location on a fixed cadence."""
+
+    def __init__(self, service: Optional[WeatherService] = None,
+                 interval_s: Optional[float] = None, concurrency: Optional[int] = None):
+        settings = get_settings()
+        self.service = service or get_weather_service()
+        self.interval_s = settings.WEATHER_PREFETCH_INTERVAL_S if interval_s is None else interval_s
+        self.concurrency = max(1, settings.WEATHER_PREFETCH_CONCURRENCY if concurrency is None else concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"rounds": 0, "refreshes": 0, "locations": 0,
+                       "last_round_s": 0.0, "last_round_at": None}
+
+    def start(self) -> bool:
+        """Start the refresh loop (no-op without an API key — there is nothing to fetch)."""
+        if self._task is not None:
+            return True
+        if not self.service._has_key:
+            print("  ⚠️  Weather prefetch disabled — no OpenWeatherMap API key")
+            return False
+        self.service.store_only = True
+        self._task = asyncio.create_task(self._loop())
+        print(f"  🌦️  Weather prefetch every {self.interval_s}s")
+        return True
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.service.store_only = False
+        self.service.pin(())
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Weather prefetch round failed: {e}")
+            await asyncio.sleep(self.interval_s)
+
+    async def run_once(self) -> dict:
+        """One refresh round over every location; returns the round's counters."""
+        started = time.perf_counter()
+        locations = await self.locations()
+        self.service.pin((c["lat"], c["lon"]) for c in locations)
+        self.service.expire()
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(coords: dict) -> int:
+            async with sem:
+                return await self.service.prefetch(coords, lead_s=self.interval_s)
+
+        refreshed = sum(await asyncio.gather(*[refresh(c) for c in locations]))
+        elapsed = time.perf_counter() - started
+        self._stats["rounds"] += 1
+        self._stats["refreshes"] += refreshed
+        self._stats["locations"] = len(locations)
+        self._stats["last_round_s"] = round(elapsed, 3)
+        self._stats["last_round_at"] = time.time()
+        return {"locations": len(locations), "refreshed": refreshed, "elapsed_s": round(elapsed, 3)}
+
+    async def locations(self) -> List[dict]:
+        """Cells of state capitals, user districts and farms."""
+        resolve = self.service.resolve
+        unique: Dict[tuple, dict] = {}
+        for coords in [*[resolve(state) for state in STATE_COORDS], *await self._user_locations()]:
+            unique.setdefault((coords["lat"], coords["lon"]), coords)
+        return list(unique.values())
+
+    async def _user_locations(self) -> List[dict]:
+        from sqlalchemy import select
+        from database import async_session
+        from db_models import Farm, User
+
+        try:
+            async with async_session() as db:
+                districts = (await db.execute(
+                    select(User.state, User.district).where(User.district.isnot(None)).distinct()
+                )).all()
+                farms = (await db.execute(
+                    select(Farm.latitude, Farm.longitude)
+                    .where(Farm.latitude.isnot(None), Farm.longitude.isnot(None)).distinct()
+                )).all()
+        except Exception as e:
+            logger.warning(f"Could not load user locations for weather prefetch: {e}")
+            return []
+        resolve = self.service.resolve
+        return ([resolve(state or "", district) for state, district in districts]
+                + [resolve("", "", lat, lon) for lat, lon in farms])
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def stats(self) -> dict:
+        return {**self._stats, "running": self.running, "interval_s": self.interval_s}
+
+
+_prefetcher: Optional[WeatherPrefetcher] = None
+
+
+def get_weather_prefetcher() -> WeatherPrefetcher:
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = WeatherPrefetcher()
+    return _prefetcher
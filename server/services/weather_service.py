@@ -1,12 +1,40 @@
 """
 SmartAgri AI - Weather Service
 Fetches real weather from OpenWeatherMap API with fallback to simulated data.
+
+Upstream calls are async over one shared httpx.AsyncClient (pooled
+keep-alive connections) and cached per location — current conditions for
+WEATHER_CURRENT_TTL_S, forecasts for WEATHER_FORECAST_TTL_S. Concurrent
+requests for the same location share a single upstream call, and if
+OpenWeatherMap fails, the last good response (up to WEATHER_STALE_MAX_S old)
+is served with "stale": true before falling back to simulated data.
+
+Locations are snapped to a WEATHER_GRID_DEG lat/lon grid (0.25° ≈ 28 km):
+a farm's coordinates, its district (DISTRICT_COORDS) or, failing both, the
+state capital resolves to a grid cell, and the cache is keyed on the cell
+centre — every farmer in a cell shares one upstream fetch.
+
+While the prefetch scheduler (services/weather_prefetch.py) is running the
+service is in store-only mode: handlers read the cache and never wait on the
+upstream. A location outside the prefetched set gets simulated data once and
+is fetched in the background, then refreshed the same way whenever a request
+finds it expired.
+
+Cells the prefetcher does not pin are forgotten — tracking and cached entries
+— once nobody has requested them for WEATHER_CELL_EXPIRY_TTLS forecast TTLs,
+so the cache stays bounded by the prefetched set plus recently used cells.
 """
+import asyncio
+import math
 import random
+import time
 import httpx
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 from config import get_settings
+from services.geo_data import DISTRICT_COORDS
+
+CELL_POINT_SAMPLE = 32     # distinct input points remembered per grid cell (for stats only)
 
 # City coordinates for Indian states (state capitals)
 STATE_COORDS = {
@@ -46,14 +74,46 @@ REGIONAL_WEATHER = {
     "Odisha":           {"Kharif": {"temp": 30, "humidity": 82, "rainfall": 260}, "Rabi": {"temp": 21, "humidity": 55, "rainfall": 15}},
 }
 
-OWM_BASE = "https://api.openweathermap.org/data/2.5"
+def grid_cell(lat: float, lon: float, deg: float) -> tuple:
+    """Integer (row, col) of the deg×deg grid cell containing a point."""
+    return math.floor(lat / deg), math.floor(lon / deg)
 
 
 class WeatherService:
     """Weather data service — real OpenWeatherMap data with simulated fallback."""
 
-    def __init__(self):
-        self.api_key = get_settings().OPENWEATHER_API_KEY
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        settings = get_settings()
+        self.api_key = settings.OPENWEATHER_API_KEY if api_key is None else api_key
+        self.base_url = (base_url or settings.OPENWEATHER_BASE_URL).rstrip("/")
+        self.current_ttl = settings.WEATHER_CURRENT_TTL_S
+        self.forecast_ttl = settings.WEATHER_FORECAST_TTL_S
+        self.stale_max = settings.WEATHER_STALE_MAX_S
+        self.cell_expiry_s = settings.WEATHER_CELL_EXPIRY_TTLS * self.forecast_ttl
+        self._timeout = settings.WEATHER_HTTP_TIMEOUT_S
+        self._max_connections = settings.WEATHER_MAX_CONNECTIONS
+        self.grid_deg = settings.WEATHER_GRID_DEG
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # (kind, lat, lon) → (fetched_at monotonic, payload)
+        self._cache: Dict[tuple, tuple] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        # (lat, lon) of a cell centre → monotonic time of its last request; cells the
+        # prefetcher keeps warm are pinned and never expire
+        self._last_requested: Dict[tuple, float] = {}
+        self._pinned: set = set()
+        self._next_expiry = 0.0
+        # cell → lookups resolved to it, and a bounded sample of the distinct input
+        # points (farms, districts, capitals) behind them; cells are bounded by the grid
+        self._cell_lookups: Dict[tuple, int] = {}
+        self._cell_points: Dict[tuple, set] = {}
+        self.store_only = False
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0,
+                       "upstream_errors": 0, "stale_served": 0, "store_misses": 0,
+                       "cells_expired": 0}
+
         self._has_key = bool(self.api_key) and self.api_key != "your-openweathermap-key-here"
         if self._has_key:
             print(f"  ✅ OpenWeatherMap API key configured")
@@ -62,27 +122,35 @@ class WeatherService:
 
     # ── Public API ──────────────────────────────────────
 
-    def get_current(self, state: str, district: str = "") -> Dict:
-        """Current weather (real or fallback)."""
+    async def get_current(self, state: str, district: str = "",
+                          lat: Optional[float] = None, lon: Optional[float] = None) -> Dict:
+        """Current weather (real or fallback) for a farm point, district or state."""
         if self._has_key:
             try:
-                return self._fetch_current(state)
+                data, stale = await self._lookup("current", self.resolve(state, district, lat, lon),
+                                                 self.current_ttl, self._fetch_current)
+                if data is not None:
+                    return {**data, "stale": True} if stale else data
             except Exception as e:
-                print(f"  ⚠️  OpenWeatherMap current failed: {e}, using fallback")
+                print(f"  ⚠️  OpenWeatherMap current failed: {self._redact(e)}, using fallback")
         return self._mock_current(state)
 
-    def get_forecast(self, state: str, days: int = 7) -> List[Dict]:
-        """Multi-day forecast (real or fallback)."""
+    async def get_forecast(self, state: str, days: int = 7, district: str = "",
+                           lat: Optional[float] = None, lon: Optional[float] = None) -> List[Dict]:
+        """Multi-day forecast (real or fallback) for a farm point, district or state."""
         if self._has_key:
             try:
-                return self._fetch_forecast(state, days)
+                data, stale = await self._lookup("forecast", self.resolve(state, district, lat, lon),
+                                                 self.forecast_ttl, self._fetch_forecast)
+                if data is not None:
+                    return [{**d, "stale": True} for d in data[:days]] if stale else data[:days]
             except Exception as e:
-                print(f"  ⚠️  OpenWeatherMap forecast failed: {e}, using fallback")
+                print(f"  ⚠️  OpenWeatherMap forecast failed: {self._redact(e)}, using fallback")
         return self._mock_forecast(state, days)
 
-    def get_impact(self, state: str, season: str, crops: List[str] = None) -> Dict:
+    async def get_impact(self, state: str, season: str, crops: List[str] = None) -> Dict:
         """Analyze weather impact on crops (uses current weather data)."""
-        current = self.get_current(state)
+        current = await self.get_current(state)
         temp = current.get("temperature", 28)
         humidity = current.get("humidity", 70)
         rainfall = current.get("rainfall", 5)
@@ -125,23 +193,217 @@ class WeatherService:
         state_data = REGIONAL_WEATHER.get(state, {})
         return state_data.get(season, state_data.get("Kharif", default))
 
+    # ── Cache + request coalescing ──────────────────────
+
+    async def _lookup(self, kind: str, coords: dict, ttl: float,
+                      fetch: Callable[[dict], Awaitable]) -> tuple:
+        now = time.monotonic()
+        self._last_requested[(coords["lat"], coords["lon"])] = now
+        if now >= self._next_expiry:
+            self.expire(now)
+        if self.store_only:
+            return self._read_store(kind, coords, ttl, fetch)
+        return await self._cached(kind, coords, ttl, fetch)
+
+    def _read_store(self, kind: str, coords: dict, ttl: float,
+                    fetch: Callable[[dict], Awaitable]) -> tuple:
+        """
+        (payload, is_stale) straight from the store — never waits on I/O.
+        (None, False) if the location has not been fetched yet; a background
+        refresh is started so the next request finds it.
+        """
+        key = (kind, coords["lat"], coords["lon"])
+        entry = self._cache.get(key)
+        age = time.monotonic() - entry[0] if entry is not None else None
+        if entry is None or age >= ttl:
+            self._start_refresh(key, coords, fetch)
+        if entry is None or age >= self.stale_max:
+            self._stats["store_misses"] += 1
+            return None, False
+        if age >= ttl:
+            self._stats["stale_served"] += 1
+            return entry[1], True
+        self._stats["hits"] += 1
+        return entry[1], False
+
+    async def prefetch(self, coords: dict, lead_s: float = 0.0) -> int:
+        """
+        Refresh current + forecast for one location if either expires within
+        `lead_s` seconds. Returns the number of upstream refreshes made.
+        """
+        refreshed = 0
+        for kind, ttl, fetch in (("current", self.current_ttl, self._fetch_current),
+                                 ("forecast", self.forecast_ttl, self._fetch_forecast)):
+            key = (kind, coords["lat"], coords["lon"])
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl - lead_s:
+                continue
+            try:
+                await asyncio.shield(self._start_refresh(key, coords, fetch))
+                refreshed += 1
+            except Exception as e:
+                print(f"  ⚠️  Weather prefetch ({kind}, {coords.get('city', key[1:])}) failed: {self._redact(e)}")
+        return refreshed
+
+    def pin(self, cells: Iterable[tuple]) -> None:
+        """Replace the set of (lat, lon) cell centres kept cached regardless of requests."""
+        self._pinned = set(cells)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Forget cells not requested within cell_expiry_s and drop cached entries
+        for every cell that is neither pinned nor recently requested. Runs at
+        most once per current TTL from the request path; returns entries dropped.
+        """
+        now = time.monotonic() if now is None else now
+        self._next_expiry = now + self.current_ttl
+        cutoff = now - self.cell_expiry_s
+        for cell in [c for c, t in self._last_requested.items() if t < cutoff]:
+            del self._last_requested[cell]
+            self._stats["cells_expired"] += 1
+        dead = [key for key in self._cache
+                if key[1:] not in self._pinned and key[1:] not in self._last_requested
+                and key not in self._inflight]
+        for key in dead:
+            del self._cache[key]
+        return len(dead)
+
+    async def _cached(self, kind: str, coords: dict, ttl: float,
+                      fetch: Callable[[dict], Awaitable]) -> tuple:
+        """
+        (payload, is_stale) for one location. Fresh cache → no I/O; otherwise
+        join (or start) the single in-flight upstream call for this key.
+        """
+        key = (kind, coords["lat"], coords["lon"])
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            self._stats["hits"] += 1
+            return entry[1], False
+
+        self._stats["misses"] += 1
+        task = self._start_refresh(key, coords, fetch)
+
+        try:
+            # shield: one caller disconnecting must not cancel the shared fetch
+            return await asyncio.shield(task), False
+        except Exception:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.stale_max:
+                self._stats["stale_served"] += 1
+                return entry[1], True
+            raise
+
+    def _start_refresh(self, key: tuple, coords: dict, fetch: Callable[[dict], Awaitable]) -> asyncio.Task:
+        """The in-flight upstream call for `key`, starting one if there is none."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+            return task
+        task = asyncio.create_task(self._refresh(key, coords, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._refresh_done(k, t))
+        return task
+
+    def _refresh_done(self, key: tuple, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here so background refreshes don't log "never retrieved"
+
+    async def _refresh(self, key: tuple, coords: dict, fetch: Callable[[dict], Awaitable]):
+        self._stats["upstream_calls"] += 1
+        try:
+            payload = await fetch(coords)
+        except Exception:
+            self._stats["upstream_errors"] += 1
+            raise
+        self._cache[key] = (time.monotonic(), payload)
+        return payload
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._max_connections,
+                                    max_keepalive_connections=self._max_connections),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared connection pool (app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _redact(self, err: Exception) -> str:
+        """Error text without the API key (httpx errors include the request URL)."""
+        return str(err).splitlines()[0].replace(self.api_key, "***") if self.api_key else str(err)
+
+    def stats(self) -> dict:
+        cache_lookups = self._stats["hits"] + self._stats["misses"] + self._stats["store_misses"]
+        points = sum(len(p) for p in self._cell_points.values())
+        lookups = sum(self._cell_lookups.values())
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / cache_lookups, 4) if cache_lookups else 0.0,
+            "grid_deg": self.grid_deg,
+            "cells": len(self._cell_lookups),
+            "cells_cached": len({key[1:] for key in self._cache}),
+            "cells_pinned": len(self._pinned),
+            "cells_requested": len(self._last_requested),
+            "points": points,                   # distinct points, at most CELL_POINT_SAMPLE per cell
+            "points_per_cell": round(points / len(self._cell_points), 2) if self._cell_points else 0.0,
+            "lookups_per_cell": round(lookups / len(self._cell_lookups), 2) if self._cell_lookups else 0.0,
+            "cached_entries": len(self._cache),
+            "inflight": len(self._inflight),
+            "store_only": self.store_only,
+        }
+
     # ── Real OpenWeatherMap API ─────────────────────────
 
-    def _get_coords(self, state: str) -> dict:
+    def _get_coords(self, state: str, district: str = "") -> dict:
+        """District coordinates when we have them, else the state capital."""
+        d = DISTRICT_COORDS.get(district) if district else None
+        if d is not None:
+            return {"lat": d["lat"], "lon": d["lng"], "city": district}
         return STATE_COORDS.get(state, {"lat": 22.5, "lon": 82.0, "city": "India"})
 
-    def _fetch_current(self, state: str) -> Dict:
-        coords = self._get_coords(state)
-        url = f"{OWM_BASE}/weather"
+    def resolve(self, state: str, district: str = "",
+                lat: Optional[float] = None, lon: Optional[float] = None) -> dict:
+        """
+        Grid cell for a location: farm point (lat/lon) > district > state
+        capital. Returns the cell centre as coords — the cache/fetch key.
+        """
+        if lat is not None and lon is not None:
+            point = {"lat": lat, "lon": lon, "city": district or state}
+        else:
+            point = self._get_coords(state, district)
+        cell = grid_cell(point["lat"], point["lon"], self.grid_deg)
+        self._cell_lookups[cell] = self._cell_lookups.get(cell, 0) + 1
+        sample = self._cell_points.setdefault(cell, set())
+        if len(sample) < CELL_POINT_SAMPLE:
+            sample.add((round(point["lat"], 4), round(point["lon"], 4)))
+        return {
+            "lat": round((cell[0] + 0.5) * self.grid_deg, 4),
+            "lon": round((cell[1] + 0.5) * self.grid_deg, 4),
+            "city": point.get("city", ""),
+            "cell": cell,
+        }
+
+    async def _get_json(self, path: str, coords: dict) -> dict:
         params = {
             "lat": coords["lat"],
             "lon": coords["lon"],
             "appid": self.api_key,
             "units": "metric",
         }
-        r = httpx.get(url, params=params, timeout=10)
+        r = await self._http().get(path, params=params)
         r.raise_for_status()
-        data = r.json()
+        return r.json()
+
+    async def _fetch_current(self, coords: dict) -> Dict:
+        data = await self._get_json("/weather", coords)
 
         main = data.get("main", {})
         weather = data.get("weather", [{}])[0]
@@ -162,24 +424,15 @@ class WeatherService:
             "visibility": round(data.get("visibility", 10000) / 1000, 1),
             "icon": self._owm_icon(weather.get("icon", "01d")),
             "owm_icon": weather.get("icon", "01d"),
-            "city": data.get("name", coords["city"]),
+            "city": data.get("name", coords.get("city", "")),
             "source": "openweathermap",
             "timestamp": datetime.now().isoformat(),
             "time_of_day": self._time_of_day(),
         }
 
-    def _fetch_forecast(self, state: str, days: int) -> List[Dict]:
-        coords = self._get_coords(state)
-        url = f"{OWM_BASE}/forecast"
-        params = {
-            "lat": coords["lat"],
-            "lon": coords["lon"],
-            "appid": self.api_key,
-            "units": "metric",
-        }
-        r = httpx.get(url, params=params, timeout=10)
-        r.raise_for_status()
-        data = r.json()
+    async def _fetch_forecast(self, coords: dict) -> List[Dict]:
+        """Every day OWM returns (callers slice to the days they need)."""
+        data = await self._get_json("/forecast", coords)
 
         # OWM returns 3-hour intervals. Aggregate into daily.
         daily = {}
@@ -202,8 +455,6 @@ class WeatherService:
         for date, info in sorted(daily.items()):
             if date == today_str:
                 continue
-            if len(forecast) >= days:
-                break
             temps = info["temps"]
             forecast.append({
                 "date": date,
@@ -0,0 +1,172 @@
+"""
+SmartAgri AI - Yield Prediction Service
+Serves the GradientBoosting yield regressor trained by
+ml/train_yield_model.py (yield_predictor.joblib) with its
+label_encoder_state / label_encoder_yield_crop / label_encoder_season /
+scaler_yield artifacts, all loaded once.
+
+  encoding : each encoder's classes become a sorted, lower-cased lookup
+             array; a batch of names is encoded with one np.searchsorted
+             per column instead of a LabelEncoder.transform per call, and
+             the StandardScaler is applied as (X - mean) / scale
+  batching : predict_many() builds the whole (state, crop, season, area)
+             matrix for a recommendation's candidate crops and calls
+             predict once
+  unseen   : a state the encoder never saw is averaged over all known
+             states; an unseen or missing season over the crop's own
+             seasons (crop_encyclopedia.json — averaging rice over Rabi
+             would extrapolate into combinations the model never saw); an
+             unseen crop returns None and callers keep their reference yield
+  area     : area_hectares in crop_yield_india.csv is district-scale, so
+             the scaler's mean area is used rather than a farm's few acres
+
+Output is tonnes per hectare, like RecommendationEngine._estimate_yield.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+
+Query = Tuple[str, Optional[str], Optional[str]]      # (crop, state, season)
+
+
+class _Vocabulary:
+    """LabelEncoder classes as a sorted lower-cased array → vectorized, case-insensitive codes."""
+
+    def __init__(self, classes):
+        names = np.array([str(c).strip().lower() for c in classes])
+        self.order = np.argsort(names, kind="stable")
+        self.sorted = names[self.order]
+        self.size = len(names)
+
+    def encode(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        """Codes for many names; -1 where the name is unseen or missing."""
+        keys = np.array([(v or "").strip().lower() for v in values], dtype=str)
+        pos = np.minimum(np.searchsorted(self.sorted, keys), self.size - 1)
+        found = self.sorted[pos] == keys
+        return np.where(found, self.order[pos], -1)
+
+
+class _Artifacts:
+    """One loaded model + vocabularies + scaler moments; a reload replaces the whole set."""
+
+    def __init__(self, model, states: _Vocabulary, crops: _Vocabulary, seasons: _Vocabulary, scaler):
+        self.model = model
+        self.states = states
+        self.crops = crops
+        self.seasons = seasons
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.crop_seasons = self._crop_season_mask()     # (crop, season) bool: fallback seasons per crop
+
+    def _crop_season_mask(self) -> np.ndarray:
+        """Known seasons each crop grows in per the crop encyclopedia (all seasons if none match)."""
+        from services.recommendation import CROP_DATABASE
+        n_crops = self.crops.size
+        mask = np.zeros((n_crops, self.seasons.size), dtype=bool)
+        crop_codes = self.crops.encode([c["name"] for c in CROP_DATABASE])
+        for code, entry in zip(crop_codes.tolist(), CROP_DATABASE):
+            if code >= 0:
+                seasons = self.seasons.encode(entry.get("seasons", []))
+                mask[code, seasons[seasons >= 0]] = True
+        mask[~mask.any(axis=1)] = True
+        return mask
+
+
+class YieldPredictor:
+    """Loaded yield model + encoders; batched (crop, state, season) → tonnes / hectare."""
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self._artifacts: Optional[_Artifacts] = None
+        self._load_models()
+
+    def _load_models(self):
+        def load(name: str):
+            return joblib.load(os.path.join(self.model_dir, f"{name}.joblib"))
+
+        try:
+            artifacts = _Artifacts(
+                load("yield_predictor"),
+                _Vocabulary(load("label_encoder_state").classes_),
+                _Vocabulary(load("label_encoder_yield_crop").classes_),
+                _Vocabulary(load("label_encoder_season").classes_),
+                load("scaler_yield"),
+            )
+        except Exception as e:
+            if self._artifacts is None:
+                print(f"⚠ Yield predictor not available, using reference yields: {e}")
+            else:
+                print(f"⚠ Yield predictor reload failed, keeping the loaded model: {e}")
+            return
+        self._artifacts = artifacts
+        print(f"✅ Yield predictor loaded ({artifacts.crops.size} crops, {artifacts.states.size} states)")
+
+    @property
+    def ready(self) -> bool:
+        return self._artifacts is not None
+
+    def predict(self, crop: str, state: Optional[str] = None, season: Optional[str] = None) -> Optional[float]:
+        """Yield (tonnes / hectare) for one crop; None if the model cannot answer."""
+        return self.predict_many([(crop, state, season)])[0]
+
+    def predict_many(self, queries: Sequence[Query]) -> List[Optional[float]]:
+        """Yields for many (crop, state, season) queries, in order; None for unseen crops."""
+        art = self._artifacts       # one artifact set for the whole batch, even across a reload
+        if art is None or not queries:
+            return [None] * len(queries)
+        crops, states, seasons = zip(*queries)
+        crop = art.crops.encode(crops)
+        state = art.states.encode(states)
+        season = art.seasons.encode(seasons)
+
+        # Candidate (state, season) rows per query: the given one, or every fallback value
+        n = len(queries)
+        state_mask = np.zeros((n, art.states.size), dtype=bool)
+        state_mask[state >= 0, state[state >= 0]] = True
+        state_mask[state < 0] = True
+        season_mask = art.crop_seasons[np.maximum(crop, 0)].copy()
+        season_mask[season >= 0] = False
+        season_mask[season >= 0, season[season >= 0]] = True
+        rows = state_mask[:, :, None] & season_mask[:, None, :] & (crop >= 0)[:, None, None]
+        owner, row_state, row_season = np.nonzero(rows)
+        if not len(owner):
+            return [None] * n
+
+        features = np.column_stack([row_state, crop[owner], row_season, np.full(len(owner), art.mean[3])])
+        preds = art.model.predict((features.astype(np.float64) - art.mean) / art.scale)
+
+        sums = np.bincount(owner, weights=preds, minlength=n)
+        counts = np.bincount(owner, minlength=n)
+        return [round(float(total / count), 2) if count else None
+                for total, count in zip(sums.tolist(), counts.tolist())]
+
+
+# Singleton predictor instance
+_predictor: Optional[YieldPredictor] = None
+
+
+def get_yield_predictor(model_dir: Optional[str] = None) -> YieldPredictor:
+    global _predictor
+    if _predictor is None:
+        if model_dir is None:
+            from config import get_settings
+            model_dir = get_settings().MODEL_DIR
+        _predictor = YieldPredictor(model_dir)
+    return _predictor
+
+
+def register_models(manager, model_dir: str):
+    """Register the GradientBoosting yield model with the model lifecycle manager."""
+    def _load():
+        predictor = get_yield_predictor(model_dir)
+        if not predictor.ready:
+            raise RuntimeError(f"yield_predictor.joblib could not be loaded from {model_dir}")
+        return predictor
+
+    def _warmup(predictor: YieldPredictor):
+        predictor.predict_many([("rice", "Punjab", "Kharif"), ("wheat", None, "Rabi"), ("maize", "Bihar", None)])
+
+    manager.register("yield_predictor", _load, warmup=_warmup,
+                     description="GradientBoosting crop yield regressor")
@@ -1,12 +1,13 @@
 """
 SmartAgri AI - Security Utilities
-JWT token creation/verification, password hashing.
+JWT token creation/verification, password hashing, service credentials.
 """
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import get_settings
 
@@ -62,3 +63,23 @@ async def get_current_user_id(
             detail="Invalid token payload",
         )
     return int(user_id)
+
+
+async def require_ingest_token(
+    x_ingest_token: Optional[str] = Header(None, description="MANDI_INGEST_TOKEN"),
+) -> None:
+    """
+    Guard for feed ingestion: a feed rewrites shared market data for every
+    user, so it needs the service credential, not a farmer's login.
+    """
+    expected = get_settings().MANDI_INGEST_TOKEN
+    if not expected:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Feed ingestion over HTTP is disabled (MANDI_INGEST_TOKEN not set)",
+        )
+    if not x_ingest_token or not secrets.compare_digest(x_ingest_token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ingest token",
+        )